@@ -0,0 +1,71 @@
+"""
+Rank-card render latency (cold avatar vs cached avatar) and the finished-card cache hit.
+
+    python benchmarks/bench_rank_card.py [renders]
+"""
+import io
+import os
+import sys
+import time
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+from services.rank_card import CardData, CardRenderer, render_card
+
+
+class FakeAsset:
+    def __init__(self, key, png):
+        self.key, self._png = key, png
+
+    def replace(self, **_):
+        return self
+
+    async def read(self):
+        return self._png
+
+
+def pct(ts, p):
+    ts = sorted(ts)
+    return ts[min(len(ts) - 1, int(len(ts) * p))]
+
+
+def card(i, avatar_key):
+    return CardData(name=f"Member {i}", avatar_key=avatar_key, level=i % 60, xp=1000 + i * 37,
+                    level_xp=1000, next_xp=9000, rank=i + 1, ranked=100_000, title="Ranger",
+                    badges=("Dev", "Artist"), accent=(255, 140, 0))
+
+
+async def main(n):
+    buf = io.BytesIO()
+    Image.effect_mandelbrot((256, 256), (-2, -1.5, 1, 1.5), 64).convert("RGB").save(buf, "PNG")
+    avatar = buf.getvalue()
+
+    cold = []
+    for i in range(n):
+        t = time.perf_counter()
+        render_card(card(i, f"cold{i}"), avatar)
+        cold.append((time.perf_counter() - t) * 1000)
+    warm = []
+    for i in range(n):
+        t = time.perf_counter()
+        render_card(card(i, "cold0"), avatar)
+        warm.append((time.perf_counter() - t) * 1000)
+    print(f"{'render, new avatar':<26}p50 {pct(cold, .5):6.1f} ms   p95 {pct(cold, .95):6.1f} ms")
+    print(f"{'render, cached avatar':<26}p50 {pct(warm, .5):6.1f} ms   p95 {pct(warm, .95):6.1f} ms")
+
+    r = CardRenderer()
+    asset = FakeAsset("same", avatar)
+    t = time.perf_counter()
+    await asyncio.gather(*(r.card(card(i, "same"), asset) for i in range(n)))
+    print(f"{'pool, concurrent':<26}{n / (time.perf_counter() - t):6.0f} cards/s")
+    t = time.perf_counter()
+    for i in range(n):
+        await r.card(card(i % r.cache_size, "same"), asset)
+    print(f"{'finished-card cache hit':<26}{(time.perf_counter() - t) / n * 1e6:6.1f} µs")
+    r.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
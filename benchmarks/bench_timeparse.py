@@ -0,0 +1,43 @@
+"""
+Per-item cost of feed timestamp parsing: services.timeparse fast paths vs dateutil.
+
+    python benchmarks/bench_timeparse.py [iterations]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dateutil import parser as dtparse
+from services.timeparse import TimestampParser
+
+SAMPLES = {
+    "rfc822 (RSS pubDate)": ("gdacs", "Tue, 07 Oct 2025 14:03:00 GMT"),
+    "rfc822 numeric offset": ("gvp", "Wed, 08 Oct 2025 09:15:27 -0500"),
+    "rfc3339 Z (Atom)": ("ptwc", "2025-10-07T14:03:00Z"),
+    "iso offset (NWS)": ("nws", "2025-10-07T09:03:00-05:00"),
+    "iso +00:00 (ReliefWeb)": ("reliefweb", "2025-10-07T14:03:00+00:00"),
+    "bare date (FIRMS)": ("firms", "2025-10-07"),
+    "epoch ms (USGS)": ("usgs", 1759845780000),
+}
+
+
+def main(n: int):
+    p = TimestampParser()
+    print(f"{'format':<26}{'dateutil µs':>14}{'fast µs':>10}{'speedup':>9}")
+    for label, (source, value) in SAMPLES.items():
+        p.parse(value, source)  # learn the source's format, as after the first poll
+        fast = timeit.timeit(lambda: p.parse(value, source), number=n) / n * 1e6
+        if isinstance(value, str):
+            slow = timeit.timeit(lambda: dtparse.parse(value), number=n) / n * 1e6
+            print(f"{label:<26}{slow:>14.2f}{fast:>10.2f}{slow / fast:>8.1f}x")
+        else:
+            print(f"{label:<26}{'—':>14}{fast:>10.2f}{'':>9}")
+    cold = TimestampParser()
+    miss = timeit.timeit(lambda: cold.parse("Tue, 07 Oct 2025 14:03:00 GMT", "x") and cold.hints.clear(), number=n) / n * 1e6
+    print(f"{'rfc822, no hint (ISO miss)':<26}{'':>14}{miss:>10.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
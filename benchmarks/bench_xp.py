@@ -0,0 +1,124 @@
+"""
+Message-XP throughput under concurrency: the old locked read-modify-write,
+one atomic UPSERT per message and the write-back XPCache (what the cog uses).
+
+    python benchmarks/bench_xp.py [messages] [concurrency]
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiosqlite
+from cogs.leveling import XPStore, XPCache, level_from_xp, _LEVEL_OF
+
+USERS = 500
+GUILDS = 4
+
+
+class LockedStore(XPStore):
+    """The previous scheme: one global asyncio.Lock around SELECT/INSERT, then UPDATE."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._lock = asyncio.Lock()
+
+    async def handle(self, g, u, gain, now, cooldown):
+        async with self._lock, aiosqlite.connect(self.path) as db:
+            cur = await db.execute("SELECT xp, last_xp_ts FROM xp WHERE guild_id=? AND user_id=?", (g, u))
+            row = await cur.fetchone()
+            if not row:
+                await db.execute("INSERT INTO xp (guild_id, user_id) VALUES (?,?)", (g, u))
+                await db.commit()
+                row = (0, 0)
+        if now - row[1] < cooldown:
+            return
+        xp = row[0] + gain
+        async with self._lock, aiosqlite.connect(self.path) as db:
+            await db.execute("UPDATE xp SET xp=?, level=?, last_xp_ts=? WHERE guild_id=? AND user_id=?",
+                             (xp, level_from_xp(xp), now, g, u))
+            await db.commit()
+
+
+# one message event: cooldown check, gain and level in a single statement (no row back = still cooling down)
+GAIN_SQL = f"""
+INSERT INTO xp (guild_id, user_id, xp, level, last_xp_ts)
+VALUES (:g, :u, :gain, {_LEVEL_OF.format(x=":gain")}, :now)
+ON CONFLICT(guild_id, user_id) DO UPDATE SET
+  xp         = xp.xp + excluded.xp,
+  level      = {_LEVEL_OF.format(x="xp.xp + excluded.xp")},
+  last_xp_ts = excluded.last_xp_ts
+WHERE excluded.last_xp_ts - xp.last_xp_ts >= :cooldown
+RETURNING xp, level
+"""
+
+
+class AtomicStore(XPStore):
+    """One UPSERT ... RETURNING per message, no lock and no cache."""
+
+    async def gain(self, g, u, gain, now, cooldown):
+        async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute(GAIN_SQL, {"g": g, "u": u, "gain": gain, "now": now, "cooldown": cooldown})
+            row = await cur.fetchone()
+            await db.commit()
+        return tuple(row) if row else None
+
+
+def events(n):
+    rnd = random.Random(7)
+    return [(rnd.randrange(GUILDS), rnd.randrange(USERS), rnd.randint(15, 25), i) for i in range(n)]
+
+
+async def drive(handler, evs, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(ev):
+        async with sem:
+            await handler(*ev)
+
+    t = time.perf_counter()
+    await asyncio.gather(*(one(ev) for ev in evs))
+    return time.perf_counter() - t
+
+
+async def fresh(cls):
+    store = cls(os.path.join(tempfile.mkdtemp(), "bench.sqlite"))
+    await store.init()
+    return store
+
+
+async def main(n, concurrency):
+    evs = events(n)
+    print(f"{n} messages, {GUILDS * USERS} members, concurrency {concurrency}")
+
+    locked = await fresh(LockedStore)
+    dt = await drive(lambda g, u, gain, now: locked.handle(g, u, gain, now, 0), evs, concurrency)
+    print(f"{'global lock, read+write':<28}{n / dt:>10.0f} msg/s")
+
+    atomic = await fresh(AtomicStore)
+    dt = await drive(lambda g, u, gain, now: atomic.gain(g, u, gain, now, 0), evs, concurrency)
+    print(f"{'atomic UPSERT per message':<28}{n / dt:>10.0f} msg/s")
+
+    cache = XPCache(await fresh(XPStore))
+    await cache.load()
+
+    async def cached(g, u, gain, now):
+        cache.add(g, u, gain, last_ts=now)
+
+    dt = await drive(cached, evs, concurrency)
+    t = time.perf_counter()
+    await cache.flush()
+    flush = time.perf_counter() - t
+    print(f"{'write-back cache (+flush)':<28}{n / (dt + flush):>10.0f} msg/s   (flush {flush * 1000:.0f} ms)")
+
+    totals = [await s.add(g, u, 0) for s in (locked, atomic, cache.store) for g, u in ((0, 1), (3, 499))]
+    assert totals[0:2] == totals[2:4] == totals[4:6], totals  # all three agree on the result
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(main(int(args[0]) if args else 3000, int(args[1]) if len(args) > 1 else 50))
@@ -141,6 +141,7 @@ COGS = [
     # core/admin
     "cogs.admin",            # /announce /debug /ids
     "cogs.settings_admin",   # /settings_show /settings_set
+    "cogs.sources_admin",    # /sources_* feed toggles + per-guild disaster config
 
     # features
     "cogs.market",           # /price /price_debug
@@ -155,6 +156,7 @@ COGS = [
     "cogs.raids",            # /raid_* tools
     "cogs.roles_setup",      # /roles_bootstrap auto-creates core + ladder roles
     "cogs.leveling",         # XP system with daily, streaks, titles, boosts
+    "cogs.leaderboards",     # /standings (weekly/monthly/season) /season_*
     "cogs.verify",           # /verify flow (pro roles)
     "cogs.profile",          # /profile shows XP + verified roles
     "cogs.guide",            # /guide /admin_guide /recruitment_guide
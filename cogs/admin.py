@@ -1,9 +1,12 @@
 # cogs/admin.py
 import os
+import time
 import discord
 from discord import app_commands
 from discord.ext import commands
 
+from services.scheduler import SCHEDULER
+
 # Add guild scoping
 _GUILD_ID_RAW = os.getenv("GUILD_ID") or ""
 GUILD_ID = int(_GUILD_ID_RAW) if _GUILD_ID_RAW.isdigit() else None
@@ -16,6 +19,19 @@ class Admin(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def cog_load(self):
+        SCHEDULER.register("announce", self._post_scheduled)
+        await SCHEDULER.start()
+
+    async def cog_unload(self):
+        await SCHEDULER.release("announce")
+
+    async def _post_scheduled(self, payload: dict):
+        await self.bot.wait_until_ready()
+        channel = self.bot.get_channel(payload["channel_id"])
+        if channel is not None:
+            await channel.send(embed=make_embed("📣 Announcement", payload["message"], color=discord.Color.gold()))
+
     # ---------- Announce ----------
     @GUILD_DEC  # Add this decorator
     @app_commands.command(description="Post an announcement in the current channel (Manage Server only).")
@@ -29,6 +45,55 @@ class Admin(commands.Cog):
         await interaction.channel.send(embed=embed)
         await interaction.response.send_message("✅ Announcement posted.", ephemeral=True)
 
+    @GUILD_DEC
+    @app_commands.command(name="announce_schedule", description="Schedule an announcement (Manage Server only).")
+    @app_commands.describe(message="Your announcement text", minutes="Post in N minutes",
+                           channel="Where to post (defaults to this channel)")
+    async def announce_schedule(self, interaction: discord.Interaction, message: str,
+                                minutes: app_commands.Range[int, 1, 60 * 24 * 90],
+                                channel: discord.TextChannel | None = None):
+        if not interaction.user.guild_permissions.manage_guild:
+            return await interaction.response.send_message(
+                "🚫 You need **Manage Server** permission.", ephemeral=True
+            )
+        channel = channel or interaction.channel
+        due = int(time.time()) + minutes * 60
+        await SCHEDULER.schedule(f"announce:{interaction.id}", "announce", due, {
+            "guild_id": interaction.guild_id, "channel_id": channel.id, "message": message,
+            "author_id": interaction.user.id,
+        })
+        await interaction.response.send_message(
+            f"✅ Announcement scheduled for {channel.mention} <t:{due}:R> (ID `{interaction.id}`).", ephemeral=True
+        )
+
+    @GUILD_DEC
+    @app_commands.command(name="announce_scheduled", description="List scheduled announcements (Manage Server only).")
+    async def announce_scheduled(self, interaction: discord.Interaction):
+        if not interaction.user.guild_permissions.manage_guild:
+            return await interaction.response.send_message(
+                "🚫 You need **Manage Server** permission.", ephemeral=True
+            )
+        jobs = [j for j in SCHEDULER.pending("announce") if j.payload.get("guild_id") == interaction.guild_id]
+        if not jobs:
+            return await interaction.response.send_message("No announcements scheduled.", ephemeral=True)
+        lines = [f"`{j.key.split(':', 1)[1]}` <t:{int(j.due_at)}:R> in <#{j.payload['channel_id']}> — "
+                 f"{j.payload['message'][:60]}" for j in jobs[:20]]
+        await interaction.response.send_message("🗓️ Scheduled:\n" + "\n".join(lines), ephemeral=True)
+
+    @GUILD_DEC
+    @app_commands.command(name="announce_cancel", description="Cancel a scheduled announcement (Manage Server only).")
+    @app_commands.describe(announcement_id="ID from /announce_scheduled")
+    async def announce_cancel(self, interaction: discord.Interaction, announcement_id: str):
+        if not interaction.user.guild_permissions.manage_guild:
+            return await interaction.response.send_message(
+                "🚫 You need **Manage Server** permission.", ephemeral=True
+            )
+        job = SCHEDULER.get(f"announce:{announcement_id.strip()}")
+        if not job or job.payload.get("guild_id") != interaction.guild_id:
+            return await interaction.response.send_message("❌ No such scheduled announcement.", ephemeral=True)
+        await SCHEDULER.cancel(job.key)
+        await interaction.response.send_message("✅ Scheduled announcement cancelled.", ephemeral=True)
+
     # ---------- Debug ----------
     @GUILD_DEC  # Add this decorator
     @app_commands.command(description="Show live bot config values (ephemeral).")
@@ -87,7 +152,7 @@ class Admin(commands.Cog):
         )
         e.add_field(
             name="📢 Admin",
-            value="`/announce` – Post announcements\n`/debug` – Show config\n`/ids` – Show IDs",
+            value="`/announce` – Post announcements\n`/announce_schedule` – Post one later\n`/debug` – Show config\n`/ids` – Show IDs",
             inline=False,
         )
         e.add_field(
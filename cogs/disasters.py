@@ -1,14 +1,16 @@
 # cogs/disasters.py
 import os
 import io
+import hashlib
 import csv
 import json
+import re
 import asyncio
 import logging
 import aiohttp
 import xml.etree.ElementTree as ET
+from dataclasses import dataclass
 from datetime import datetime, timezone, time as dtime
-from dateutil import parser as dtparse
 
 import discord
 from discord import app_commands
@@ -16,10 +18,19 @@ from discord.ext import commands, tasks
 
 from services.storage import Storage           # de-dupe across restarts
 from services.settings import Settings         # live toggles & thresholds
+from services.geo_subs import GeoSubscriptions, GeoSub  # regional alert routing
+from services.guild_config import GuildConfigStore, GuildDisasterConfig, SOURCES, parse_sources, parse_mode
+from services.json_stream import iter_json_array
+from services.timeparse import parse_ts
+from services.backfill import BackfillProgress, RateLimiter, BACKFILL_CHUNK_DAYS, BACKFILL_MAX_DAYS, BACKFILL_RPS
+from services.map_render import MapRenderer, marker_radius
+from services.quake_sequences import SequenceIndex, QuakeSequence, SEQ_MIN_MAG
+from services.webhook_delivery import AlertDelivery
 
 # -------------------- Constants / Defaults (env fallbacks) --------------------
 
 USGS_FEED = "https://earthquake.usgs.gov/earthquakes/feed/v1.0/summary/all_hour.geojson"
+USGS_FDSN = "https://earthquake.usgs.gov/fdsnws/event/1/query"  # date-range queries (backfill)
 RELIEFWEB_REPORTS = "https://api.reliefweb.int/v1/reports"
 RELIEFWEB_DISASTERS = "https://api.reliefweb.int/v1/disasters"
 EONET = "https://eonet.gsfc.nasa.gov/api/v3/events"
@@ -27,17 +38,27 @@ GDACS_RSS = "https://www.gdacs.org/xml/rss.xml"
 GDACS_JSON = "https://www.gdacs.org/gdacsapi/api/events/geteventlist"  # basic list (no params)
 WHO_DON_RSS = "https://www.who.int/feeds/entity/csr/don/en/rss.xml"
 COPERNICUS_RSS = "https://emergency.copernicus.eu/mapping/list-of-components/EMSR/rss.xml"
-NWS_ALERTS = "https://api.weather.gov/alerts/active?status=actual"
+NWS_ALERTS = "https://api.weather.gov/alerts/active"
 NHC_RSS    = "https://www.nhc.noaa.gov/nhc_at.xml"
 PTWC_RSS   = "https://www.tsunami.gov/events/xml/atom"
 GVP_RSS    = "https://volcano.si.edu/news/WeeklyVolcanoRSS.xml"
 FLOODLIST  = "https://floodlist.com/feed"
 
+GEO_NS = {"geo": "http://www.w3.org/2003/01/geo/wgs84_pos#", "gdacs": "http://www.gdacs.org"}
+
 # Slash scopes
 _GUILD_ID_RAW = os.getenv("GUILD_ID") or ""
 GUILD_ID = int(_GUILD_ID_RAW) if _GUILD_ID_RAW.isdigit() else None
 GUILD_DEC = app_commands.guilds(GUILD_ID) if GUILD_ID else (lambda f: f)
 
+RW_PAGE_SIZE = 500  # ReliefWeb page size for backfill queries (API max is 1000)
+GEO_MAX_PER_USER = int(os.getenv("GEO_MAX_PER_USER", "10") or 10)
+NWS_MAX_ALERTS = int(os.getenv("NWS_MAX_ALERTS", "200") or 200)  # hard cap on alerts turned into embeds per poll
+MAP_HAZARDS = {"earthquake", "tropical cyclone", "wildfire", "flood"}  # realtime posts that get a map
+MAP_WAIT_S = float(os.getenv("MAP_WAIT_S", "4") or 4)  # non-severe posts wait this long for their map
+STATS_PERIODS = {"day": 1, "week": 7, "month": 30, "year": 365}
+DIGEST_MAX_ITEMS = int(os.getenv("DIGEST_MAX_ITEMS", "150") or 150)  # per guild, per day
+
 COLORS = {
     "usgs": discord.Color.red(),
     "reliefweb": discord.Color.blurple(),
@@ -68,28 +89,250 @@ def emb(title, desc, url=None, fields=None, source=None, ts: datetime | None = N
     e.set_footer(text="Auto-sourced • Disaster Watcher")
     return e
 
+@dataclass
+class DigestEntry:
+    """Compact digest record (what the digest line needs, not the whole embed)."""
+    source: str
+    title: str
+    url: str | None
+    rank: float
+    ts: float
+
+class DigestQueue:
+    """
+    Bounded per-guild digest buffer keyed by (source, event_id). Once full, the
+    least severe (then oldest) entry is dropped so a noisy day cannot grow memory
+    or the digest without limit.
+    """
+
+    def __init__(self, limit: int = DIGEST_MAX_ITEMS):
+        self.limit = limit
+        self.items: dict[tuple[str, str], DigestEntry] = {}
+        self.dropped = 0
+        # digest map, drawn incrementally: points[:map_drawn] are already on map_png
+        self.points: list[tuple] = []
+        self.map_png: bytes | None = None
+        self.map_drawn = 0
+        self.map_task: asyncio.Task | None = None
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, key: tuple[str, str], entry: DigestEntry, point: tuple | None = None):
+        if key in self.items:
+            return
+        self.items[key] = entry
+        if point and len(self.points) < self.limit * 2:
+            self.points.append(point)
+        if len(self.items) > self.limit:
+            victim = min(self.items, key=lambda k: (self.items[k].rank, self.items[k].ts))
+            del self.items[victim]
+            self.dropped += 1
+
+    def update(self, key: tuple[str, str], entry: DigestEntry):
+        if key in self.items:
+            self.items[key] = entry
+
+    def entries(self) -> list[DigestEntry]:
+        return sorted(self.items.values(), key=lambda d: (d.source, -d.rank, d.ts))
+
+def digest_embeds(entries: list[DigestEntry], dropped: int = 0) -> list[discord.Embed]:
+    """One embed per source, split at Discord's description limit."""
+    out: list[discord.Embed] = []
+    by_source: dict[str, list[str]] = {}
+    for d in entries:
+        title = (d.title or "Untitled")[:200]
+        by_source.setdefault(d.source, []).append(f"• [{title}]({d.url})" if d.url else f"• {title}")
+    for source, lines in by_source.items():
+        chunk: list[str] = []
+        size = 0
+        for line in lines:
+            if chunk and size + len(line) + 1 > 3900:
+                out.append(discord.Embed(title=source.upper(), description="\n".join(chunk), color=COLORS.get(source, discord.Color.dark_grey())))
+                chunk, size = [], 0
+            chunk.append(line)
+            size += len(line) + 1
+        if chunk:
+            out.append(discord.Embed(title=source.upper(), description="\n".join(chunk), color=COLORS.get(source, discord.Color.dark_grey())))
+    if dropped and out:
+        out[-1].set_footer(text=f"+{dropped} lower-severity item(s) not shown")
+    return out
+
+def pack_embeds(embeds: list[discord.Embed], max_chars: int = 5800) -> list[list[discord.Embed]]:
+    """Group embeds into messages of at most 10 embeds / ~6000 characters."""
+    batches: list[list[discord.Embed]] = []
+    cur: list[discord.Embed] = []
+    size = 0
+    for e in embeds:
+        n = len(e)
+        if cur and (len(cur) == 10 or size + n > max_chars):
+            batches.append(cur)
+            cur, size = [], 0
+        cur.append(e)
+        size += n
+    if cur:
+        batches.append(cur)
+    return batches
+
+GDACS_LEVELS = {"green": 1, "orange": 2, "red": 3}
+NWS_LEVELS = {"minor": 1, "moderate": 2, "severe": 3, "extreme": 4}
+
+def fingerprint(sev, e: discord.Embed) -> str:
+    """Short content hash; a change means the source re-issued the item with new content."""
+    raw = f"{sev}\x1f{e.title or ''}\x1f{e.description or ''}\x1f{e.url or ''}"
+    return hashlib.blake2b(raw.encode("utf-8", "ignore"), digest_size=8).hexdigest()
+
+def severity_rank(source: str, sev, e: discord.Embed) -> float:
+    """Comparable severity so updates can tell an escalation from a plain revision."""
+    if source == "usgs":
+        return float(sev or 0.0)
+    if source in ("gdacs", "gdacs_json"):
+        return float(GDACS_LEVELS.get(str(sev or "").lower(), 0))
+    if source == "nws":
+        return float(NWS_LEVELS.get(str(sev or "").lower(), 0))
+    if source == "nhc":
+        t = (e.title or "").lower()
+        return 2.0 if "warning" in t else 1.0 if "watch" in t else 0.0
+    return 0.0
+
+def _to_float(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+def geo_meta(lat=None, lon=None, countries=None) -> dict:
+    """Location info attached to each fetched item (used for regional routing)."""
+    lat, lon = _to_float(lat), _to_float(lon)
+    if lat is None or lon is None or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        lat = lon = None
+    return {"lat": lat, "lon": lon, "countries": [c.upper() for c in (countries or []) if c]}
+
+# hazard keyword → label, checked in order against title + description
+HAZARD_PATTERNS = [
+    (re.compile(r"tsunami", re.I), "tsunami"),
+    (re.compile(r"earthquake|seismic|\bquake", re.I), "earthquake"),
+    (re.compile(r"volcan|eruption|ash plume", re.I), "volcano"),
+    (re.compile(r"cyclone|hurricane|typhoon|tropical (storm|depression)", re.I), "tropical cyclone"),
+    (re.compile(r"flash flood|flood", re.I), "flood"),
+    (re.compile(r"wildfire|fire|hotspot", re.I), "wildfire"),
+    (re.compile(r"drought", re.I), "drought"),
+    (re.compile(r"landslide|mudslide", re.I), "landslide"),
+    (re.compile(r"epidemic|outbreak|cholera|ebola|disease|virus", re.I), "epidemic"),
+    (re.compile(r"tornado|thunderstorm|blizzard|winter storm|wind|heat|cold|storm", re.I), "severe weather"),
+]
+# fallback when the text says nothing useful
+SOURCE_HAZARD = {
+    "usgs": "earthquake", "ptwc": "tsunami", "gvp": "volcano", "nhc": "tropical cyclone",
+    "floodlist": "flood", "firms": "wildfire", "who": "epidemic", "nws": "severe weather",
+}
+
+def hazard_type(source: str, e: discord.Embed) -> str:
+    if source in ("usgs", "ptwc", "gvp", "firms"):
+        return SOURCE_HAZARD[source]
+    text = f"{e.title or ''} {e.description or ''}"
+    for rx, label in HAZARD_PATTERNS:
+        if rx.search(text):
+            return label
+    return SOURCE_HAZARD.get(source, "other")
+
+def coarse_region(lat: float | None, lon: float | None) -> str:
+    """Very rough continent/ocean area for items that only carry coordinates."""
+    if lat is None or lon is None:
+        return "unknown"
+    if lat >= 66:
+        return "Arctic"
+    if lat <= -60:
+        return "Antarctica"
+    if -170 <= lon < -30:
+        return "North America" if lat >= 13 else "Latin America"
+    if -30 <= lon < 60:
+        if lat >= 36 and lon < 40:
+            return "Europe"
+        if lat >= 12 and lon >= 34:
+            return "Middle East"
+        return "Africa"
+    if 60 <= lon < 150:
+        return "Asia" if lat >= -10 else "Oceania"
+    return "Pacific" if lat >= -10 else "Oceania"
+
+def event_row(source: str, eid: str, rank: float, e: discord.Embed, meta: dict) -> tuple:
+    """Row for Storage.store_events. Region is the first ISO-3 country when known, else a coarse area."""
+    meta = meta or {}
+    when = meta.get("time") or (e.timestamp.timestamp() if e.timestamp else None)
+    countries = meta.get("countries") or []
+    region = countries[0] if countries else coarse_region(meta.get("lat"), meta.get("lon"))
+    return (source, eid, e.title, e.url, rank, meta.get("lat"), meta.get("lon"), ",".join(countries) or None,
+            int(when) if when else None, hazard_type(source, e), region)
+
+def nws_filters(area: str, zone: str, severity: str, urgency: str, event: str) -> tuple[dict, dict]:
+    """
+    Build NWS /alerts/active query params plus the same filters as lowercase sets
+    (re-checked client-side while streaming). The API rejects area+zone together,
+    so a zone list wins over an area list.
+    """
+    def split(raw, norm):
+        return [norm(x.strip()) for x in (raw or "").split(",") if x.strip()]
+    zones = split(zone, str.upper)
+    areas = [] if zones else split(area, str.upper)
+    sevs = split(severity, str.title)
+    urgs = split(urgency, str.title)
+    events = split(event, lambda x: x)
+    params = {"status": "actual"}
+    for key, vals in (("zone", zones), ("area", areas), ("severity", sevs), ("urgency", urgs), ("event", events)):
+        if vals:
+            params[key] = ",".join(vals)
+    accept = {"severity": {v.lower() for v in sevs}, "urgency": {v.lower() for v in urgs},
+              "event": {v.lower() for v in events}}
+    return params, accept
+
+def geojson_point(geometry) -> tuple:
+    """(lat, lon) for a GeoJSON Point, or the vertex mean of a Polygon's outer ring."""
+    if not isinstance(geometry, dict):
+        return None, None
+    coords = geometry.get("coordinates")
+    try:
+        if geometry.get("type") == "Point":
+            return coords[1], coords[0]
+        if geometry.get("type") == "Polygon" and coords and coords[0]:
+            ring = coords[0]
+            return sum(p[1] for p in ring) / len(ring), sum(p[0] for p in ring) / len(ring)
+    except (TypeError, IndexError, KeyError):
+        pass
+    return None, None
+
 
 class Disasters(commands.Cog):
     """
-    Real-time posts → DISASTER_CHANNEL_ID
-    Daily digest at DIGEST_TIME_UTC → GENERAL_CHANNEL_ID
-    All behavior is live-tunable via /sources_* and Settings().
+    Real-time posts → DISASTER_CHANNEL_ID (or each guild's configured channel)
+    Daily digest at DIGEST_TIME_UTC → GENERAL_CHANNEL_ID (or each guild's digest channel)
+    All behavior is live-tunable via /sources_* and Settings(); per-guild
+    overrides live in the disaster_guilds table. Sources are fetched once per
+    tick and fanned out to every guild.
     """
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.storage = Storage()
         self.settings = Settings()
+        self.geo = GeoSubscriptions()
+        self.guild_cfg = GuildConfigStore()
+        self.sequences = SequenceIndex()  # open mainshock → aftershock threads
+        self.backfill = BackfillProgress()
+        self.maps = MapRenderer()
+        self.delivery = AlertDelivery(bot)  # webhook sends for alert traffic when ALERT_WEBHOOKS is on
+        self._backfill_limiter = RateLimiter(BACKFILL_RPS)
+        self._backfill_task: asyncio.Task | None = None
+        self._backfill_stop = asyncio.Event()
         self._session: aiohttp.ClientSession | None = None
 
         # runtime stats
         self._last_poll_dt: datetime | None = None
         self._last_poll_fetched: int = 0
 
-        # digest buffers (reset after daily digest)
-        self._digest_seen_today: set[tuple[str, str]] = set()
-        self._digest_items: list[discord.Embed] = []
-        self._last_digest_date: str | None = None  # 'YYYY-MM-DD'
+        # per-guild bounded digest buffers (reset after that guild's daily digest)
+        self._digest_items: dict[int, DigestQueue] = {}
+        self._last_digest_date: dict[int, str] = {}  # guild_id -> 'YYYY-MM-DD'
 
         # schedule (placeholder; real intervals pulled dynamically each tick)
         self.poll_disasters.change_interval(minutes=int(os.getenv("DISASTER_POLL_MINUTES", "5")))
@@ -100,6 +343,10 @@ class Disasters(commands.Cog):
     async def cog_load(self):
         await self.storage.init()
         await self.settings.init()
+        await self.geo.init()
+        await self.guild_cfg.init()
+        await self.backfill.init()
+        await self.delivery.init()
         self._session = aiohttp.ClientSession(headers={"User-Agent": "Palaemon-DisasterBot/1.0 (+https://palaemon.vercel.app)"})
 
         if not self.poll_disasters.is_running():
@@ -108,12 +355,22 @@ class Disasters(commands.Cog):
         if not self.check_digest.is_running():
             self.check_digest.start()
             logging.info("Disasters: digest checker started (every 1 min).")
+        if not self.expire_sequences.is_running():
+            self.expire_sequences.start()
+        if any(j.status == "running" for j in await self.backfill.all()):
+            self._start_backfill()  # resume a backfill interrupted by a restart
 
     def cog_unload(self):
         if self.poll_disasters.is_running():
             self.poll_disasters.cancel()
         if self.check_digest.is_running():
             self.check_digest.cancel()
+        if self.expire_sequences.is_running():
+            self.expire_sequences.cancel()
+        if self._backfill_task and not self._backfill_task.done():
+            self._backfill_task.cancel()  # progress row stays 'running' and resumes on next load
+        self.maps.shutdown()
+        asyncio.create_task(self.delivery.close())
         if self._session and not self._session.closed:
             asyncio.create_task(self._session.close())
 
@@ -146,34 +403,162 @@ class Disasters(commands.Cog):
     def _channel(self, channel_id: int):
         return self.bot.get_channel(channel_id) if channel_id else None
 
-    async def _safe_send(self, channel: discord.TextChannel, *, content=None, embed: discord.Embed | None = None):
+    async def _safe_send(self, channel: discord.TextChannel, *, content=None, embed: discord.Embed | None = None,
+                         embeds: list[discord.Embed] | None = None, file: discord.File | None = None,
+                         reference: discord.PartialMessage | None = None) -> discord.Message | None:
         try:
-            await channel.send(content=content, embed=embed, allowed_mentions=discord.AllowedMentions(roles=True))
+            return await self.delivery.send(channel, content=content, embed=embed, embeds=embeds, file=file,
+                                            reference=reference, allowed_mentions=discord.AllowedMentions(roles=True))
         except discord.Forbidden:
             logging.warning("Disasters: missing permissions to send in #%s (%s)", getattr(channel, "name", "?"), channel.id)
         except Exception as ex:
             logging.warning("Disasters: failed to post item: %s", ex)
-
-    async def _post_realtime(self, embed: discord.Embed, severe: bool, alert_role_name: str | None, channel_id: int):
+        return None
+
+    @staticmethod
+    def _role_mention(ch: discord.TextChannel, alert_role_name: str | None) -> str | None:
+        if not alert_role_name:
+            return None
+        role = discord.utils.get(ch.guild.roles, name=alert_role_name)
+        return role.mention if role else None
+
+    @staticmethod
+    def _with_map(embed: discord.Embed, png: bytes, name: str = "map.png") -> tuple[discord.Embed, discord.File]:
+        e = embed.copy()
+        e.set_image(url=f"attachment://{name}")
+        return e, discord.File(io.BytesIO(png), filename=name)
+
+    async def _post_realtime(self, embed: discord.Embed, severe: bool, alert_role_name: str | None,
+                             channel_id: int, map_job: asyncio.Future | None = None) -> discord.Message | None:
+        """
+        Post one item. With a map pending, severe items go out immediately and get the image
+        edited in once it is rendered; other items wait briefly so they post with the map.
+        """
         ch = self._channel(channel_id)
         if not ch:
             logging.warning("Disasters: realtime channel not set/found (id=%s).", channel_id)
+            return None
+        content = self._role_mention(ch, alert_role_name) if severe else None
+        if map_job is None:
+            return await self._safe_send(ch, content=content, embed=embed)
+        if severe:
+            msg = await self._safe_send(ch, content=content, embed=embed)
+            if msg:
+                asyncio.create_task(self._attach_map_later(msg, embed, map_job))
+            return msg
+        try:
+            png = await asyncio.wait_for(asyncio.shield(map_job), MAP_WAIT_S)
+        except asyncio.TimeoutError:
+            png = None
+        if not png:
+            return await self._safe_send(ch, content=content, embed=embed)
+        e, f = self._with_map(embed, png)
+        return await self._safe_send(ch, content=content, embed=e, file=f)
+
+    async def _attach_map_later(self, msg: discord.Message, embed: discord.Embed, map_job: asyncio.Future):
+        png = await map_job
+        if not png:
             return
-        content = None
-        if severe and alert_role_name:
-            role = discord.utils.get(ch.guild.roles, name=alert_role_name)
-            if role:
-                content = role.mention
-        await self._safe_send(ch, content=content, embed=embed)
-
-    def _collect_for_digest(self, source: str, eid: str, embed: discord.Embed):
-        key = (source, eid)
-        if key in self._digest_seen_today:
-            return
-        self._digest_seen_today.add(key)
-        self._digest_items.append(embed)
+        e, f = self._with_map(embed, png)
+        try:
+            await msg.edit(embed=e, attachments=[f])
+        except Exception as ex:
+            logging.warning("Disasters: could not attach map to %s: %s", msg.id, ex)
+
+    async def _send_dm(self, user_id: int, embed: discord.Embed):
+        try:
+            user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+            await user.send(embed=embed)
+        except discord.Forbidden:
+            logging.info("Disasters: user %s has DMs closed; skipping regional alert.", user_id)
+        except Exception as ex:
+            logging.warning("Disasters: failed to DM regional alert to %s: %s", user_id, ex)
+
+    async def _deliver_regional(self, embed: discord.Embed, meta: dict, posted_channels: set[int]) -> list[discord.Message]:
+        """Send an item to every user/channel whose region subscription matches it."""
+        if not meta or not len(self.geo.index):
+            return []
+        subs = self.geo.match(meta.get("lat"), meta.get("lon"), meta.get("countries"))
+        targets = {(s.target_type, s.target_id) for s in subs}
+        sent = []
+        for target_type, target_id in targets:
+            if target_type == "channel":
+                if target_id in posted_channels:
+                    continue  # already posted there
+                ch = self._channel(target_id)
+                if ch:
+                    msg = await self._safe_send(ch, embed=embed)
+                    if msg:
+                        sent.append(msg)
+            else:
+                await self._send_dm(target_id, embed)
+        return sent
+
+    async def _post_followup(self, seq: QuakeSequence, channel_id: int, embed: discord.Embed) -> discord.Message | None:
+        """Post an aftershock into the mainshock's thread, opening the thread on first use."""
+        thread = seq.threads.get(channel_id)
+        if thread is None:
+            ch = self._channel(channel_id)
+            if not ch:
+                return None
+            try:
+                thread = await ch.get_partial_message(seq.posts[channel_id]).create_thread(
+                    name=f"Aftershocks — {seq.title}"[:100], auto_archive_duration=4320,
+                )
+            except Exception as ex:
+                logging.warning("Disasters: could not open aftershock thread in %s: %s", channel_id, ex)
+                return await self._safe_send(ch, embed=embed)
+            seq.threads[channel_id] = thread
+        seq.followups += 1
+        return await self._safe_send(thread, embed=embed)
+
+    @staticmethod
+    def _digest_entry(source: str, e: discord.Embed, rank: float) -> DigestEntry:
+        ts = e.timestamp.timestamp() if e.timestamp else datetime.now(timezone.utc).timestamp()
+        return DigestEntry(source, e.title or "", e.url or None, rank, ts)
+
+    def _collect_for_digest(self, guild_id: int, source: str, eid: str, entry: DigestEntry, point: tuple | None = None):
+        q = self._digest_items.get(guild_id)
+        if q is None:
+            q = self._digest_items[guild_id] = DigestQueue()
+        q.add((source, eid), entry, point)
+        if point and self.maps.enabled and (q.map_task is None or q.map_task.done()):
+            q.map_task = asyncio.create_task(self._refresh_digest_map(q))
+
+    async def _refresh_digest_map(self, q: DigestQueue):
+        """Draw only the points collected since the last render onto the guild's digest map."""
+        while q.map_drawn < len(q.points):
+            n = len(q.points)
+            png = await self.maps.add_to_map(q.map_png, q.points[q.map_drawn:n])
+            if png is None:
+                return
+            q.map_png, q.map_drawn = png, n
+
+    async def _apply_update(self, source: str, eid: str, sev, e: discord.Embed, escalated: bool,
+                            configs: list[GuildDisasterConfig]):
+        """Edit every post of a re-issued item in place; ping again only when severity went up."""
+        by_channel = {c.channel_id: c for c in configs if c.channel_id}
+        entry = self._digest_entry(source, e, severity_rank(source, sev, e))
+        for q in self._digest_items.values():
+            q.update((source, eid), entry)
+        for channel_id, message_id, webhook_id in await self.storage.get_posts(source, eid):
+            ch = self._channel(channel_id)
+            if not ch:
+                continue
+            msg = ch.get_partial_message(message_id)
+            try:
+                await self.delivery.edit(ch, message_id, webhook_id, embed=e)
+            except discord.NotFound:
+                continue
+            except Exception as ex:
+                logging.warning("Disasters: failed to edit %s/%s in %s: %s", source, eid, channel_id, ex)
+                continue
+            cfg = by_channel.get(channel_id)
+            if escalated and cfg and self._is_severe(source, sev, e, cfg.ping_mag):
+                mention = self._role_mention(ch, cfg.alert_role)
+                await self._safe_send(ch, content=f"{mention or ''} ⬆️ **Escalated:** {e.title}".strip(), reference=msg)
 
-    # -------------------- fetchers (each returns list[(source, id, sev, embed)]) --------------------
+    # -------------------- fetchers (each returns list[(source, id, sev, embed, meta)]) --------------------
 
     async def fetch_usgs(self, min_mag: float):
         try:
@@ -182,7 +567,10 @@ class Disasters(commands.Cog):
         except Exception as e:
             logging.exception("USGS fetch failed", exc_info=e)
             return []
+        return self._usgs_items(data, min_mag)
 
+    def _usgs_items(self, data: dict, min_mag: float):
+        """USGS GeoJSON (summary feed or FDSN query) → items."""
         out = []
         for f in data.get("features", []):
             eid = f.get("id")
@@ -197,6 +585,7 @@ class Disasters(commands.Cog):
             tms = p.get("time")
             dt = datetime.fromtimestamp(tms / 1000, tz=timezone.utc) if tms else None
             url = p.get("url")
+            coords = (f.get("geometry") or {}).get("coordinates") or [None, None]
             out.append(("usgs", eid, mag, emb(
                 title=f"🌏 Earthquake M{mag:.1f} — {place}",
                 desc=f"**Time (UTC):** {dt.isoformat() if dt else 'n/a'}\nSource: USGS",
@@ -204,28 +593,35 @@ class Disasters(commands.Cog):
                 fields=[("Severity filter", f"M ≥ {min_mag:.1f}", True)],
                 source="usgs",
                 ts=dt,
-            )))
+            ), {**geo_meta(coords[1], coords[0]), "time": tms / 1000 if tms else None}))
         return out
 
-    async def fetch_reliefweb_reports(self, limit: int, appname: str):
-        payload = {
+    @staticmethod
+    def _rw_reports_payload(limit: int, appname: str, created: dict, offset: int = 0) -> dict:
+        return {
             "appname": appname,
-            "limit": max(1, min(20, limit)),
+            "limit": limit,
+            "offset": offset,
             "profile": "full",
             "sort": ["date:desc"],
             "filter": {"operator": "AND", "conditions": [
                 {"field": "format", "value": ["Situation Report", "Flash Update", "Report"]},
-                {"field": "date.created", "range": {"from": "now-24h"}}
+                {"field": "date.created", "range": created}
             ]},
             "fields": {"include": ["title", "url", "date", "source", "country", "disaster_type"]}
         }
+
+    async def fetch_reliefweb_reports(self, limit: int, appname: str):
+        payload = self._rw_reports_payload(max(1, min(20, limit)), appname, {"from": "now-24h"})
         try:
             async with self._session.post(RELIEFWEB_REPORTS, json=payload, timeout=25) as r:
                 data = await r.json()
         except Exception as e:
             logging.exception("ReliefWeb reports fetch failed", exc_info=e)
             return []
+        return self._rw_report_items(data)
 
+    def _rw_report_items(self, data: dict):
         out = []
         for item in data.get("data", []):
             rid = str(item.get("id"))
@@ -233,8 +629,9 @@ class Disasters(commands.Cog):
             title = f.get("title", "ReliefWeb report")
             url = f.get("url")
             created = (f.get("date") or {}).get("created")
-            dtv = dtparse.parse(created) if created else None
+            dtv = parse_ts(created, "reliefweb")
             countries = ", ".join([c["name"] for c in f.get("country", [])]) or "—"
+            iso3 = [c.get("iso3") for c in f.get("country", [])]
             dtypes = ", ".join([t["name"] for t in f.get("disaster_type", [])]) or "—"
             srcs = ", ".join([(s.get("shortname") or s.get("name")) for s in f.get("source", [])]) or "ReliefWeb"
             out.append(("reliefweb", rid, None, emb(
@@ -246,27 +643,34 @@ class Disasters(commands.Cog):
                 url=url,
                 source="reliefweb",
                 ts=dtv,
-            )))
+            ), geo_meta(countries=iso3)))
         return out
 
-    async def fetch_reliefweb_disasters(self, limit: int, appname: str):
-        payload = {
+    @staticmethod
+    def _rw_disasters_payload(limit: int, appname: str, created: dict, offset: int = 0) -> dict:
+        return {
             "appname": appname,
-            "limit": max(1, min(20, limit)),
+            "limit": limit,
+            "offset": offset,
             "profile": "full",
             "sort": ["date:desc"],
             "filter": {"operator": "AND", "conditions": [
-                {"field": "date.created", "range": {"from": "now-24h"}}
+                {"field": "date.created", "range": created}
             ]},
             "fields": {"include": ["name", "primary_type", "date", "url", "country", "status"]}
         }
+
+    async def fetch_reliefweb_disasters(self, limit: int, appname: str):
+        payload = self._rw_disasters_payload(max(1, min(20, limit)), appname, {"from": "now-24h"})
         try:
             async with self._session.post(RELIEFWEB_DISASTERS, json=payload, timeout=25) as r:
                 data = await r.json()
         except Exception as e:
             logging.exception("ReliefWeb disasters fetch failed", exc_info=e)
             return []
+        return self._rw_disaster_items(data)
 
+    def _rw_disaster_items(self, data: dict):
         out = []
         for item in data.get("data", []):
             did = str(item.get("id"))
@@ -274,8 +678,9 @@ class Disasters(commands.Cog):
             title = f.get("name", "Disaster")
             url = f.get("url")
             created = (f.get("date") or {}).get("created")
-            dtv = dtparse.parse(created) if created else None
+            dtv = parse_ts(created, "reliefweb_dis")
             countries = ", ".join([c["name"] for c in f.get("country", [])]) or "—"
+            iso3 = [c.get("iso3") for c in f.get("country", [])]
             dtype = (f.get("primary_type") or {}).get("name", "—")
             status = f.get("status", "—")
             out.append(("reliefweb_dis", did, None, emb(
@@ -287,7 +692,7 @@ class Disasters(commands.Cog):
                 url=url,
                 source="reliefweb_dis",
                 ts=dtv,
-            )))
+            ), geo_meta(countries=iso3)))
         return out
 
     async def fetch_eonet(self):
@@ -298,7 +703,9 @@ class Disasters(commands.Cog):
         except Exception as e:
             logging.exception("EONET fetch failed", exc_info=e)
             return []
+        return self._eonet_items(data)
 
+    def _eonet_items(self, data: dict):
         out = []
         for ev in data.get("events", []):
             eid = ev.get("id")
@@ -308,14 +715,15 @@ class Disasters(commands.Cog):
             geo = ev.get("geometry", [])
             latest = geo[-1] if geo else {}
             when = latest.get("date")
-            dtv = dtparse.parse(when) if when else None
+            dtv = parse_ts(when, "eonet")
+            lat, lon = geojson_point(latest)
             out.append(("eonet", eid, None, emb(
                 title=f"🛰️ {title}",
                 desc=f"**Category:** {cats}\n**Last update:** {dtv.isoformat() if dtv else 'n/a'}\nSource: NASA EONET",
                 url=link,
                 source="eonet",
                 ts=dtv,
-            )))
+            ), geo_meta(lat, lon)))
         return out
 
     async def fetch_gdacs_rss(self):
@@ -335,7 +743,7 @@ class Disasters(commands.Cog):
             title = (item.findtext("title") or "").strip()
             link = (item.findtext("link") or "").strip()
             pubdate = item.findtext("pubDate")
-            dtv = dtparse.parse(pubdate) if pubdate else None
+            dtv = parse_ts(pubdate, "gdacs")
             level = "Green"
             tl = title.lower()
             if "red alert" in tl:
@@ -345,13 +753,16 @@ class Disasters(commands.Cog):
             if level not in ("Orange", "Red"):
                 continue
             eid = link or title
+            meta = geo_meta(item.findtext("geo:Point/geo:lat", namespaces=GEO_NS) or item.findtext("geo:lat", namespaces=GEO_NS),
+                            item.findtext("geo:Point/geo:long", namespaces=GEO_NS) or item.findtext("geo:long", namespaces=GEO_NS),
+                            [item.findtext("gdacs:iso3", namespaces=GEO_NS)])
             out.append(("gdacs", eid, level, emb(
                 title=f"⚠️ GDACS {level} — {title}",
                 desc=f"**Published:** {dtv.isoformat() if dtv else 'n/a'}\nSource: GDACS",
                 url=link,
                 source="gdacs",
                 ts=dtv,
-            )))
+            ), meta))
         return out
 
     async def fetch_gdacs_json(self):
@@ -378,7 +789,7 @@ class Disasters(commands.Cog):
                     url=link,
                     source="gdacs_json",
                     ts=None,
-                )))
+                ), geo_meta(ev.get("latitude") or ev.get("lat"), ev.get("longitude") or ev.get("lon"), [ev.get("iso3")])))
             elif isinstance(ev, dict) and "properties" in ev:
                 p = ev["properties"]
                 eid = str(p.get("eventid") or p.get("id") or p.get("name"))
@@ -387,13 +798,14 @@ class Disasters(commands.Cog):
                 link = p.get("url") or "https://www.gdacs.org/"
                 if level not in ("Orange", "Red"):
                     continue
+                lat, lon = geojson_point(ev.get("geometry"))
                 out.append(("gdacs_json", eid, level, emb(
                     title=f"⚠️ GDACS {level} — {title}",
                     desc=f"Source: GDACS (JSON)",
                     url=link,
                     source="gdacs_json",
                     ts=None,
-                )))
+                ), geo_meta(lat, lon, [p.get("iso3")])))
         return out
 
     async def fetch_who_don(self):
@@ -413,7 +825,7 @@ class Disasters(commands.Cog):
             title = (item.findtext("title") or "").strip()
             link = (item.findtext("link") or "").strip()
             pubdate = item.findtext("pubDate")
-            dtv = dtparse.parse(pubdate) if pubdate else None
+            dtv = parse_ts(pubdate, "who")
             eid = link or title
             out.append(("who", eid, None, emb(
                 title=f"🧬 WHO Disease Outbreak — {title}",
@@ -421,7 +833,7 @@ class Disasters(commands.Cog):
                 url=link,
                 source="who",
                 ts=dtv,
-            )))
+            ), geo_meta()))
         return out
 
     async def fetch_copernicus(self):
@@ -441,7 +853,7 @@ class Disasters(commands.Cog):
             title = (item.findtext("title") or "").strip()
             link = (item.findtext("link") or "").strip()
             pubdate = item.findtext("pubDate")
-            dtv = dtparse.parse(pubdate) if pubdate else None
+            dtv = parse_ts(pubdate, "copernicus")
             eid = link or title
             out.append(("copernicus", eid, None, emb(
                 title=f"🛰️ Copernicus EMS — {title}",
@@ -449,7 +861,7 @@ class Disasters(commands.Cog):
                 url=link,
                 source="copernicus",
                 ts=dtv,
-            )))
+            ), geo_meta()))
         return out
 
     async def fetch_firms(self, firms_url: str):
@@ -474,14 +886,14 @@ class Disasters(commands.Cog):
                     lat = props.get("latitude") or props.get("LATITUDE") or props.get("lat") or "?"
                     lon = props.get("longitude") or props.get("LONGITUDE") or props.get("lon") or "?"
                     acq = props.get("acq_date") or props.get("Date") or props.get("date")
-                    dtv = dtparse.parse(acq) if acq else None
+                    dtv = parse_ts(acq, "firms")
                     out.append(("firms", eid, None, emb(
                         title="🔥 FIRMS Active Fire",
                         desc=f"**Lat/Lon:** {lat}, {lon}\n**Acquired:** {dtv.isoformat() if dtv else 'n/a'}",
                         url=firms_url,
                         source="firms",
                         ts=dtv,
-                    )))
+                    ), geo_meta(lat, lon)))
             else:
                 # CSV fallback (NASA public downloads often CSV)
                 text = data.decode("utf-8", errors="ignore")
@@ -493,53 +905,74 @@ class Disasters(commands.Cog):
                     lat = row.get("latitude") or row.get("LATITUDE") or row.get("lat") or "?"
                     lon = row.get("longitude") or row.get("LONGITUDE") or row.get("lon") or "?"
                     acq = row.get("acq_date") or row.get("Date") or row.get("date")
-                    dtv = dtparse.parse(acq) if acq else None
+                    dtv = parse_ts(acq, "firms")
                     out.append(("firms", str(eid), None, emb(
                         title="🔥 FIRMS Active Fire",
                         desc=f"**Lat/Lon:** {lat}, {lon}\n**Acquired:** {dtv.isoformat() if dtv else 'n/a'}",
                         url=firms_url,
                         source="firms",
                         ts=dtv,
-                    )))
+                    ), geo_meta(lat, lon)))
         except Exception as e:
             logging.exception("FIRMS parse failed", exc_info=e)
         return out
 
-    async def fetch_nws(self):
-        """USA severe weather alerts from NWS (JSON)."""
+    async def fetch_nws(self, params: dict | None = None, accept: dict | None = None):
+        """USA severe weather alerts from NWS (GeoJSON), filtered server-side and decoded one feature at a time."""
+        params = params or {"status": "actual"}
+        accept = accept or {}
+        out = []
+        skipped = 0
         try:
-            async with self._session.get(NWS_ALERTS, timeout=25) as r:
-                data = await r.json()
+            async with self._session.get(NWS_ALERTS, params=params, timeout=25,
+                                         headers={"Accept": "application/geo+json"}) as r:
+                r.raise_for_status()
+                async for feat in iter_json_array(r.content, "features"):
+                    props = feat.get("properties", {}) or {}
+                    if any(allowed and (props.get(k) or "").lower() not in allowed for k, allowed in accept.items()):
+                        skipped += 1
+                        continue
+                    out.append(self._nws_item(feat, props))
+                    if len(out) >= NWS_MAX_ALERTS:
+                        logging.warning("NWS: hit NWS_MAX_ALERTS=%s; tighten the NWS_* filters.", NWS_MAX_ALERTS)
+                        break
         except Exception as e:
             logging.exception("NWS fetch failed", exc_info=e)
-            return []
-
-        out = []
-        for feat in data.get("features", []):
-            props = feat.get("properties", {}) or {}
-            eid = props.get("id") or feat.get("id") or props.get("event") or "nws-unknown"
-            event = props.get("event") or "NWS Alert"
-            severity = props.get("severity") or "Unknown"
-            area = props.get("areaDesc") or "—"
-            headline = props.get("headline") or ""
-            uri = props.get("uri") or props.get("url") or "https://www.weather.gov/"
-
-            eff = props.get("effective") or props.get("onset") or props.get("sent")
-            dtv = dtparse.parse(eff) if eff else None
-
-            desc = (f"**Event:** {event}\n"
-                    f"**Severity:** {severity}\n"
-                    f"**Area:** {area}\n"
-                    f"{headline}")
-            out.append(("nws", str(eid), severity, emb(
-                title=f"⛑️ NWS Alert — {event}",
-                desc=desc,
-                url=uri,
-                source="nws",
-                ts=dtv,
-            )))
+            return out
+        if skipped:
+            logging.info("NWS: %s alert(s) dropped by local filters.", skipped)
         return out
 
+    def _nws_item(self, feat: dict, props: dict):
+        """One NWS GeoJSON feature → (source, id, sev, embed, meta)."""
+        eid = props.get("id") or feat.get("id") or props.get("event") or "nws-unknown"
+        # Updates/continuations reference the alerts they supersede; key them on the
+        # original so they edit the first post instead of creating a new one.
+        refs = [r for r in (props.get("references") or []) if isinstance(r, dict) and r.get("identifier")]
+        if refs:
+            eid = min(refs, key=lambda r: r.get("sent") or "")["identifier"]
+        event = props.get("event") or "NWS Alert"
+        severity = props.get("severity") or "Unknown"
+        area = props.get("areaDesc") or "—"
+        headline = props.get("headline") or ""
+        uri = props.get("uri") or props.get("url") or "https://www.weather.gov/"
+
+        eff = props.get("effective") or props.get("onset") or props.get("sent")
+        dtv = parse_ts(eff, "nws")
+        lat, lon = geojson_point(feat.get("geometry"))
+
+        desc = (f"**Event:** {event}\n"
+                f"**Severity:** {severity}\n"
+                f"**Area:** {area}\n"
+                f"{headline}")
+        return ("nws", str(eid), severity, emb(
+            title=f"⛑️ NWS Alert — {event}",
+            desc=desc,
+            url=uri,
+            source="nws",
+            ts=dtv,
+        ), geo_meta(lat, lon, ["USA"]))
+
     async def fetch_nhc(self):
         """NOAA/NHC Atlantic tropical advisories (RSS)."""
         try:
@@ -555,7 +988,7 @@ class Disasters(commands.Cog):
             title = (item.findtext("title") or "").strip()
             link = (item.findtext("link") or "").strip()
             pubdate = item.findtext("pubDate")
-            dtv = dtparse.parse(pubdate) if pubdate else None
+            dtv = parse_ts(pubdate, "nhc")
             eid = link or title
             out.append(("nhc", eid, None, emb(
                 title=f"🌀 NHC Advisory — {title}",
@@ -563,7 +996,7 @@ class Disasters(commands.Cog):
                 url=link,
                 source="nhc",
                 ts=dtv,
-            )))
+            ), geo_meta()))
         return out
 
     async def fetch_ptwc(self):
@@ -584,7 +1017,7 @@ class Disasters(commands.Cog):
             link_el = ent.find("atom:link", ns) or ent.find("link")
             link = (link_el.get("href") if link_el is not None else "") or ""
             updated = ent.findtext("atom:updated", default="", namespaces=ns) or ent.findtext("updated")
-            dtv = dtparse.parse(updated) if updated else None
+            dtv = parse_ts(updated, "ptwc")
             eid = link or title
             out.append(("ptwc", eid, None, emb(
                 title=f"🌊 PTWC — {title}",
@@ -592,7 +1025,7 @@ class Disasters(commands.Cog):
                 url=link or "https://www.tsunami.gov/",
                 source="ptwc",
                 ts=dtv,
-            )))
+            ), geo_meta()))
         return out
 
     async def fetch_gvp(self):
@@ -610,7 +1043,7 @@ class Disasters(commands.Cog):
             title = (item.findtext("title") or "").strip()
             link = (item.findtext("link") or "").strip()
             pubdate = item.findtext("pubDate")
-            dtv = dtparse.parse(pubdate) if pubdate else None
+            dtv = parse_ts(pubdate, "gvp")
             eid = link or title
             out.append(("gvp", eid, None, emb(
                 title=f"🌋 Volcano Activity — {title}",
@@ -618,7 +1051,7 @@ class Disasters(commands.Cog):
                 url=link,
                 source="gvp",
                 ts=dtv,
-            )))
+            ), geo_meta()))
         return out
 
     async def fetch_floodlist(self):
@@ -636,7 +1069,7 @@ class Disasters(commands.Cog):
             title = (item.findtext("title") or "").strip()
             link = (item.findtext("link") or "").strip()
             pubdate = item.findtext("pubDate")
-            dtv = dtparse.parse(pubdate) if pubdate else None
+            dtv = parse_ts(pubdate, "floodlist")
             eid = link or title
             out.append(("floodlist", eid, None, emb(
                 title=f"🌧️ Floods — {title}",
@@ -644,28 +1077,208 @@ class Disasters(commands.Cog):
                 url=link,
                 source="floodlist",
                 ts=dtv,
-            )))
+            ), geo_meta()))
         return out
     # -------------------- pipeline --------------------
 
-    async def _handle_items(self, batch, alert_role_name: str, ping_mag: float, rt_channel_id: int):
-        for source, eid, sev, e in batch:
-            if await self.storage.is_seen(source, eid):
+    async def _global_config(self) -> dict:
+        """Settings/env values shared by every guild (and used as per-guild fallbacks)."""
+        return {
+            "channel_id": await self._get_int("DISASTER_CHANNEL_ID", int(os.getenv("DISASTER_CHANNEL_ID", "0") or 0)),
+            "digest_channel_id": await self._get_int("GENERAL_CHANNEL_ID", int(os.getenv("GENERAL_CHANNEL_ID", "0") or 0)),
+            "alert_role": await self._get("ALERT_ROLE_NAME", os.getenv("ALERT_ROLE_NAME", "Disaster Alerts")),
+            "min_mag": await self._get_float("USGS_MIN_MAG", float(os.getenv("USGS_MIN_MAG", "5.0"))),
+            "ping_mag": await self._get_float("USGS_PING_MAG", float(os.getenv("USGS_PING_MAG", "6.8"))),
+            "digest_time": await self._get("DIGEST_TIME_UTC", os.getenv("DIGEST_TIME_UTC", "09:00")),
+            "mode": parse_mode(await self._get("DISASTER_MODE", os.getenv("DISASTER_MODE", "rt"))),
+            "rw_limit": await self._get_int("RELIEFWEB_LIMIT", int(os.getenv("RELIEFWEB_LIMIT", "5") or 5)),
+            "rw_app": await self._get("RELIEFWEB_APPNAME", os.getenv("RELIEFWEB_APPNAME", "pal-discord-bot")),
+            "firms_url": await self._get("FIRMS_URL", os.getenv("FIRMS_URL", "")),
+            "nws_filters": nws_filters(*[await self._get(k, os.getenv(k, "")) for k in
+                                         ("NWS_AREA", "NWS_ZONE", "NWS_SEVERITY", "NWS_URGENCY", "NWS_EVENT")]),
+            "sources": {src for src, (key, default) in SOURCES.items() if await self._get_bool(key, default)},
+        }
+
+    async def _guild_configs(self, glob: dict) -> list[GuildDisasterConfig]:
+        """
+        One effective config per receiving guild: every enabled disaster_guilds row,
+        plus the legacy Settings/env config for the guild that owns DISASTER_CHANNEL_ID.
+        """
+        rows = {r["guild_id"]: r for r in await self.guild_cfg.all_rows()}
+        legacy = self._channel(glob["channel_id"]) or self._channel(glob["digest_channel_id"])
+        legacy_gid = legacy.guild.id if legacy else (GUILD_ID or 0)
+        out = []
+        for r in rows.values():
+            if not r["enabled"]:
                 continue
-            severe = False
+            # an unset channel means "the global one" for the guild that owns it, "none" elsewhere
+            owns_global = r["guild_id"] == legacy_gid
+            out.append(GuildDisasterConfig(
+                guild_id=r["guild_id"],
+                channel_id=r["channel_id"] or (glob["channel_id"] if owns_global else 0),
+                digest_channel_id=r["digest_channel_id"] or (glob["digest_channel_id"] if owns_global else 0),
+                alert_role=r["alert_role"] or glob["alert_role"],
+                sources=parse_sources(r["sources"]) or glob["sources"],
+                min_mag=glob["min_mag"] if r["usgs_min_mag"] is None else r["usgs_min_mag"],
+                ping_mag=glob["ping_mag"] if r["usgs_ping_mag"] is None else r["usgs_ping_mag"],
+                digest_time=r["digest_time"] or glob["digest_time"],
+                mode=parse_mode(r["mode"], glob["mode"]),
+            ))
+
+        if (glob["channel_id"] or glob["digest_channel_id"]) and legacy_gid not in rows:
+            out.append(GuildDisasterConfig(
+                guild_id=legacy_gid,
+                channel_id=glob["channel_id"],
+                digest_channel_id=glob["digest_channel_id"],
+                alert_role=glob["alert_role"],
+                sources=glob["sources"],
+                min_mag=glob["min_mag"],
+                ping_mag=glob["ping_mag"],
+                digest_time=glob["digest_time"],
+                mode=glob["mode"],
+            ))
+        return out
+
+    def _fetch_calls(self, glob: dict, configs: list[GuildDisasterConfig]) -> list:
+        """Each source needed by at least one guild is fetched once, at the loosest threshold."""
+        wanted: set[str] = set()
+        for cfg in configs:
+            wanted |= cfg.sources
+        if len(self.geo.index):
+            wanted |= glob["sources"]
+        min_mag = min((c.min_mag for c in configs if "usgs" in c.sources), default=glob["min_mag"])
+        rw_limit, rw_app, firms_url = glob["rw_limit"], glob["rw_app"], glob["firms_url"]
+        nws = glob["nws_filters"]
+
+        fetchers = {
+            "usgs": lambda: self.fetch_usgs(min_mag),
+            "reliefweb": lambda: self.fetch_reliefweb_reports(rw_limit, rw_app),
+            "reliefweb_dis": lambda: self.fetch_reliefweb_disasters(rw_limit, rw_app),
+            "eonet": self.fetch_eonet,
+            "gdacs_json": self.fetch_gdacs_json,
+            "gdacs": self.fetch_gdacs_rss,
+            "who": self.fetch_who_don,
+            "copernicus": self.fetch_copernicus,
+            "firms": lambda: self.fetch_firms(firms_url),
+            "nws": lambda: self.fetch_nws(*nws),
+            "nhc": self.fetch_nhc,
+            "ptwc": self.fetch_ptwc,
+            "gvp": self.fetch_gvp,
+            "floodlist": self.fetch_floodlist,
+        }
+        if not firms_url:
+            wanted.discard("firms")
+        return [fetchers[src]() for src in fetchers if src in wanted]
+
+    @staticmethod
+    def _is_severe(source: str, sev, e: discord.Embed, ping_mag: float) -> bool:
+        if source == "usgs":
+            return (sev or 0) >= ping_mag
+        if source in ("gdacs", "gdacs_json"):
+            return sev == "Red"
+        if source == "nws" and isinstance(sev, str):
+            return sev.lower() in {"extreme", "severe"}
+        if source == "ptwc":
+            return True  # tsunami alerts are always ping-worthy
+        if source == "nhc":
+            return "warning" in e.title.lower() or "watch" in e.title.lower()
+        return False
+
+    async def _handle_items(self, batch, configs: list[GuildDisasterConfig]):
+        """
+        De-dupe once, then fan each new item out to every guild whose filters accept it.
+        Known items whose fingerprint changed are edited in place instead of re-posted.
+        """
+        if not batch:
+            return
+        known = await self.storage.get_fingerprints([(source, eid) for source, eid, *_ in batch])
+        map_jobs = self._start_maps(batch, known, configs)
+        # severe items first, so nothing queued behind a map render delays a ping
+        batch = sorted(batch, key=lambda it: not any(self._is_severe(it[0], it[2], it[3], c.ping_mag) for c in configs))
+        seen_rows, post_rows, event_rows = [], [], []
+        for source, eid, sev, e, meta in batch:
+            fp = fingerprint(sev, e)
+            rank = severity_rank(source, sev, e)
+            prev = known.get((source, eid))
+            known[(source, eid)] = (fp, rank)
+            if prev is not None:
+                prev_fp, prev_rank = prev
+                if prev_fp == fp:
+                    continue
+            event_rows.append(event_row(source, eid, rank, e, meta))
+            if prev is not None:
+                if prev_fp is not None:  # rows from before fingerprinting just get one stored
+                    await self._apply_update(source, eid, sev, e, rank > (prev_rank or 0.0), configs)
+                seen_rows.append((source, eid, fp, rank))
+                continue
+
+            seq = None
             if source == "usgs":
-                severe = (sev or 0) >= ping_mag
-            elif source in ("gdacs", "gdacs_json"):
-                severe = (sev == "Red")
-            elif source == "nws" and isinstance(sev, str):
-                severe = sev.lower() in {"extreme", "severe"}
-            elif source == "ptwc":
-                severe = True  # tsunami alerts are always ping-worthy
-            elif source == "nhc":
-                severe = "warning" in e.title.lower() or "watch" in e.title.lower()
-            await self._post_realtime(e, severe=severe, alert_role_name=alert_role_name, channel_id=rt_channel_id)
-            self._collect_for_digest(source, eid, e)
-            await self.storage.mark_seen(source, eid)
+                seq = self.sequences.find(meta.get("lat"), meta.get("lon"), meta.get("time"), sev or 0.0)
+
+            hazard = hazard_type(source, e)
+            point = None
+            map_job = map_jobs.get((source, eid))
+            if meta.get("lat") is not None:
+                point = (meta["lat"], meta["lon"], hazard, marker_radius(hazard, rank))
+
+            sends = []
+            posted_channels = set()
+            entry = None
+            for cfg in configs:
+                if not cfg.wants(source, sev):
+                    continue
+                severe = self._is_severe(source, sev, e, cfg.ping_mag)
+                if cfg.digest:
+                    entry = entry or self._digest_entry(source, e, rank)
+                    self._collect_for_digest(cfg.guild_id, source, eid, entry, point)
+                # digest-only guilds never cost a realtime send; hybrid only goes live for severe items
+                if cfg.channel_id and cfg.realtime and (cfg.mode == "rt" or severe):
+                    if seq and not severe and cfg.channel_id in seq.posts:
+                        sends.append(self._post_followup(seq, cfg.channel_id, e))
+                    else:
+                        sends.append(self._post_realtime(e, severe=severe, alert_role_name=cfg.alert_role,
+                                                         channel_id=cfg.channel_id, map_job=map_job))
+                        posted_channels.add(cfg.channel_id)
+            msgs = list(await asyncio.gather(*sends)) if sends else []
+
+            if source == "usgs" and seq is None and (sev or 0.0) >= SEQ_MIN_MAG and meta.get("lat") is not None:
+                main = self.sequences.open(eid, meta["lat"], meta["lon"], sev, meta.get("time"), title=e.title or eid)
+                main.posts.update({m.channel.id: m.id for m in msgs if m and m.channel.id in posted_channels})
+            msgs += await self._deliver_regional(e, meta, posted_channels)
+            post_rows += [(source, eid, m.channel.id, m.id, m.webhook_id) for m in msgs if m]
+            seen_rows.append((source, eid, fp, rank))
+        await self.storage.mark_seen_many(seen_rows)
+        await self.storage.record_posts(post_rows)
+        await self.storage.store_events(event_rows)
+
+    def _start_maps(self, batch, known: dict, configs: list[GuildDisasterConfig]) -> dict:
+        """Kick off map renders for every new mappable item up front so they run in parallel."""
+        jobs = {}
+        if not self.maps.enabled or not any(c.realtime and c.channel_id for c in configs):
+            return jobs
+        for source, eid, sev, e, meta in batch:
+            if (source, eid) in known or meta.get("lat") is None:
+                continue
+            hazard = hazard_type(source, e)
+            if hazard in MAP_HAZARDS:
+                jobs[(source, eid)] = asyncio.ensure_future(self.maps.event_map(
+                    (source, eid), meta["lat"], meta["lon"], hazard, severity_rank(source, sev, e)))
+        return jobs
+
+    async def _run_tick(self) -> int:
+        """Fetch + parse every needed source exactly once, then deliver to all guilds."""
+        glob = await self._global_config()
+        configs = await self._guild_configs(glob)
+        results = await asyncio.gather(*self._fetch_calls(glob, configs), return_exceptions=True)
+        fetched = 0
+        for res in results:
+            if isinstance(res, Exception):
+                logging.exception("Disasters: fetch error", exc_info=res)
+                continue
+            await self._handle_items(res, configs)
+            fetched += len(res)
+        return fetched
 
     # -------------------- slash: manual / status --------------------
 
@@ -673,164 +1286,347 @@ class Disasters(commands.Cog):
     @app_commands.command(name="disasters_now", description="Fetch and post the latest items now.")
     async def disasters_now(self, inter: discord.Interaction):
         await inter.response.defer(ephemeral=True, thinking=True)
-
-        # read current config
-        rt_channel_id = await self._get_int("DISASTER_CHANNEL_ID", int(os.getenv("DISASTER_CHANNEL_ID", "0") or 0))
-        alert_role = await self._get("ALERT_ROLE_NAME", os.getenv("ALERT_ROLE_NAME", "Disaster Alerts"))
-        min_mag = await self._get_float("USGS_MIN_MAG", float(os.getenv("USGS_MIN_MAG", "5.0")))
-        ping_mag = await self._get_float("USGS_PING_MAG", float(os.getenv("USGS_PING_MAG", "6.8")))
-        rw_limit = await self._get_int("RELIEFWEB_LIMIT", int(os.getenv("RELIEFWEB_LIMIT", "5") or 5))
-        rw_app = await self._get("RELIEFWEB_APPNAME", os.getenv("RELIEFWEB_APPNAME", "pal-discord-bot"))
-        firms_url = await self._get("FIRMS_URL", os.getenv("FIRMS_URL", ""))
-
-        use = {
-            "usgs": await self._get_bool("ENABLE_USGS", True),
-            "rw_reports": await self._get_bool("ENABLE_RELIEFWEB", True),
-            "rw_dis": await self._get_bool("ENABLE_RW_DISASTERS", False),
-            "eonet": await self._get_bool("ENABLE_EONET", True),
-            "gdacs_json": await self._get_bool("ENABLE_GDACS_JSON", True),
-            "gdacs": await self._get_bool("ENABLE_GDACS", True),
-            "who": await self._get_bool("ENABLE_WHO", True),
-            "copernicus": await self._get_bool("ENABLE_COPERNICUS", True),
-            "firms": await self._get_bool("ENABLE_FIRMS", False),
-            # Add these new ones:
-            "nws": await self._get_bool("ENABLE_NWS", False),
-            "nhc": await self._get_bool("ENABLE_NHC", True),
-            "ptwc": await self._get_bool("ENABLE_PTWC", True),
-            "gvp": await self._get_bool("ENABLE_GVP", True),
-            "floodlist": await self._get_bool("ENABLE_FLOODLIST", True),
-        }
-
-        calls = []
-        if use["usgs"]:         calls.append(self.fetch_usgs(min_mag))
-        if use["rw_reports"]:   calls.append(self.fetch_reliefweb_reports(rw_limit, rw_app))
-        if use["rw_dis"]:       calls.append(self.fetch_reliefweb_disasters(rw_limit, rw_app))
-        if use["eonet"]:        calls.append(self.fetch_eonet())
-        if use["gdacs_json"]:   calls.append(self.fetch_gdacs_json())
-        if use["gdacs"]:        calls.append(self.fetch_gdacs_rss())
-        if use["who"]:          calls.append(self.fetch_who_don())
-        if use["copernicus"]:   calls.append(self.fetch_copernicus())
-        if use["firms"] and firms_url: calls.append(self.fetch_firms(firms_url))
-        # Add these new fetchers:
-        if use["nws"]:          calls.append(self.fetch_nws())
-        if use["nhc"]:          calls.append(self.fetch_nhc())
-        if use["ptwc"]:         calls.append(self.fetch_ptwc())
-        if use["gvp"]:          calls.append(self.fetch_gvp())
-        if use["floodlist"]:    calls.append(self.fetch_floodlist())
-
-        results = await asyncio.gather(*calls, return_exceptions=True)
-        posted = 0
-        for res in results:
-            if isinstance(res, Exception):
-                logging.exception("Disasters: manual fetch error", exc_info=res)
-                continue
-            await self._handle_items(res, alert_role_name=alert_role, ping_mag=ping_mag, rt_channel_id=rt_channel_id)
-            posted += len(res)
-
+        posted = await self._run_tick()
         await inter.followup.send(f"Triggered fetch. Processed {posted} item(s).", ephemeral=True)
 
     @GUILD_DEC
     @app_commands.command(name="status", description="Show disaster watcher status.")
     async def status(self, interaction: discord.Interaction):
-        rt_channel_id = await self._get_int("DISASTER_CHANNEL_ID", int(os.getenv("DISASTER_CHANNEL_ID", "0") or 0))
-        gen_channel_id = await self._get_int("GENERAL_CHANNEL_ID", int(os.getenv("GENERAL_CHANNEL_ID", "0") or 0))
+        glob = await self._global_config()
+        configs = await self._guild_configs(glob)
+        cfg = next((c for c in configs if c.guild_id == interaction.guild_id), None)
         poll_min = await self._get_int("DISASTER_POLL_MINUTES", int(os.getenv("DISASTER_POLL_MINUTES", "5")))
-        digest_time = await self._get("DIGEST_TIME_UTC", os.getenv("DIGEST_TIME_UTC", "09:00"))
-        min_mag = await self._get("USGS_MIN_MAG", os.getenv("USGS_MIN_MAG", "5.0"))
-        ping_mag = await self._get("USGS_PING_MAG", os.getenv("USGS_PING_MAG", "6.8"))
-
-        # toggles
-        flags = []
-        for key, label in [
-            ("ENABLE_USGS", "USGS"),
-            ("ENABLE_RELIEFWEB", "ReliefWeb Reports"),
-            ("ENABLE_RW_DISASTERS", "ReliefWeb Disasters"),
-            ("ENABLE_EONET", "EONET"),
-            ("ENABLE_GDACS_JSON", "GDACS JSON"),
-            ("ENABLE_GDACS", "GDACS RSS"),
-            ("ENABLE_WHO", "WHO"),
-            ("ENABLE_COPERNICUS", "Copernicus"),
-            ("ENABLE_FIRMS", "FIRMS"),
-        ]:
-            flags.append(f"{label}:{await self._get(key, 'true')}")
 
         e = discord.Embed(title="🛰️ Disaster Watcher — Status", color=discord.Color.greyple())
-        e.add_field(name="Realtime Channel", value=str(rt_channel_id), inline=True)
-        e.add_field(name="Digest Channel", value=str(gen_channel_id), inline=True)
-        e.add_field(name="Poll Interval", value=f"{poll_min} min", inline=True)
-        e.add_field(name="Digest Time (UTC)", value=digest_time, inline=True)
-        e.add_field(name="USGS Min/Ping", value=f"{min_mag}/{ping_mag}", inline=True)
-        e.add_field(name="Sources", value=" • ".join(flags), inline=False)
+        if cfg:
+            e.add_field(name="Realtime Channel", value=str(cfg.channel_id or "—"), inline=True)
+            e.add_field(name="Digest Channel", value=str(cfg.digest_channel_id or "—"), inline=True)
+            e.add_field(name="Poll Interval", value=f"{poll_min} min", inline=True)
+            e.add_field(name="Digest Time (UTC)", value=cfg.digest_time, inline=True)
+            e.add_field(name="Mode", value=cfg.mode, inline=True)
+            queued = self._digest_items.get(cfg.guild_id)
+            e.add_field(name="Digest Queue", value=f"{len(queued) if queued else 0}/{DIGEST_MAX_ITEMS}", inline=True)
+            e.add_field(name="USGS Min/Ping", value=f"{cfg.min_mag}/{cfg.ping_mag}", inline=True)
+            e.add_field(name="Alert Role", value=cfg.alert_role or "—", inline=True)
+            e.add_field(name="Sources", value=" • ".join(sorted(cfg.sources)) or "—", inline=False)
+        else:
+            e.add_field(name="This Server", value="Not receiving alerts (see `/sources_guild_set`).", inline=False)
+            e.add_field(name="Poll Interval", value=f"{poll_min} min", inline=True)
+        e.add_field(name="Guilds Served", value=str(len(configs)), inline=True)
         e.add_field(name="Last Poll UTC", value=(self._last_poll_dt.isoformat() if self._last_poll_dt else "—"), inline=True)
         e.add_field(name="Last Poll Fetched", value=str(self._last_poll_fetched), inline=True)
         await interaction.response.send_message(embed=e, ephemeral=True)
 
+
+    @GUILD_DEC
+    @app_commands.command(name="disaster_stats", description="Event counts and peak severity by hazard, region and source.")
+    @app_commands.describe(period="Time window")
+    @app_commands.choices(period=[
+        app_commands.Choice(name="Last day", value="day"),
+        app_commands.Choice(name="Last week", value="week"),
+        app_commands.Choice(name="Last month", value="month"),
+        app_commands.Choice(name="Last year", value="year"),
+    ])
+    async def disaster_stats(self, inter: discord.Interaction, period: app_commands.Choice[str] | None = None):
+        key = period.value if period else "week"
+        days = STATS_PERIODS[key]
+        since = int(datetime.now(timezone.utc).timestamp()) - days * 86400
+        grain = "hour" if days == 1 else "day"
+
+        e = discord.Embed(title=f"📊 Disaster Stats — last {key}", color=discord.Color.dark_teal())
+        total = 0
+        for group_by, label, top in (("hazard", "By Hazard", 10), ("region", "By Region", 10), ("source", "By Source", 14)):
+            rows = await self.storage.rollup_stats(since, group_by, grain)
+            if group_by == "source":
+                total = sum(r[1] for r in rows)
+            lines = [f"**{k or '—'}** — {n}" + (f" (max {mx:g})" if mx else "") for k, n, mx in rows[:top]]
+            if len(rows) > top:
+                lines.append(f"…and {len(rows) - top} more")
+            e.add_field(name=label, value="\n".join(lines)[:1024] or "—", inline=group_by != "source")
+        e.description = f"{total} event(s) recorded."
+        e.set_footer(text="Max = USGS magnitude, GDACS/NWS/NHC alert level; other sources report none.")
+        await inter.response.send_message(embed=e, ephemeral=True)
+
+    # -------------------- slash: regional subscriptions --------------------
+
+    @GUILD_DEC
+    @app_commands.command(name="alert_region_add", description="Get disaster alerts for a region (box, radius or country).")
+    @app_commands.describe(
+        kind="Region type",
+        deliver="Where matching alerts go",
+        channel="Target channel (channel delivery, Manage Server required)",
+        country="ISO-3 country code, e.g. PHL (country regions)",
+        lat="Centre latitude (radius regions)",
+        lon="Centre longitude (radius regions)",
+        radius_km="Radius in km (radius regions)",
+        min_lat="South edge (box regions)",
+        min_lon="West edge (box regions; may exceed max_lon to cross 180°)",
+        max_lat="North edge (box regions)",
+        max_lon="East edge (box regions)",
+        label="Optional name for this region",
+    )
+    @app_commands.choices(
+        kind=[
+            app_commands.Choice(name="Bounding box", value="bbox"),
+            app_commands.Choice(name="Radius around a point", value="circle"),
+            app_commands.Choice(name="Country", value="country"),
+        ],
+        deliver=[
+            app_commands.Choice(name="Direct message", value="user"),
+            app_commands.Choice(name="Channel", value="channel"),
+        ],
+    )
+    async def alert_region_add(
+        self,
+        inter: discord.Interaction,
+        kind: app_commands.Choice[str],
+        deliver: app_commands.Choice[str] | None = None,
+        channel: discord.TextChannel | None = None,
+        country: str | None = None,
+        lat: float | None = None,
+        lon: float | None = None,
+        radius_km: float | None = None,
+        min_lat: float | None = None,
+        min_lon: float | None = None,
+        max_lat: float | None = None,
+        max_lon: float | None = None,
+        label: str | None = None,
+    ):
+        target_type = deliver.value if deliver else "user"
+        if target_type == "channel":
+            if not inter.user.guild_permissions.manage_guild:
+                return await inter.response.send_message("🚫 Manage Server required for channel subscriptions.", ephemeral=True)
+            target_id = (channel or inter.channel).id
+        else:
+            target_id = inter.user.id
+            mine = [s for s in self.geo.list_guild(inter.guild_id) if s.target_type == "user" and s.target_id == target_id]
+            if len(mine) >= GEO_MAX_PER_USER:
+                return await inter.response.send_message(f"❌ You already have {GEO_MAX_PER_USER} regions. Remove one first.", ephemeral=True)
+
+        sub = GeoSub(id=0, guild_id=inter.guild_id, target_type=target_type, target_id=target_id,
+                     kind=kind.value, label=label, created_by=inter.user.id)
+        if kind.value == "country":
+            code = (country or "").strip().upper()
+            if len(code) != 3 or not code.isalpha():
+                return await inter.response.send_message("❌ Give a 3-letter ISO country code (e.g. `PHL`).", ephemeral=True)
+            sub.country = code
+        elif kind.value == "circle":
+            if lat is None or lon is None or not radius_km or radius_km <= 0:
+                return await inter.response.send_message("❌ Radius regions need `lat`, `lon` and a positive `radius_km`.", ephemeral=True)
+            if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                return await inter.response.send_message("❌ Latitude/longitude out of range.", ephemeral=True)
+            sub.lat, sub.lon, sub.radius_km = lat, lon, min(radius_km, 20000.0)
+        else:
+            if None in (min_lat, min_lon, max_lat, max_lon):
+                return await inter.response.send_message("❌ Box regions need `min_lat`, `min_lon`, `max_lat` and `max_lon`.", ephemeral=True)
+            if not (-90 <= min_lat < max_lat <= 90 and -180 <= min_lon <= 180 and -180 <= max_lon <= 180):
+                return await inter.response.send_message("❌ Box edges out of range (south must be below north).", ephemeral=True)
+            sub.min_lat, sub.min_lon, sub.max_lat, sub.max_lon = min_lat, min_lon, max_lat, max_lon
+
+        sub = await self.geo.add(sub)
+        where = f"<#{target_id}>" if target_type == "channel" else "your DMs"
+        await inter.response.send_message(f"✅ Region #{sub.id} ({sub.describe()}) → alerts go to {where}.", ephemeral=True)
+
+    @GUILD_DEC
+    @app_commands.command(name="alert_region_list", description="List your regional disaster alert subscriptions.")
+    async def alert_region_list(self, inter: discord.Interaction):
+        staff = inter.user.guild_permissions.manage_guild
+        subs = [s for s in self.geo.list_guild(inter.guild_id)
+                if (s.target_type == "user" and s.target_id == inter.user.id) or (staff and s.target_type == "channel")]
+        if not subs:
+            return await inter.response.send_message("No regions yet. Add one with `/alert_region_add`.", ephemeral=True)
+        lines = []
+        for s in subs[:40]:
+            where = f"<#{s.target_id}>" if s.target_type == "channel" else "DM"
+            lines.append(f"`#{s.id}` {s.label or s.describe()} → {where}")
+        e = discord.Embed(title="🗺️ Regional Alert Subscriptions", description="\n".join(lines), color=discord.Color.teal())
+        await inter.response.send_message(embed=e, ephemeral=True)
+
+    @GUILD_DEC
+    @app_commands.command(name="alert_region_remove", description="Remove a regional disaster alert subscription.")
+    @app_commands.describe(region_id="ID shown in /alert_region_list")
+    async def alert_region_remove(self, inter: discord.Interaction, region_id: int):
+        sub = self.geo.index.get(region_id)
+        if not sub or sub.guild_id != inter.guild_id:
+            return await inter.response.send_message("❌ No such region.", ephemeral=True)
+        own = sub.target_type == "user" and sub.target_id == inter.user.id
+        if not own and not inter.user.guild_permissions.manage_guild:
+            return await inter.response.send_message("🚫 You can only remove your own regions.", ephemeral=True)
+        await self.geo.remove(region_id)
+        await inter.response.send_message(f"🗑️ Region #{region_id} removed.", ephemeral=True)
+
+    # -------------------- backfill (history only, never posts) --------------------
+
+    def _start_backfill(self):
+        self._backfill_stop.clear()
+        if self._backfill_task and not self._backfill_task.done():
+            return  # the running task re-reads progress and picks up new jobs itself
+        self._backfill_task = asyncio.create_task(self._run_backfill())
+
+    async def _run_backfill(self):
+        await self.bot.wait_until_ready()
+        appname = await self._get("RELIEFWEB_APPNAME", os.getenv("RELIEFWEB_APPNAME", "pal-discord-bot"))
+        while not self._backfill_stop.is_set():
+            jobs = [j for j in await self.backfill.all() if j.status == "running"]
+            if not jobs:
+                break
+            await self._backfill_source(jobs[0], appname)
+        logging.info("Disasters: backfill idle.")
+
+    async def _backfill_source(self, job, appname: str):
+        step = int(BACKFILL_CHUNK_DAYS[job.source] * 86400)
+        cursor = job.cursor
+        logging.info("Disasters: backfilling %s from %s.", job.source, datetime.fromtimestamp(cursor, timezone.utc).isoformat())
+        try:
+            while cursor < job.end_at:
+                if self._backfill_stop.is_set():
+                    await self.backfill.set_status(job.source, "stopped")
+                    return
+                t1 = min(cursor + step, job.end_at)
+                items = await self._backfill_chunk(job, cursor, t1, appname)
+                await self.storage.store_events([event_row(src, eid, severity_rank(src, sev, e), e, meta)
+                                                 for src, eid, sev, e, meta in items])
+                await self.storage.seed_seen_many([(src, eid, fingerprint(sev, e), severity_rank(src, sev, e))
+                                                   for src, eid, sev, e, _ in items])
+                await self.backfill.advance(job.source, t1, len(items))
+                cursor = t1
+            await self.backfill.set_status(job.source, "done")
+            logging.info("Disasters: backfill of %s complete.", job.source)
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            logging.exception("Disasters: backfill of %s failed", job.source, exc_info=ex)
+            await self.backfill.set_status(job.source, "error", str(ex)[:200])
+
+    async def _backfill_request(self, method: str, url: str, **kwargs) -> dict:
+        """One request under the shared backfill rate limit, retried with backoff."""
+        for attempt in range(4):
+            await self._backfill_limiter.wait()
+            try:
+                async with self._session.request(method, url, timeout=60, **kwargs) as r:
+                    r.raise_for_status()
+                    return await r.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+                if attempt == 3:
+                    raise
+                logging.warning("Disasters: backfill request failed (%s); retrying.", ex)
+                await asyncio.sleep(5 * 2 ** attempt)
+        return {}
+
+    async def _backfill_chunk(self, job, t0: int, t1: int, appname: str) -> list:
+        d0 = datetime.fromtimestamp(t0, timezone.utc)
+        d1 = datetime.fromtimestamp(t1, timezone.utc)
+        if job.source == "usgs":
+            data = await self._backfill_request("GET", USGS_FDSN, params={
+                "format": "geojson", "starttime": d0.isoformat(), "endtime": d1.isoformat(),
+                "minmagnitude": job.min_mag, "orderby": "time-asc",
+            })
+            return self._usgs_items(data, job.min_mag)
+        if job.source == "eonet":
+            data = await self._backfill_request("GET", EONET, params={
+                "status": "all", "start": d0.strftime("%Y-%m-%d"), "end": d1.strftime("%Y-%m-%d"),
+            })
+            return self._eonet_items(data)
+
+        if job.source == "reliefweb":
+            url, payload, parse = RELIEFWEB_REPORTS, self._rw_reports_payload, self._rw_report_items
+        else:
+            url, payload, parse = RELIEFWEB_DISASTERS, self._rw_disasters_payload, self._rw_disaster_items
+        out, offset = [], 0
+        created = {"from": d0.isoformat(), "to": d1.isoformat()}
+        while True:
+            data = await self._backfill_request("POST", url, json=payload(RW_PAGE_SIZE, appname, created, offset))
+            page = data.get("data") or []
+            out += parse(data)
+            offset += len(page)
+            if len(page) < RW_PAGE_SIZE or offset >= (data.get("totalCount") or 0):
+                return out
+
+    @GUILD_DEC
+    @app_commands.command(name="disasters_backfill", description="(Staff) Load past events into history without posting them.")
+    @app_commands.describe(
+        days="How far back to go",
+        sources="Comma list of usgs, reliefweb, reliefweb_dis, eonet (default: all four)",
+        min_mag="USGS minimum magnitude (default: USGS_MIN_MAG)",
+        restart="Start a fresh window instead of resuming an unfinished one",
+    )
+    async def disasters_backfill(
+        self,
+        inter: discord.Interaction,
+        days: app_commands.Range[int, 1, BACKFILL_MAX_DAYS] = 30,
+        sources: str | None = None,
+        min_mag: float | None = None,
+        restart: bool = False,
+    ):
+        if not inter.user.guild_permissions.manage_guild:
+            return await inter.response.send_message("🚫 Manage Server required.", ephemeral=True)
+        wanted = [x.strip().lower() for x in (sources or ",".join(BACKFILL_CHUNK_DAYS)).split(",") if x.strip()]
+        unknown = [x for x in wanted if x not in BACKFILL_CHUNK_DAYS]
+        if unknown or not wanted:
+            return await inter.response.send_message(
+                f"❌ Unknown source(s): {', '.join(unknown) or '—'}. Use: {', '.join(BACKFILL_CHUNK_DAYS)}.", ephemeral=True)
+
+        if min_mag is None:
+            min_mag = await self._get_float("USGS_MIN_MAG", float(os.getenv("USGS_MIN_MAG", "5.0")))
+        now = int(datetime.now(timezone.utc).timestamp())
+        lines = []
+        for src in wanted:
+            job = await self.backfill.get(src)
+            if job and not job.finished and not restart:
+                await self.backfill.set_status(src, "running")
+                lines.append(f"• **{src}** resumed at {job.pct:.0f}%")
+            else:
+                await self.backfill.start(src, now - days * 86400, now, min_mag if src == "usgs" else None)
+                lines.append(f"• **{src}** last {days} day(s)")
+        self._start_backfill()
+        await inter.response.send_message(
+            "✅ Backfill running in the background (nothing is posted):\n" + "\n".join(lines)
+            + "\nCheck progress with `/disasters_backfill_status`.", ephemeral=True)
+
+    @GUILD_DEC
+    @app_commands.command(name="disasters_backfill_status", description="(Staff) Show history backfill progress.")
+    async def disasters_backfill_status(self, inter: discord.Interaction):
+        if not inter.user.guild_permissions.manage_guild:
+            return await inter.response.send_message("🚫 Manage Server required.", ephemeral=True)
+        jobs = await self.backfill.all()
+        if not jobs:
+            return await inter.response.send_message("No backfill has been run yet.", ephemeral=True)
+        e = discord.Embed(title="🗄️ Disaster History Backfill", color=discord.Color.greyple())
+        for j in jobs:
+            since = datetime.fromtimestamp(j.start_at, timezone.utc).strftime("%Y-%m-%d")
+            value = f"{j.status} • {j.pct:.0f}% • {j.items} item(s) since {since}"
+            if j.error:
+                value += f"\n`{j.error[:100]}`"
+            e.add_field(name=j.source, value=value, inline=False)
+        await inter.response.send_message(embed=e, ephemeral=True)
+
+    @GUILD_DEC
+    @app_commands.command(name="disasters_backfill_stop", description="(Staff) Pause the history backfill (resume with /disasters_backfill).")
+    async def disasters_backfill_stop(self, inter: discord.Interaction):
+        if not inter.user.guild_permissions.manage_guild:
+            return await inter.response.send_message("🚫 Manage Server required.", ephemeral=True)
+        self._backfill_stop.set()
+        for j in await self.backfill.all():
+            if j.status == "running":
+                await self.backfill.set_status(j.source, "stopped")
+        await inter.response.send_message("⏸️ Backfill paused after the current chunk.", ephemeral=True)
+
     # -------------------- loops --------------------
 
     @tasks.loop(minutes=5, reconnect=True)
     async def poll_disasters(self):
         try:
-            # refresh dynamic intervals / channels every cycle
+            # refresh dynamic interval every cycle
             interval = await self._get_int("DISASTER_POLL_MINUTES", int(os.getenv("DISASTER_POLL_MINUTES", "5")))
-            if self.poll_disasters.seconds // 60 != interval:
+            if self.poll_disasters.minutes != interval:
                 self.poll_disasters.change_interval(minutes=interval)
 
-            rt_channel_id = await self._get_int("DISASTER_CHANNEL_ID", int(os.getenv("DISASTER_CHANNEL_ID", "0") or 0))
-            alert_role = await self._get("ALERT_ROLE_NAME", os.getenv("ALERT_ROLE_NAME", "Disaster Alerts"))
-            min_mag = await self._get_float("USGS_MIN_MAG", float(os.getenv("USGS_MIN_MAG", "5.0")))
-            ping_mag = await self._get_float("USGS_PING_MAG", float(os.getenv("USGS_PING_MAG", "6.8")))
-            rw_limit = await self._get_int("RELIEFWEB_LIMIT", int(os.getenv("RELIEFWEB_LIMIT", "5") or 5))
-            rw_app = await self._get("RELIEFWEB_APPNAME", os.getenv("RELIEFWEB_APPNAME", "pal-discord-bot"))
-            firms_url = await self._get("FIRMS_URL", os.getenv("FIRMS_URL", ""))
-
-            use = {
-                "usgs": await self._get_bool("ENABLE_USGS", True),
-                "rw_reports": await self._get_bool("ENABLE_RELIEFWEB", True),
-                "rw_dis": await self._get_bool("ENABLE_RW_DISASTERS", False),
-                "eonet": await self._get_bool("ENABLE_EONET", True),
-                "gdacs_json": await self._get_bool("ENABLE_GDACS_JSON", True),
-                "gdacs": await self._get_bool("ENABLE_GDACS", True),
-                "who": await self._get_bool("ENABLE_WHO", True),
-                "copernicus": await self._get_bool("ENABLE_COPERNICUS", True),
-                "firms": await self._get_bool("ENABLE_FIRMS", False),
-                # Add these new ones:
-                "nws": await self._get_bool("ENABLE_NWS", False),
-                "nhc": await self._get_bool("ENABLE_NHC", True),
-                "ptwc": await self._get_bool("ENABLE_PTWC", True),
-                "gvp": await self._get_bool("ENABLE_GVP", True),
-                "floodlist": await self._get_bool("ENABLE_FLOODLIST", True),
-            }
-
             logging.info("Disasters: polling sources...")
-            calls = []
-            if use["usgs"]:         calls.append(self.fetch_usgs(min_mag))
-            if use["rw_reports"]:   calls.append(self.fetch_reliefweb_reports(rw_limit, rw_app))
-            if use["rw_dis"]:       calls.append(self.fetch_reliefweb_disasters(rw_limit, rw_app))
-            if use["eonet"]:        calls.append(self.fetch_eonet())
-            if use["gdacs_json"]:   calls.append(self.fetch_gdacs_json())
-            if use["gdacs"]:        calls.append(self.fetch_gdacs_rss())
-            if use["who"]:          calls.append(self.fetch_who_don())
-            if use["copernicus"]:   calls.append(self.fetch_copernicus())
-            if use["firms"] and firms_url: calls.append(self.fetch_firms(firms_url))
-            # Add these new fetchers:
-            if use["nws"]:          calls.append(self.fetch_nws())
-            if use["nhc"]:          calls.append(self.fetch_nhc())
-            if use["ptwc"]:         calls.append(self.fetch_ptwc())
-            if use["gvp"]:          calls.append(self.fetch_gvp())
-            if use["floodlist"]:    calls.append(self.fetch_floodlist())
-
-            results = await asyncio.gather(*calls, return_exceptions=True)
-
-            fetched = 0
-            for res in results:
-                if isinstance(res, Exception):
-                    logging.exception("Disasters: fetch error", exc_info=res)
-                    continue
-                await self._handle_items(res, alert_role_name=alert_role, ping_mag=ping_mag, rt_channel_id=rt_channel_id)
-                fetched += len(res)
+            fetched = await self._run_tick()
 
             self._last_poll_dt = datetime.now(timezone.utc)
             self._last_poll_fetched = fetched
+            await self.storage.prune_hourly_rollups()
             logging.info("Disasters: poll complete — %s items (pre de-dupe).", fetched)
         except Exception as e:
             logging.exception("Disasters: poll loop error", exc_info=e)
@@ -839,52 +1635,62 @@ class Disasters(commands.Cog):
     async def _wait_ready_poll(self):
         await self.bot.wait_until_ready()
 
-    @tasks.loop(minutes=1)
-    async def check_digest(self):
+    async def _maybe_post_digest(self, cfg: GuildDisasterConfig, now_dt: datetime):
+        channel_id = cfg.digest_channel_id or cfg.channel_id
+        if not cfg.digest or not channel_id:
+            return
         try:
-            general_channel_id = await self._get_int("GENERAL_CHANNEL_ID", int(os.getenv("GENERAL_CHANNEL_ID", "0") or 0))
-            if not general_channel_id:
-                return
-            tstr = await self._get("DIGEST_TIME_UTC", os.getenv("DIGEST_TIME_UTC", "09:00"))
-            try:
-                hh, mm = map(int, tstr.split(":"))
-                target = dtime(hour=hh, minute=mm, tzinfo=timezone.utc)
-            except Exception:
-                target = dtime(hour=9, minute=0, tzinfo=timezone.utc)
+            hh, mm = map(int, cfg.digest_time.split(":"))
+            target = dtime(hour=hh, minute=mm, tzinfo=timezone.utc)
+        except Exception:
+            target = dtime(hour=9, minute=0, tzinfo=timezone.utc)
 
-            now_dt = datetime.now(timezone.utc)
-            today_key = now_dt.strftime("%Y-%m-%d")
-            if self._last_digest_date == today_key:
-                return
+        today_key = now_dt.strftime("%Y-%m-%d")
+        if self._last_digest_date.get(cfg.guild_id) == today_key:
+            return
 
-            target_dt = datetime.combine(now_dt.date(), target)
-            if abs((now_dt - target_dt).total_seconds()) > 90:
-                return
+        target_dt = datetime.combine(now_dt.date(), target)
+        if abs((now_dt - target_dt).total_seconds()) > 90:
+            return
 
-            if not self._digest_items:
-                logging.info("Disasters: digest window hit, but no items collected.")
-                self._last_digest_date = today_key
-                return
+        q = self._digest_items.get(cfg.guild_id)
+        if not q:
+            logging.info("Disasters: digest window hit for guild %s, but no items collected.", cfg.guild_id)
+            self._last_digest_date[cfg.guild_id] = today_key
+            return
 
-            ch = self._channel(general_channel_id)
-            if not ch:
-                logging.warning("Disasters: GENERAL_CHANNEL_ID not found.")
-                return
+        ch = self._channel(channel_id)
+        if not ch:
+            logging.warning("Disasters: digest channel %s not found.", channel_id)
+            return
 
-            header = emb(
-                "🗞️ Daily Disaster Digest",
-                f"Collected updates until {now_dt.isoformat()}",
-                source="reliefweb",
-                ts=now_dt,
-            )
-            await self._safe_send(ch, embed=header)
-            for e in self._digest_items:
-                await self._safe_send(ch, embed=e)
-
-            self._digest_items.clear()
-            self._digest_seen_today.clear()
-            self._last_digest_date = today_key
-            logging.info("Disasters: posted daily digest.")
+        header = emb(
+            "🗞️ Daily Disaster Digest",
+            f"{len(q) + q.dropped} update(s) collected until {now_dt.isoformat()}",
+            source="reliefweb",
+            ts=now_dt,
+        )
+        digest_map = None
+        if q.points and self.maps.enabled:
+            if q.map_task and not q.map_task.done():
+                await q.map_task
+            await self._refresh_digest_map(q)  # picks up anything added since the last incremental draw
+            if q.map_png:
+                header, digest_map = self._with_map(header, q.map_png, "digest_map.png")
+        for i, batch in enumerate(pack_embeds([header] + digest_embeds(q.entries(), q.dropped))):
+            await self._safe_send(ch, embeds=batch, file=digest_map if i == 0 else None)
+
+        self._digest_items.pop(cfg.guild_id, None)
+        self._last_digest_date[cfg.guild_id] = today_key
+        logging.info("Disasters: posted daily digest for guild %s.", cfg.guild_id)
+
+    @tasks.loop(minutes=1)
+    async def check_digest(self):
+        try:
+            configs = await self._guild_configs(await self._global_config())
+            now_dt = datetime.now(timezone.utc)
+            for cfg in configs:
+                await self._maybe_post_digest(cfg, now_dt)
         except Exception as e:
             logging.exception("Disasters: check_digest error", exc_info=e)
 
@@ -892,6 +1698,12 @@ class Disasters(commands.Cog):
     async def _wait_ready_digest(self):
         await self.bot.wait_until_ready()
 
+    @tasks.loop(minutes=15)
+    async def expire_sequences(self):
+        dropped = self.sequences.expire()
+        if dropped:
+            logging.info("Disasters: closed %s quake sequence(s); %s still open.", dropped, len(self.sequences))
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Disasters(bot))
@@ -0,0 +1,93 @@
+# cogs/leaderboards.py
+import os
+from datetime import datetime, timezone
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+from services.leaderboards import Leaderboards, period_keys
+
+_GUILD_ID_RAW = os.getenv("GUILD_ID") or ""
+GUILD_ID = int(_GUILD_ID_RAW) if _GUILD_ID_RAW.isdigit() else None
+GUILD_DEC = app_commands.guilds(GUILD_ID) if GUILD_ID else (lambda f: f)
+
+BOARD_LABELS = {"xp": ("XP", "XP"), "rep": ("Reputation", "rep"), "recruits": ("Recruiters", "invites"),
+                "raids": ("Raiders", "raids")}
+WINDOW_LABELS = {"week": "This week", "month": "This month", "season": "Season"}
+MEDALS = ["🥇", "🥈", "🥉"]
+
+
+class LeaderboardsCog(commands.Cog):
+    """Weekly / monthly / season standings for XP, reputation, recruiting and raids."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.boards = Leaderboards()
+
+    async def cog_load(self):
+        await self.boards.init()
+
+    @GUILD_DEC
+    @app_commands.command(name="standings", description="Weekly, monthly or season leaderboard for XP, rep, recruiting or raids.")
+    @app_commands.choices(
+        board=[app_commands.Choice(name=label, value=key) for key, (label, _) in BOARD_LABELS.items()],
+        window=[app_commands.Choice(name=label, value=key) for key, label in WINDOW_LABELS.items()],
+    )
+    @app_commands.describe(season="Past season number (from /seasons); defaults to the current one")
+    async def standings(self, inter: discord.Interaction, board: app_commands.Choice[str],
+                        window: app_commands.Choice[str], season: int | None = None):
+        g = inter.guild
+        title = f"{BOARD_LABELS[board.value][0]} — {WINDOW_LABELS[window.value]}"
+        if window.value == "season":
+            if season is None:
+                current = await self.boards.current_season(g.id)
+                if not current:
+                    return await inter.response.send_message("No season running. Staff can start one with `/season_start`.", ephemeral=True)
+                season, title = current.season_id, f"{title}: {current.name}"
+            period = f"s{season}"
+        else:
+            week, month = period_keys()
+            period = week if window.value == "week" else month
+
+        rows = await self.boards.top(board.value, g.id, period, limit=10)
+        unit = BOARD_LABELS[board.value][1]
+        lines = []
+        for i, (uid, score) in enumerate(rows):
+            m = g.get_member(uid)
+            name = m.display_name if m else f"<@{uid}>"
+            lines.append(f"{MEDALS[i] if i < 3 else f'**{i + 1}.**'} {name} — {score:,} {unit}")
+        e = discord.Embed(title=f"🏆 {title}", description="\n".join(lines) or "No activity yet in this period.",
+                          color=discord.Color.purple())
+        await inter.response.send_message(embed=e, ephemeral=True)
+
+    @GUILD_DEC
+    @app_commands.command(name="season_start", description="(Staff) End the current season and start a new one.")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def season_start(self, inter: discord.Interaction, name: str):
+        s = await self.boards.start_season(inter.guild.id, name[:60])
+        await inter.response.send_message(f"✅ Season **#{s.season_id} — {s.name}** started. Earlier seasons stay viewable with `/standings`.", ephemeral=True)
+
+    @GUILD_DEC
+    @app_commands.command(name="season_end", description="(Staff) End the current season without starting another.")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def season_end(self, inter: discord.Interaction):
+        s = await self.boards.end_season(inter.guild.id)
+        if not s:
+            return await inter.response.send_message("❌ No season is running.", ephemeral=True)
+        await inter.response.send_message(f"✅ Season **#{s.season_id} — {s.name}** ended.", ephemeral=True)
+
+    @GUILD_DEC
+    @app_commands.command(name="seasons", description="List this server's leaderboard seasons.")
+    async def seasons(self, inter: discord.Interaction):
+        seasons = await self.boards.seasons(inter.guild.id)
+        if not seasons:
+            return await inter.response.send_message("No seasons yet.", ephemeral=True)
+        fmt = lambda ts: datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")
+        lines = [f"**#{s.season_id}** {s.name} — {fmt(s.started_at)} → {fmt(s.ended_at) if s.ended_at else 'now'}"
+                 for s in seasons[:20]]
+        await inter.response.send_message("📅 Seasons:\n" + "\n".join(lines), ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(LeaderboardsCog(bot))
@@ -1,16 +1,27 @@
 # cogs/leveling.py
-import os, random, time, asyncio
+import io, os, random, time, asyncio, logging
+from bisect import bisect_right
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 import aiosqlite
+from services.backfill import RateLimiter
+from services.rank_index import RankIndex
+from services.leaderboards import Leaderboards
+from services.user_stats import UserStats
+from services.rank_card import CardRenderer, CardData, verified_badges, accent_for
+from dataclasses import dataclass
 from datetime import datetime, timezone, date
 
 # ---------- ENV ----------
 DB_PATH = os.getenv("DB_PATH", "pal_bot.sqlite")
 
 LEVEL_ANNOUNCE = (os.getenv("LEVEL_ANNOUNCE", "true").lower() in {"1","true","yes","on"})
+TOP_PAGE_SIZE = 10
 LEVEL_COOLDOWN = int(os.getenv("LEVEL_COOLDOWN_SEC", "60") or 60)
+# Level-ups in one channel within this many seconds share one message (0 = post each right away)
+ANNOUNCE_WINDOW = float(os.getenv("LEVEL_ANNOUNCE_WINDOW_SEC", "5") or 0)
+ANNOUNCE_MAX = int(os.getenv("LEVEL_ANNOUNCE_MAX", "10") or 10)  # names per message; the rest become "N more"
 XP_MIN = int(os.getenv("LEVEL_XP_MIN", "15") or 15)
 XP_MAX = int(os.getenv("LEVEL_XP_MAX", "25") or 25)
 
@@ -25,6 +36,14 @@ STREAK_MAX = int(os.getenv("LEVEL_STREAK_MAX", "7") or 7)
 
 KEEP_PREV = (os.getenv("LEVEL_KEEP_PREVIOUS", "false").lower() in {"1","true","yes","on"})
 
+# Write-back: dirty rows hit the DB every FLUSH_SEC (or sooner once FLUSH_MAX pile up);
+# a crash loses at most that window of XP.
+FLUSH_SEC = int(os.getenv("LEVEL_FLUSH_SEC", "15") or 15)
+FLUSH_MAX = int(os.getenv("LEVEL_FLUSH_MAX", "500") or 500)
+
+# Ladder-role reconcile after /level_recompute: member edits per second
+ROLE_SYNC_RPS = float(os.getenv("LEVEL_ROLE_SYNC_RPS", "2") or 2)
+
 # Guild scoping for slash command fast sync
 _GUILD_ID_RAW = os.getenv("GUILD_ID") or ""
 GUILD_ID = int(_GUILD_ID_RAW) if _GUILD_ID_RAW.isdigit() else None
@@ -70,98 +89,488 @@ CREATE TABLE IF NOT EXISTS xp (
   streak      INTEGER NOT NULL DEFAULT 0,
   PRIMARY KEY (guild_id, user_id)
 );
+CREATE TABLE IF NOT EXISTS xp_levels (
+  level  INTEGER PRIMARY KEY,
+  total  INTEGER NOT NULL          -- cumulative XP to reach this level (mirror of XPCurve)
+);
+CREATE INDEX IF NOT EXISTS idx_xp_levels_total ON xp_levels(total);
+"""
+
+# level for an XP amount, resolved inside SQLite from the xp_levels mirror
+_LEVEL_OF = "(SELECT level FROM xp_levels WHERE total <= {x} ORDER BY total DESC, level DESC LIMIT 1)"
+
+# relative change (never below 0 XP); NULL fields leave the stored value alone
+ADD_SQL = f"""
+INSERT INTO xp (guild_id, user_id, xp, level, last_xp_ts, last_daily, streak)
+VALUES (:g, :u, MAX(0, :delta), {_LEVEL_OF.format(x="MAX(0, :delta)")}, COALESCE(:ts, 0), :daily, COALESCE(:streak, 0))
+ON CONFLICT(guild_id, user_id) DO UPDATE SET
+  xp         = MAX(0, xp.xp + :delta),
+  level      = {_LEVEL_OF.format(x="MAX(0, xp.xp + :delta)")},
+  last_xp_ts = MAX(xp.last_xp_ts, COALESCE(:ts, 0)),
+  last_daily = COALESCE(:daily, xp.last_daily),
+  streak     = COALESCE(:streak, xp.streak)
+RETURNING xp, level
 """
 
 class XPStore:
+    """
+    xp rows. Every write is one atomic UPSERT ... RETURNING, so concurrent writers
+    (message XP, /daily, referrals) never lose each other's increments and no
+    Python-side lock is needed; SQLite serialises the statements itself.
+    """
+
     def __init__(self, path=DB_PATH):
         self.path = path
-        self._lock = asyncio.Lock()
+        self._curve_key = None
 
     async def init(self):
         async with aiosqlite.connect(self.path) as db:
-            await db.execute(CREATE_SQL)
+            await db.execute("PRAGMA journal_mode=WAL")
+            await db.executescript(CREATE_SQL)
+            await self._sync_curve(db)
             await db.commit()
+        await Leaderboards(self.path).init()
+        await UserStats(self.path).init()
 
-    async def get_row(self, guild_id: int, user_id: int):
-        async with self._lock, aiosqlite.connect(self.path) as db:
-            await db.execute(CREATE_SQL)
-            cur = await db.execute("SELECT xp, level, last_xp_ts, last_daily, streak FROM xp WHERE guild_id=? AND user_id=?",
-                                   (guild_id, user_id))
-            row = await cur.fetchone()
-            if row:
-                return {"xp": row[0], "level": row[1], "last_ts": row[2], "last_daily": row[3], "streak": row[4]}
-            await db.execute("INSERT INTO xp (guild_id, user_id) VALUES (?,?)", (guild_id, user_id))
+    async def _sync_curve(self, db):
+        """Mirror the current XPCurve into xp_levels (once per process, and again if the curve changes)."""
+        curve = xp_curve()
+        if self._curve_key == curve.key:
+            return
+        await db.execute("DELETE FROM xp_levels")
+        await db.executemany("INSERT INTO xp_levels(level, total) VALUES (?,?)",
+                             [(lvl, total) for lvl, total in enumerate(curve.cumulative[:curve.max_level + 1])
+                              if total < 2**63])
+        self._curve_key = curve.key
+
+    async def load_all(self) -> dict[tuple[int, int], dict]:
+        async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute("SELECT guild_id, user_id, xp, level, last_xp_ts, last_daily, streak FROM xp")
+            return {(g, u): {"xp": xp, "level": lvl, "last_ts": ts, "last_daily": daily, "streak": streak}
+                    for g, u, xp, lvl, ts, daily, streak in await cur.fetchall()}
+
+    async def recompute_levels(self, guild_id: int) -> tuple[int, list[tuple[int, int]]]:
+        """Re-derive every stored level in a guild from the curve in one UPDATE; returns (rows, changed (user_id, level))."""
+        async with aiosqlite.connect(self.path) as db:
+            await self._sync_curve(db)
+            cur = await db.execute("SELECT COUNT(*) FROM xp WHERE guild_id=?", (guild_id,))
+            total = (await cur.fetchone())[0]
+            level_of = _LEVEL_OF.format(x="xp.xp")
+            cur = await db.execute(
+                f"UPDATE xp SET level = {level_of} WHERE guild_id=? AND level != {level_of} RETURNING user_id, level",
+                (guild_id,),
+            )
+            changed = [tuple(r) for r in await cur.fetchall()]
+            await db.executemany("UPDATE user_stats SET level=? WHERE guild_id=? AND user_id=?",
+                                 [(lvl, guild_id, u) for u, lvl in changed])
             await db.commit()
-            return {"xp": 0, "level": 0, "last_ts": 0, "last_daily": None, "streak": 0}
-
-    async def save_row(self, guild_id: int, user_id: int, data: dict):
-        fields = ["xp","level","last_xp_ts","last_daily","streak"]
-        values = [data.get("xp",0), data.get("level",0), data.get("last_ts",0), data.get("last_daily"), data.get("streak",0),
-                  guild_id, user_id]
-        async with self._lock, aiosqlite.connect(self.path) as db:
-            await db.execute(CREATE_SQL)
-            await db.execute(f"UPDATE xp SET {', '.join([f+'=?' for f in fields])} WHERE guild_id=? AND user_id=?", values)
+        return total, changed
+
+    async def add(self, guild_id: int, user_id: int, delta: int, *, last_ts: int | None = None,
+                  last_daily: str | None = None, streak: int | None = None) -> tuple[int, int]:
+        return (await self.add_many([(guild_id, user_id, delta, last_ts, last_daily, streak)]))[(guild_id, user_id)]
+
+    async def add_many(self, rows: list[tuple]) -> dict[tuple[int, int], tuple[int, int]]:
+        """Apply (guild_id, user_id, delta, last_ts, last_daily, streak) rows in one transaction; returns new (xp, level)."""
+        out: dict[tuple[int, int], tuple[int, int]] = {}
+        if not rows:
+            return out
+        async with aiosqlite.connect(self.path) as db:
+            await self._sync_curve(db)
+            for g, u, delta, ts, daily, streak in rows:
+                cur = await db.execute(ADD_SQL, {"g": g, "u": u, "delta": delta, "ts": ts, "daily": daily, "streak": streak})
+                out[(g, u)] = tuple(await cur.fetchone())
+            await Leaderboards.bump(db, "xp", [(g, u, delta) for g, u, delta, *_ in rows if delta > 0])
+            await UserStats.put_xp(db, [(g, u, xp, lvl) for (g, u), (xp, lvl) in out.items()])
             await db.commit()
+        return out
+
+class XPCache:
+    """
+    In-memory xp rows keyed by (guild_id, user_id). Every row is loaded once at
+    startup, so cooldown checks and gains are pure dict work. Changes are kept
+    as XP deltas and written back in batches by flush() as atomic increments,
+    which also picks up anything other writers added in the meantime. Each
+    guild's leaderboard order is kept alongside in a RankIndex.
+    """
+
+    def __init__(self, store: XPStore):
+        self.store = store
+        self.rows: dict[tuple[int, int], dict] = {}
+        self.dirty: set[tuple[int, int]] = set()
+        self.pending: dict[tuple[int, int], int] = {}  # XP not yet written
+        self.ranks: dict[int, RankIndex] = {}
+        self._flush_lock = asyncio.Lock()
+
+    async def load(self):
+        self.rows = await self.store.load_all()
+        by_guild: dict[int, dict[int, int]] = {}
+        for (g, u), row in self.rows.items():
+            by_guild.setdefault(g, {})[u] = row["xp"]
+        self.ranks = {g: RankIndex(scores) for g, scores in by_guild.items()}
+
+    def ranking(self, guild_id: int) -> RankIndex:
+        idx = self.ranks.get(guild_id)
+        if idx is None:
+            idx = self.ranks[guild_id] = RankIndex()
+        return idx
+
+    def get(self, guild_id: int, user_id: int) -> dict:
+        row = self.rows.get((guild_id, user_id))
+        if row is None:
+            row = self.rows[(guild_id, user_id)] = {"xp": 0, "level": 0, "last_ts": 0, "last_daily": None, "streak": 0}
+        return row
+
+    def add(self, guild_id: int, user_id: int, delta: int = 0, **fields) -> dict:
+        """Add XP (never below 0) and set last_ts / last_daily / streak; level follows the curve."""
+        key = (guild_id, user_id)
+        row = self.get(guild_id, user_id)
+        new_xp = max(0, row["xp"] + delta)
+        self.pending[key] = self.pending.get(key, 0) + new_xp - row["xp"]
+        row.update(fields, xp=new_xp, level=level_from_xp(new_xp))
+        self.ranking(guild_id).set(user_id, new_xp)
+        self.dirty.add(key)
+        return row
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self.dirty:
+                return
+            keys, self.dirty = self.dirty, set()
+            deltas = {k: self.pending.pop(k, 0) for k in keys}
+            batch = []
+            for g, u in keys:
+                row = self.rows[(g, u)]
+                batch.append((g, u, deltas[(g, u)], row["last_ts"], row["last_daily"], row["streak"]))
+            try:
+                stored = await self.store.add_many(batch)
+            except BaseException:
+                for k, d in deltas.items():  # retry with the next flush
+                    self.pending[k] = self.pending.get(k, 0) + d
+                self.dirty |= keys
+                raise
+            for key, (xp, _) in stored.items():
+                row = self.rows[key]
+                row["xp"] = xp + self.pending.get(key, 0)  # DB total (incl. other writers) + gains since the snapshot
+                row["level"] = level_from_xp(row["xp"])
+                self.ranking(key[0]).set(key[1], row["xp"])
+
+    @property
+    def flushing(self) -> bool:
+        return self._flush_lock.locked()
+
+_live_cache: XPCache | None = None  # set while the cog is loaded
+
+async def add_xp(guild_id: int, user_id: int, amount: int, reason: str | None = None) -> tuple[int, int]:
+    """Grant XP from outside the message path (referrals, rewards); returns (xp, level)."""
+    if _live_cache is not None:
+        row = _live_cache.add(guild_id, user_id, amount)
+        return row["xp"], row["level"]
+    store = XPStore()
+    await store.init()
+    return await store.add(guild_id, user_id, amount)
 
 # ---------- HELPERS ----------
+LEVEL_MAX = 500
+
+class XPCurve:
+    """Cumulative XP table for one (base, exp) curve: cumulative[n] is the total XP to reach level n."""
+
+    def __init__(self, base: int, exp: float, max_level: int = LEVEL_MAX):
+        self.key = (base, exp)
+        self.max_level = max_level
+        self.cumulative = [0]
+        self._extend(max_level + 1)
+
+    def _extend(self, level: int):
+        cum = self.cumulative
+        base, exp = self.key
+        for n in range(len(cum), level + 1):
+            try:
+                cum.append(cum[-1] + int(base * (exp ** (n-1))))
+            except OverflowError:
+                break  # curve too steep to go further; levels above are unreachable anyway
+
+    def total_for(self, level: int) -> int:
+        if level <= 0:
+            return 0
+        if level >= len(self.cumulative):
+            self._extend(level)  # only /level_curve asks past the cap
+            if level >= len(self.cumulative):
+                return self.cumulative[-1]
+        return self.cumulative[level]
+
+    def level_for(self, xp: int) -> int:
+        return max(0, min(self.max_level, bisect_right(self.cumulative, xp) - 1))
+
+    def progress(self, xp: int, level: int) -> tuple[int, int, float]:
+        """(XP at start of level, XP for next level, fraction done)."""
+        prev_req, next_req = self.total_for(level), self.total_for(level + 1)
+        return prev_req, next_req, (xp - prev_req) / max(1, next_req - prev_req)
+
+_curve: XPCurve | None = None
+
+def xp_curve() -> XPCurve:
+    """Table for the current LV_BASE/LV_EXP; rebuilt only when they change."""
+    global _curve
+    if _curve is None or _curve.key != (LV_BASE, LV_EXP):
+        _curve = XPCurve(LV_BASE, LV_EXP)
+    return _curve
+
 def total_xp_for_level(level: int) -> int:
     """Total XP required to *reach* this level (0 -> 0)."""
-    total = 0
-    for n in range(1, level+1):
-        total += int(LV_BASE * (LV_EXP ** (n-1)))
-    return total
+    return xp_curve().total_for(level)
 
 def next_level_target(curr_level: int) -> int:
     return total_xp_for_level(curr_level + 1)
 
 def level_from_xp(xp: int) -> int:
-    lvl = 0
-    while xp >= next_level_target(lvl):
-        lvl += 1
-        if lvl > 500: break
-    return max(0, lvl)
+    return xp_curve().level_for(xp)
 
 def progress_bar(pct: float, size=12) -> str:
     filled = max(0, min(size, int(round(pct * size))))
     return "▰" * filled + "▱" * (size - filled)
 
-async def grant_rank_role(member: discord.Member, new_level: int):
-    if not TITLES: return
-    # Find highest title <= new_level
-    target_title = None
-    for level, name in TITLES.items():
-        if new_level >= level:
-            target_title = name
-    if not target_title: return
-
-    guild = member.guild
-    role = discord.utils.get(guild.roles, name=target_title)
-    if not role: return
-
-    # Manage roles safety
-    me = guild.me
-    if not me or not me.guild_permissions.manage_roles or role >= me.top_role:
-        return
-
-    to_add = [role]
-    to_remove = []
-    if not KEEP_PREV:
-        # Remove other ladder roles
-        ladder_names = set(TITLES.values()) - {target_title}
-        to_remove = [r for r in member.roles if r.name in ladder_names and r < me.top_role]
-
-    if to_remove:
-        await member.remove_roles(*to_remove, reason="Level-up: remove lower ladder roles")
-    await member.add_roles(*to_add, reason=f"Level-up: {target_title}")
+def title_for(level: int) -> str | None:
+    """Highest ladder title at or below `level`."""
+    levels = list(TITLES)
+    i = bisect_right(levels, level) - 1
+    return TITLES[levels[i]] if i >= 0 else None
+
+
+class LadderRoles:
+    """
+    Ladder-role engine: a per-guild name → Role index for the LEVEL_ROLE_* titles
+    (dropped whenever the guild's roles change), and a minimal diff against the
+    member's current roles applied with a single member.edit, or no call at all.
+    """
+
+    def __init__(self):
+        self._index: dict[int, dict[str, discord.Role]] = {}
+
+    def invalidate(self, guild_id: int):
+        self._index.pop(guild_id, None)
+
+    def roles(self, guild: discord.Guild) -> dict[str, discord.Role]:
+        idx = self._index.get(guild.id)
+        if idx is None:
+            names = set(TITLES.values())
+            idx = {}
+            for r in guild.roles:  # lowest first, so a duplicate name resolves like discord.utils.get
+                if r.name in names:
+                    idx.setdefault(r.name, r)
+            self._index[guild.id] = idx
+        return idx
+
+    def plan(self, member: discord.Member, level: int) -> list[discord.Role] | None:
+        """The member's new role list, or None when nothing needs to change."""
+        me = member.guild.me
+        if not TITLES or not me or not me.guild_permissions.manage_roles:
+            return None
+        idx = self.roles(member.guild)
+        title = title_for(level)
+        target = idx.get(title or "")
+        if title and target is None:
+            return None  # the title's role is missing here; don't strip the ladder over it
+        if target is not None and target >= me.top_role:
+            return None
+
+        ladder_ids = {r.id for r in idx.values()}
+        current = [r for r in member.roles if not r.is_default()]
+        keep = [r for r in current
+                if KEEP_PREV or r.id not in ladder_ids or r == target or r >= me.top_role]
+        if target is not None and target not in keep:
+            keep.append(target)
+        if keep == current:
+            return None
+        return keep
+
+    @staticmethod
+    def reason(level: int) -> str:
+        return f"Level {level}: {title_for(level) or 'no ladder title'}"
+
+    async def apply(self, member: discord.Member, level: int) -> bool:
+        roles = self.plan(member, level)
+        if roles is None:
+            return False
+        await member.edit(roles=roles, reason=self.reason(level))
+        return True
+
+LADDER = LadderRoles()
+
+async def grant_rank_role(member: discord.Member, new_level: int) -> bool:
+    """Bring a member's ladder roles in line with `new_level`; True if an edit was made."""
+    return await LADDER.apply(member, new_level)
+
+class LevelUpAnnouncer:
+    """Collects level-ups per channel for ANNOUNCE_WINDOW seconds, then posts one combined message."""
+
+    def __init__(self, window: float = ANNOUNCE_WINDOW, cap: int = ANNOUNCE_MAX):
+        self.window = window
+        self.cap = max(1, cap)
+        self.pending: dict[int, tuple[discord.abc.Messageable, dict[int, tuple[str, int]]]] = {}
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    def add(self, channel: discord.abc.Messageable, member: discord.Member, level: int):
+        _, ups = self.pending.setdefault(channel.id, (channel, {}))
+        ups[member.id] = (member.mention, level)  # a second level-up in the window just bumps the level
+        if channel.id not in self._tasks:
+            self._tasks[channel.id] = asyncio.create_task(self._post_later(channel.id))
+
+    def format(self, ups: list[tuple[str, int]]) -> str:
+        if len(ups) == 1:
+            mention, level = ups[0]
+            return f"🎉 {mention} advanced to **Level {level}**!"
+        shown = [f"{mention} (**L{level}**)" for mention, level in ups[:self.cap]]
+        extra = len(ups) - len(shown)
+        if extra:
+            shown.append(f"{extra} more")
+        return f"🎉 {', '.join(shown[:-1])} and {shown[-1]} levelled up!"
+
+    async def _post_later(self, channel_id: int):
+        try:
+            await asyncio.sleep(self.window)
+        finally:
+            self._tasks.pop(channel_id, None)
+        await self._post(channel_id)
+
+    async def _post(self, channel_id: int):
+        channel, ups = self.pending.pop(channel_id, (None, None))
+        if not ups:
+            return
+        try:
+            await channel.send(self.format(list(ups.values())))
+        except Exception:
+            pass
+
+    async def close(self):
+        """Post whatever is still waiting (cog unload)."""
+        for t in list(self._tasks.values()):
+            t.cancel()
+        for cid in list(self.pending):
+            await self._post(cid)
+
+class LeaderboardView(discord.ui.View):
+    """Prev/Next for /top. Pages are keyset cursors into the guild's RankIndex (first/last row of the page)."""
+
+    def __init__(self, cog: "Leveling", guild: discord.Guild, rows: list[tuple[int, int, int]]):
+        super().__init__(timeout=300)
+        self.cog = cog
+        self.guild = guild
+        self._show(rows)
+
+    def _show(self, rows: list[tuple[int, int, int]]):
+        self.rows = rows
+        total = len(self.cog.cache.ranking(self.guild.id))
+        self.prev_page.disabled = not rows or rows[0][0] <= 1
+        self.next_page.disabled = not rows or rows[-1][0] >= total
+
+    async def _turn(self, inter: discord.Interaction, rows: list[tuple[int, int, int]]):
+        if not rows:  # the board shifted under us; start over from the top
+            rows = self.cog.cache.ranking(self.guild.id).after(None, TOP_PAGE_SIZE)
+        self._show(rows)
+        await inter.response.edit_message(embed=self.cog.top_embed(self.guild, rows), view=self)
+
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, inter: discord.Interaction, button: discord.ui.Button):
+        _, uid, xp = self.rows[0]
+        await self._turn(inter, self.cog.cache.ranking(self.guild.id).before(RankIndex.key(uid, xp), TOP_PAGE_SIZE))
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, inter: discord.Interaction, button: discord.ui.Button):
+        _, uid, xp = self.rows[-1]
+        await self._turn(inter, self.cog.cache.ranking(self.guild.id).after(RankIndex.key(uid, xp), TOP_PAGE_SIZE))
+
+@dataclass
+class RoleSyncJob:
+    guild_id: int
+    total: int
+    done: int = 0
+    changed: int = 0
+    failed: int = 0
+    started: float = 0.0
+    finished: bool = False
+
+    @property
+    def pct(self) -> float:
+        return 100.0 * self.done / max(1, self.total)
 
 # ---------- COG ----------
 class Leveling(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.store = XPStore()
+        self.cache = XPCache(self.store)
+        self.announcer = LevelUpAnnouncer()
+        self.cards = CardRenderer()
+        self.role_jobs: dict[int, RoleSyncJob] = {}
+        self._role_tasks: dict[int, asyncio.Task] = {}
+        self.flush_xp.change_interval(seconds=FLUSH_SEC)
 
     async def cog_load(self):
+        global _live_cache
         await self.store.init()
+        await self.cache.load()
+        _live_cache = self.cache
+        if not self.flush_xp.is_running():
+            self.flush_xp.start()
+
+    async def cog_unload(self):
+        global _live_cache
+        _live_cache = None
+        if self.flush_xp.is_running():
+            self.flush_xp.cancel()
+        for t in self._role_tasks.values():
+            t.cancel()
+        await self.announcer.close()
+        self.cards.shutdown()
+        await self.cache.flush()
+
+    @tasks.loop(seconds=15)
+    async def flush_xp(self):
+        try:
+            await self.cache.flush()
+        except Exception as e:
+            logging.warning("Leveling: XP flush failed, will retry: %s", e)
+
+    def _save(self, guild_id: int, user_id: int, delta: int, **fields):
+        self.cache.add(guild_id, user_id, delta, **fields)
+        if len(self.cache.dirty) >= FLUSH_MAX and not self.cache.flushing:
+            asyncio.create_task(self.cache.flush())  # don't wait out the interval
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        LADDER.invalidate(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        LADDER.invalidate(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        if before.name != after.name:
+            LADDER.invalidate(after.guild.id)
+
+    async def _sync_roles(self, guild: discord.Guild, job: RoleSyncJob, members: list[tuple[int, int]]):
+        """Background ladder-role reconcile, spaced at ROLE_SYNC_RPS so a big guild doesn't hit rate limits."""
+        limiter = RateLimiter(ROLE_SYNC_RPS)
+        try:
+            for uid, level in members:
+                member = guild.get_member(uid)
+                roles = LADDER.plan(member, level) if member and not member.bot else None
+                if roles is not None:  # only real edits spend the rate budget
+                    await limiter.wait()
+                    try:
+                        await member.edit(roles=roles, reason=LADDER.reason(level))
+                        job.changed += 1
+                    except Exception as e:
+                        job.failed += 1
+                        logging.warning("Leveling: role sync failed for %s: %s", uid, e)
+                job.done += 1
+                if job.done % 500 == 0:
+                    await asyncio.sleep(0)  # planning alone never awaits; let the gateway breathe
+        finally:
+            job.finished = True
 
     # XP on message
     @commands.Cog.listener()
@@ -170,7 +579,7 @@ class Leveling(commands.Cog):
         now = int(time.time())
 
         # cooldown
-        row = await self.store.get_row(msg.guild.id, msg.author.id)
+        row = self.cache.get(msg.guild.id, msg.author.id)
         if now - int(row["last_ts"]) < LEVEL_COOLDOWN:
             return
 
@@ -185,17 +594,12 @@ class Leveling(commands.Cog):
         new_level = level_from_xp(new_xp)
         leveled_up = new_level > row["level"]
 
-        await self.store.save_row(msg.guild.id, msg.author.id,
-                                  {"xp": new_xp, "level": new_level, "last_ts": now,
-                                   "last_daily": row["last_daily"], "streak": row["streak"]})
+        self._save(msg.guild.id, msg.author.id, gain, last_ts=now)
 
         if leveled_up:
             await grant_rank_role(msg.author, new_level)
             if LEVEL_ANNOUNCE:
-                try:
-                    await msg.channel.send(f"🎉 {msg.author.mention} advanced to **Level {new_level}**!")
-                except Exception:
-                    pass
+                self.announcer.add(msg.channel, msg.author, new_level)
 
     # /daily
     @GUILD_DEC
@@ -206,7 +610,7 @@ class Leveling(commands.Cog):
         g = inter.guild
         if not g: return await inter.followup.send("Guild only.", ephemeral=True)
 
-        row = await self.store.get_row(g.id, member.id)
+        row = self.cache.get(g.id, member.id)
         today = date.today().isoformat()
         if row["last_daily"] == today:
             return await inter.followup.send("🗓️ You've already claimed today. Come back tomorrow!", ephemeral=True)
@@ -227,12 +631,12 @@ class Leveling(commands.Cog):
         new_level = level_from_xp(new_xp)
         leveled = new_level > row["level"]
 
-        await self.store.save_row(g.id, member.id,
-                                  {"xp": new_xp, "level": new_level, "last_ts": row["last_ts"],
-                                   "last_daily": today, "streak": streak})
+        self._save(g.id, member.id, bonus, last_daily=today, streak=streak)
 
         if leveled:
             await grant_rank_role(member, new_level)
+            if LEVEL_ANNOUNCE and inter.channel:
+                self.announcer.add(inter.channel, member, new_level)
 
         await inter.followup.send(
             f"✅ Daily claimed: **+{bonus} XP** (streak **{streak}/{STREAK_MAX}**) — "
@@ -243,46 +647,59 @@ class Leveling(commands.Cog):
     @app_commands.command(name="rank", description="Show your current level progress.")
     async def rank(self, inter: discord.Interaction, member: discord.Member | None = None):
         member = member or inter.user
-        row = await self.store.get_row(inter.guild.id, member.id)
+        row = self.cache.get(inter.guild.id, member.id)
         curr = row["level"]
         total = row["xp"]
-        next_req = next_level_target(curr)
-        prev_req = total_xp_for_level(curr)
+        prev_req, next_req, pct = xp_curve().progress(total, curr)
         to_next = max(0, next_req - total)
-        denom = max(1, next_req - prev_req)
-        pct = (total - prev_req) / denom
         bar = progress_bar(pct)
 
-        title = None
-        for lvl, name in TITLES.items():
-            if curr >= lvl:
-                title = name
+        title = title_for(curr)
+        ranking = self.cache.ranking(inter.guild.id)
+        position = ranking.rank(member.id)
+
+        if self.cards.enabled:
+            await inter.response.defer(ephemeral=True)  # a cold avatar fetch can take a moment
+            avatar = member.display_avatar
+            png = await self.cards.card(CardData(
+                name=member.display_name, avatar_key=avatar.key if avatar else None, level=curr, xp=total,
+                level_xp=prev_req, next_xp=next_req, rank=position, ranked=len(ranking), title=title,
+                badges=verified_badges(member.roles), accent=accent_for(member),
+            ), avatar)
+            if png:
+                return await inter.followup.send(file=discord.File(io.BytesIO(png), filename="rank.png"), ephemeral=True)
 
         e = discord.Embed(title=f"🏅 {member.display_name} — Level {curr}", color=discord.Color.gold())
+        e.add_field(name="Rank", value=f"#{position:,} of {len(ranking):,}" if position else "Unranked", inline=True)
         if title:
             e.add_field(name="Title", value=title, inline=True)
         e.add_field(name="XP", value=f"{total:,} / {next_req:,}", inline=True)
         e.add_field(name="Progress", value=f"{bar}  ({pct*100:.1f}%)", inline=False)
         e.set_footer(text=f"{to_next:,} XP to Level {curr+1}")
+        if inter.response.is_done():
+            return await inter.followup.send(embed=e, ephemeral=True)
         await inter.response.send_message(embed=e, ephemeral=True)
 
     # /top
-    @GUILD_DEC
-    @app_commands.command(name="top", description="Show the server XP leaderboard (top 10).")
-    async def top(self, inter: discord.Interaction):
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute(CREATE_SQL)
-            cur = await db.execute("SELECT user_id, xp, level FROM xp WHERE guild_id=? ORDER BY xp DESC LIMIT 10", (inter.guild.id,))
-            rows = await cur.fetchall()
-
+    def top_embed(self, guild: discord.Guild, rows: list[tuple[int, int, int]]) -> discord.Embed:
         lines = []
-        for i, (uid, xp, lvl) in enumerate(rows, start=1):
-            user = inter.guild.get_member(uid) or f"<@{uid}>"
-            name = user.display_name if isinstance(user, discord.Member) else str(user)
-            lines.append(f"**{i}.** {name} — L{lvl} • {xp:,} XP")
+        for rank, uid, xp in rows:
+            user = guild.get_member(uid)
+            name = user.display_name if user else f"<@{uid}>"
+            lvl = self.cache.get(guild.id, uid)["level"]
+            lines.append(f"**{rank}.** {name} — L{lvl} • {xp:,} XP")
+        total = len(self.cache.ranking(guild.id))
+        e = discord.Embed(title="🏆 Leaderboard", description="\n".join(lines) or "No data yet.", color=discord.Color.purple())
+        if rows:
+            e.set_footer(text=f"#{rows[0][0]:,}–{rows[-1][0]:,} of {total:,}")
+        return e
 
-        e = discord.Embed(title="🏆 Leaderboard — Top 10", description="\n".join(lines) or "No data yet.", color=discord.Color.purple())
-        await inter.response.send_message(embed=e, ephemeral=True)
+    @GUILD_DEC
+    @app_commands.command(name="top", description="Show the server XP leaderboard.")
+    async def top(self, inter: discord.Interaction):
+        rows = self.cache.ranking(inter.guild.id).after(None, TOP_PAGE_SIZE)
+        view = LeaderboardView(self, inter.guild, rows)
+        await inter.response.send_message(embed=self.top_embed(inter.guild, rows), view=view, ephemeral=True)
 
     # /titles
     @GUILD_DEC
@@ -308,9 +725,10 @@ class Leveling(commands.Cog):
     @GUILD_DEC
     @app_commands.command(name="level_curve", description="Show XP targets for the next 10 levels.")
     async def level_curve(self, inter: discord.Interaction, start_level: int = 1):
+        curve = xp_curve()
         lines = []
         for i in range(start_level, start_level + 10):
-            lines.append(f"L{i} → {total_xp_for_level(i):,} XP total")
+            lines.append(f"L{i} → {curve.total_for(i):,} XP total")
         await inter.response.send_message("📈 XP curve:\n" + "\n".join(lines), ephemeral=True)
 
     # Admin: give XP
@@ -318,15 +736,63 @@ class Leveling(commands.Cog):
     @app_commands.command(name="level_givexp", description="(Staff) Give XP to a member.")
     @app_commands.checks.has_permissions(manage_guild=True)
     async def level_givexp(self, inter: discord.Interaction, member: discord.Member, amount: int):
-        row = await self.store.get_row(inter.guild.id, member.id)
+        row = self.cache.get(inter.guild.id, member.id)
         new_xp = max(0, row["xp"] + max(-10**9, min(10**9, amount)))
         new_level = level_from_xp(new_xp)
-        await self.store.save_row(inter.guild.id, member.id,
-                                  {"xp": new_xp, "level": new_level, "last_ts": row["last_ts"],
-                                   "last_daily": row["last_daily"], "streak": row["streak"]})
-        if new_level > row["level"]:
+        leveled = new_level > row["level"]
+        self._save(inter.guild.id, member.id, new_xp - row["xp"])
+        if leveled:
             await grant_rank_role(member, new_level)
+            if LEVEL_ANNOUNCE and inter.channel:
+                self.announcer.add(inter.channel, member, new_level)
         await inter.response.send_message(f"✅ Set {member.mention} to **{new_xp:,} XP** (L{new_level}).", ephemeral=True)
 
+    # Admin: recompute levels + reconcile ladder roles
+    @GUILD_DEC
+    @app_commands.command(name="level_recompute", description="(Staff) Recompute all levels from the current curve and resync ladder roles.")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def level_recompute(self, inter: discord.Interaction):
+        g = inter.guild
+        job = self.role_jobs.get(g.id)
+        if job and not job.finished:
+            return await inter.response.send_message(
+                f"⏳ Role sync already running: {job.done:,}/{job.total:,} ({job.pct:.0f}%).", ephemeral=True)
+        await inter.response.defer(ephemeral=True)
+
+        t0 = time.perf_counter()
+        await self.cache.flush()
+        total, changed = await self.store.recompute_levels(g.id)
+        for uid, level in changed:
+            row = self.cache.rows.get((g.id, uid))
+            if row:
+                row["level"] = level
+        elapsed = time.perf_counter() - t0
+
+        members = [(uid, row["level"]) for (gid, uid), row in self.cache.rows.items() if gid == g.id]
+        job = self.role_jobs[g.id] = RoleSyncJob(g.id, total=len(members), started=time.time())
+        if TITLES:
+            self._role_tasks[g.id] = asyncio.create_task(self._sync_roles(g, job, members))
+        else:
+            job.finished = True
+        await inter.followup.send(
+            f"✅ Recomputed **{total:,}** levels in {elapsed:.2f}s — **{len(changed):,}** changed. "
+            + ("Ladder roles are syncing in the background; check `/level_recompute_status`." if TITLES else "No ladder configured."),
+            ephemeral=True)
+
+    @GUILD_DEC
+    @app_commands.command(name="level_recompute_status", description="(Staff) Progress of the ladder-role resync.")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def level_recompute_status(self, inter: discord.Interaction):
+        job = self.role_jobs.get(inter.guild.id)
+        if not job:
+            return await inter.response.send_message("No recompute has run since the bot started.", ephemeral=True)
+        state = "✅ finished" if job.finished else "⏳ running"
+        remaining = (job.total - job.done) / max(0.01, ROLE_SYNC_RPS)
+        msg = (f"{state}: {job.done:,}/{job.total:,} members ({job.pct:.0f}%) • "
+               f"{job.changed:,} updated • {job.failed:,} failed")
+        if not job.finished:
+            msg += f" • ~{remaining / 60:.0f} min left"
+        await inter.response.send_message(msg, ephemeral=True)
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(Leveling(bot))
@@ -1,6 +1,7 @@
 # cogs/platypus.py
 import os
 import random
+import asyncio
 import datetime
 from typing import Optional, List
 
@@ -8,6 +9,8 @@ import discord
 from discord.ext import commands, tasks
 from discord import app_commands
 
+from services.webhook_delivery import AlertDelivery
+
 # --- Config ---
 _GUILD_ID_RAW = os.getenv("GUILD_ID") or ""
 GUILD_ID = int(_GUILD_ID_RAW) if _GUILD_ID_RAW.isdigit() else None
@@ -30,6 +33,7 @@ class Platypus(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self._last_path: Optional[str] = None  # prevent immediate repeats
+        self.delivery = AlertDelivery(bot)  # daily drop goes through the alert webhook when ALERT_WEBHOOKS is on
         if not self.daily_post.is_running():
             self.daily_post.start()
 
@@ -37,8 +41,10 @@ class Platypus(commands.Cog):
     def cog_unload(self):
         if self.daily_post.is_running():
             self.daily_post.cancel()
+        asyncio.create_task(self.delivery.close())
 
     async def cog_load(self):
+        await self.delivery.init()
         # Helpful log to confirm images folder
         print(f"[Platypus] Using images dir: {IMAGES_DIR}")
 
@@ -137,7 +143,7 @@ class Platypus(commands.Cog):
             "☀️ **Rise and shine with Pal Platypus!** *(Daily 09:00 UTC)*",
         ]
         try:
-            await channel.send(content=random.choice(daily_messages), file=discord.File(path))
+            await self.delivery.send(channel, content=random.choice(daily_messages), file=discord.File(path))
             print(f"[Platypus] Daily posted at {datetime.datetime.now(UTC).isoformat()}")
         except Exception as e:
             print(f"[Platypus] Failed to post daily image: {e}")
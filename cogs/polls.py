@@ -1,9 +1,11 @@
 # cogs/polls.py
-import os, re, asyncio
+import os, re, time
 import discord
 from discord.ext import commands
 from discord import app_commands
 
+from services.scheduler import SCHEDULER
+
 _GUILD_ID = int(os.getenv("GUILD_ID") or 0) or None
 GUILD_DEC = app_commands.guilds(_GUILD_ID) if _GUILD_ID else (lambda f: f)
 
@@ -12,6 +14,19 @@ NUM_EMOJI = ["1️⃣","2️⃣","3️⃣","4️⃣","5️⃣","6️⃣","7️
 class Polls(commands.Cog):
     def __init__(self, bot): self.bot = bot
 
+    async def cog_load(self):
+        SCHEDULER.register("poll_close", self._scheduled_close)
+        await SCHEDULER.start()
+
+    async def cog_unload(self):
+        await SCHEDULER.release("poll_close")
+
+    async def _scheduled_close(self, payload: dict):
+        await self.bot.wait_until_ready()
+        channel = self.bot.get_channel(payload["channel_id"])
+        if channel is not None:
+            await self._close_and_tally(channel, payload["message_id"])
+
     @GUILD_DEC
     @app_commands.command(name="poll", description="Create a quick emoji poll.")
     @app_commands.describe(
@@ -33,16 +48,15 @@ class Polls(commands.Cog):
         await inter.response.send_message(f"Poll created (ID: `{msg.id}`).", ephemeral=True)
 
         if minutes and minutes > 0:
-            async def closer():
-                await asyncio.sleep(minutes * 60)
-                await self._close_and_tally(inter.channel, msg.id)
-            self.bot.loop.create_task(closer())
+            await SCHEDULER.schedule(f"poll_close:{msg.id}", "poll_close", time.time() + minutes * 60,
+                                     {"channel_id": msg.channel.id, "message_id": msg.id})
 
     @GUILD_DEC
     @app_commands.command(name="poll_close", description="Close a poll and show results.")
     @app_commands.describe(message_id="Message ID of the poll")
     async def poll_close(self, inter: discord.Interaction, message_id: str):
         await inter.response.defer(ephemeral=True, thinking=True)
+        await SCHEDULER.cancel(f"poll_close:{int(message_id)}")
         await self._close_and_tally(inter.channel, int(message_id))
         await inter.followup.send("Poll closed.", ephemeral=True)
 
@@ -1,61 +1,71 @@
 # cogs/profile.py
+import io
 import os
-import aiosqlite
 import discord
 from discord import app_commands
 from discord.ext import commands
 
-DB_PATH = os.getenv("DB_PATH", "pal_bot.sqlite")
-
-# keep in sync with leveling.py’s formula
-def level_from_xp(xp: int) -> int:
-    return max(1, (xp // 100) + 1)
+from services.rank_card import CardRenderer, CardData, VERIFIED_MARKERS, verified_badges, accent_for
+from services.user_stats import UserStats, UserStatsRow
+from .leveling import xp_curve, title_for, progress_bar
 
-def progress_to_next(xp: int):
-    lvl = level_from_xp(xp)
-    base = (lvl - 1) * 100
-    nxt = lvl * 100
-    return lvl, xp - base, nxt - base
-
-def progress_bar(x_in: int, x_req: int, w: int = 12):
-    fill = int((x_in / max(1, x_req)) * w)
-    return "█" * fill + "░" * (w - fill)
+DB_PATH = os.getenv("DB_PATH", "pal_bot.sqlite")
 
-VERIFIED_MARKERS = {"(Verified)", "Verified"}
+def stats_line(s: UserStatsRow) -> str:
+    return (f"⭐ {s.rep:,} rep (given {s.rep_given:,}) • 📨 {s.invites:,} invites • "
+            f"⚔️ {s.raids:,} raids • ✅ {s.verifications:,} verifications")
 
 class Profile(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.stats = UserStats(DB_PATH)
+        self.cards = CardRenderer()
 
-    async def _get_xp(self, gid: int, uid: int) -> int:
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute("""
-              CREATE TABLE IF NOT EXISTS leveling (
-                guild_id INTEGER NOT NULL,
-                user_id INTEGER NOT NULL,
-                xp INTEGER NOT NULL DEFAULT 0,
-                last_ts INTEGER NOT NULL DEFAULT 0,
-                PRIMARY KEY(guild_id, user_id)
-              )
-            """)
-            cur = await db.execute("SELECT xp FROM leveling WHERE guild_id=? AND user_id=?", (gid, uid))
-            row = await cur.fetchone()
-            return int(row[0]) if row else 0
+    async def cog_load(self):
+        await self.stats.init()
 
-    @app_commands.command(name="profile", description="Show a member’s profile: level, XP, and verified roles.")
+    def cog_unload(self):
+        self.cards.shutdown()
+
+    def _live_xp(self, gid: int, uid: int):
+        """(xp, level, rank, ranked) from the leveling cog's in-memory cache, which runs ahead of the last flush."""
+        lv = self.bot.get_cog("Leveling")
+        if lv is None or (gid, uid) not in lv.cache.rows:
+            return None
+        row, ranking = lv.cache.rows[(gid, uid)], lv.cache.ranking(gid)
+        return row["xp"], row["level"], ranking.rank(uid), len(ranking)
+
+    @app_commands.command(name="profile", description="Show a member’s profile: level, XP, rep, invites, raids and verified roles.")
     async def profile(self, inter: discord.Interaction, member: discord.Member | None = None):
         member = member or inter.user
-        xp = await self._get_xp(inter.guild_id, member.id)
-        lvl, xin, xreq = progress_to_next(xp)
+        stats = await self.stats.get(inter.guild_id, member.id)
+        xp, lvl, rank, ranked = self._live_xp(inter.guild_id, member.id) or (stats.xp, stats.level, None, 0)
+        level_xp, next_xp, pct = xp_curve().progress(xp, lvl)
+        title = title_for(lvl)
+
+        if self.cards.enabled:
+            await inter.response.defer(ephemeral=True)
+            avatar = member.display_avatar
+            png = await self.cards.card(CardData(
+                name=member.display_name, avatar_key=avatar.key if avatar else None, level=lvl, xp=xp,
+                level_xp=level_xp, next_xp=next_xp, rank=rank, ranked=ranked, title=title,
+                badges=verified_badges(member.roles), accent=accent_for(member),
+            ), avatar)
+            if png:
+                return await inter.followup.send(content=stats_line(stats),
+                                                 file=discord.File(io.BytesIO(png), filename="profile.png"), ephemeral=True)
 
         verified_roles = [r.name for r in member.roles if any(m in r.name for m in VERIFIED_MARKERS)]
         other_ranks = [r.name for r in member.roles if not any(m in r.name for m in VERIFIED_MARKERS)
                        and r.name not in ("@everyone",)]
 
         e = discord.Embed(title=f"🪪 Profile — {member.display_name}", color=discord.Color.blurple())
-        e.add_field(name="Level", value=str(lvl), inline=True)
-        e.add_field(name="XP", value=str(xp), inline=True)
-        e.add_field(name="Progress", value=f"`{progress_bar(xin, xreq, 16)}` {xin}/{xreq}", inline=False)
+        e.add_field(name="Level", value=f"{lvl} — {title}" if title else str(lvl), inline=True)
+        e.add_field(name="XP", value=f"{xp:,}", inline=True)
+        if rank:
+            e.add_field(name="Rank", value=f"#{rank:,} of {ranked:,}", inline=True)
+        e.add_field(name="Progress", value=f"{progress_bar(pct, 16)}  {xp - level_xp:,}/{next_xp - level_xp:,}", inline=False)
+        e.add_field(name="Activity", value=stats_line(stats), inline=False)
 
         if verified_roles:
             e.add_field(name="Verified", value=" • ".join(verified_roles), inline=False)
@@ -64,7 +74,16 @@ class Profile(commands.Cog):
             e.add_field(name="Roles", value=", ".join(other_ranks[:5]), inline=False)
 
         e.set_thumbnail(url=member.display_avatar.url if member.display_avatar else discord.Embed.Empty)
+        if inter.response.is_done():
+            return await inter.followup.send(embed=e, ephemeral=True)
         await inter.response.send_message(embed=e, ephemeral=True)
 
+    @app_commands.command(name="profile_rebuild", description="(Staff) Rebuild profile stats from the leveling, rep, referral, raid and verify tables.")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def profile_rebuild(self, inter: discord.Interaction):
+        await inter.response.defer(ephemeral=True)
+        rows = await self.stats.rebuild(inter.guild_id)
+        await inter.followup.send(f"✅ Rebuilt profile stats for {rows:,} members.", ephemeral=True)
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(Profile(bot))
@@ -1,19 +1,30 @@
 # cogs/raids.py
 import os
 import re
+import time
 import random
+import asyncio
 import aiosqlite
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
 
+from services.raid_analytics import RaidAnalytics
+from services.scheduler import SCHEDULER
+from services.user_stats import UserStats
+
 # -------- Config (from .env) --------
 DB_PATH = os.getenv("DB_PATH", "pal_bot.sqlite")
 DEFAULT_MINUTES = int(os.getenv("RAID_DEFAULT_MIN", "30") or 30)
 RAID_ROLE_NAME = os.getenv("RAID_ROLE_NAME", "Raiders")
 RAID_CHANNEL_ID = int(os.getenv("RAID_CHANNEL_ID", "0") or 0)
+FLUSH_SEC = float(os.getenv("RAID_FLUSH_SEC", "3") or 3)                 # participant write-back interval
+PANEL_EDIT_SEC = float(os.getenv("RAID_PANEL_EDIT_SEC", "5") or 5)       # min gap between panel edits
+FLUSH_CHUNK = 300                                                        # rows per INSERT (3 params each, under SQLite's 999)
+MAX_ACTIVE = int(os.getenv("RAID_MAX_ACTIVE", "5") or 5)                 # concurrent raids per guild
 
 _GUILD_ID_RAW = os.getenv("GUILD_ID") or ""
 GUILD_ID = int(_GUILD_ID_RAW) if _GUILD_ID_RAW.isdigit() else None
@@ -200,65 +211,49 @@ def get_rank_info(count: int) -> str:
         return "⭐ **RECRUIT LEVEL** ⭐\n*Every legend starts somewhere!*"
 
 # ---------- Enhanced UI ----------
-class DoneButton(discord.ui.Button):
+class DoneButton(discord.ui.DynamicItem[discord.ui.Button], template=r"raid:done:(?P<raid_id>[0-9]+)"):
+    """
+    The raid id lives in the custom_id, so one class registered at startup
+    (bot.add_dynamic_items) answers clicks on every panel, across restarts,
+    without a View kept per message.
+    """
+
     def __init__(self, raid_id: int):
-        super().__init__(
-            style=discord.ButtonStyle.success, 
+        super().__init__(discord.ui.Button(
+            style=discord.ButtonStyle.success,
             label="✅ MISSION COMPLETE",
-            emoji="⚔️"
-        )
+            emoji="⚔️",
+            custom_id=f"raid:done:{raid_id}",
+        ))
         self.raid_id = raid_id
 
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(int(match["raid_id"]))
+
     async def callback(self, interaction: discord.Interaction):
         assert interaction.user
-        await record_participation(self.raid_id, interaction.user.id)
+        raid = await TRACKER.get(self.raid_id)
+        if raid is None:
+            return await interaction.response.send_message("🏁 **THIS RAID HAS ENDED.** Watch for the next one!", ephemeral=True)
+        new = raid.add(interaction.user.id)
+        count = len(raid.members)
 
-        count = await participant_count(self.raid_id)
-        
         # Celebration messages based on milestones
         celebration = ""
-        if count == 1:
+        if not new:
+            celebration = "✅ You're already on the roster."
+        elif count == 1:
             celebration = "🎯 **FIRST BLOOD!** You led the charge!"
         elif count % 5 == 0:
             celebration = f"🔥 **{count} WARRIORS STRONG!** The force grows!"
         elif count >= 20:
             celebration = "👑 **LEGENDARY RAID STATUS ACHIEVED!** 👑"
 
-        # Try to update the panel embed with correct timing
-        try:
-            msg = interaction.message
-            if msg and msg.embeds:
-                old = msg.embeds[0]
-                title = (old.title or "").replace("⚔️ **RAID: ", "").replace("** ⚔️", "") or "Palaemon Raid"
-                title = title.replace("🚀 **RAID: ", "").replace("💥 **RAID: ", "").replace("⚡ **RAID: ", "")
-                
-                # Get raid info from database to get correct end time
-                async with aiosqlite.connect(DB_PATH) as db:
-                    cur = await db.execute(
-                        "SELECT url, started_at, ends_at FROM raids WHERE id=?", 
-                        (self.raid_id,)
-                    )
-                    raid_data = await cur.fetchone()
-                
-                if raid_data:
-                    url, started_ts, ends_ts = raid_data
-                    ends_at = datetime.fromtimestamp(ends_ts, timezone.utc)
-                    started_at = datetime.fromtimestamp(started_ts, timezone.utc)
-                    
-                    new_embed = raid_embed(title, url, ends_at, count=count, started_at=started_at)
-                    new_view = action_view(url, raid_id=self.raid_id)
-                    await interaction.response.edit_message(embed=new_embed, view=new_view)
-                    
-                    # Send celebration if there is one
-                    if celebration:
-                        await interaction.followup.send(celebration, ephemeral=True)
-                    return
-        except Exception as e:
-            print(f"Failed to update embed: {e}")
-
-        response = f"⚔️ **MISSION LOGGED!** Thanks for your service, warrior!\n{celebration}".strip()
-        if not interaction.response.is_done():
-            await interaction.response.send_message(response, ephemeral=True)
+        await interaction.response.send_message(
+            f"⚔️ **MISSION LOGGED!** Thanks for your service, warrior!\n{celebration}".strip(), ephemeral=True)
+        if new:
+            TRACKER.touch_panel(raid, interaction.client)
 
 
 def action_view(url: str, raid_id: int) -> discord.ui.View:
@@ -271,6 +266,8 @@ def action_view(url: str, raid_id: int) -> discord.ui.View:
     v.add_item(discord.ui.Button(label="💬 REPLY", url=url, style=discord.ButtonStyle.link))
     v.add_item(discord.ui.Button(label="🗨️ QUOTE", url=url, style=discord.ButtonStyle.link))
     v.add_item(DoneButton(raid_id=raid_id))
+    # stopped before sending so discord.py doesn't keep it per message; clicks go through DoneButton's template
+    v.stop()
     return v
 
 # ---------- DB helpers (module-level so UI can use) ----------
@@ -297,31 +294,149 @@ CREATE TABLE IF NOT EXISTS raid_participants (
     FOREIGN KEY (raid_id) REFERENCES raids(id) ON DELETE CASCADE
 );
 """
+# several raids can run at once, so this is no longer UNIQUE (older DBs get it dropped in ensure_db)
 CREATE_ACTIVE_INDEX = """
-CREATE UNIQUE INDEX IF NOT EXISTS idx_raids_active
-ON raids(guild_id, active) WHERE active=1;
+CREATE INDEX IF NOT EXISTS idx_raids_guild_active
+ON raids(guild_id, active);
 """
 
 async def ensure_db():
     async with aiosqlite.connect(DB_PATH) as db:
         await db.execute(CREATE_SQL)
         await db.execute(CREATE_PARTICIPANTS_SQL)
+        await db.execute("DROP INDEX IF EXISTS idx_raids_active")
         await db.execute(CREATE_ACTIVE_INDEX)
         await db.commit()
+    await RaidAnalytics(DB_PATH).init()
+    await UserStats(DB_PATH).init()
 
-async def record_participation(raid_id: int, user_id: int):
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
-            "INSERT OR IGNORE INTO raid_participants(raid_id, user_id, ts) VALUES (?,?,?)",
-            (raid_id, user_id, int(now_utc().timestamp())),
-        )
-        await db.commit()
+async def record_participation(raid_id: int, user_id: int) -> bool:
+    """Add a participant (in memory; written by the next flush). False if already counted or the raid is over."""
+    raid = await TRACKER.get(raid_id)
+    if raid is None or not raid.add(user_id):
+        return False
+    TRACKER.touch_panel(raid)
+    return True
 
 async def participant_count(raid_id: int) -> int:
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute("SELECT COUNT(*) FROM raid_participants WHERE raid_id=?", (raid_id,))
-        (count,) = await cur.fetchone()
-    return count
+    raid = TRACKER.raids.get(raid_id)
+    if raid is not None:
+        return len(raid.members)
+    return await ANALYTICS.participants(raid_id)
+
+# ---------- Live participant sets ----------
+@dataclass
+class LiveRaid:
+    raid_id: int
+    guild_id: int
+    channel_id: int
+    message_id: int | None
+    title: str
+    url: str
+    started_at: int
+    ends_at: int
+    seq: int
+    members: set[int] = field(default_factory=set)
+    pending: list[tuple[int, int]] = field(default_factory=list)  # (user_id, ts) not yet written
+    edit_task: asyncio.Task | None = None
+    last_edit: float = 0.0
+
+    def add(self, user_id: int) -> bool:
+        if user_id in self.members:
+            return False
+        self.members.add(user_id)
+        self.pending.append((user_id, int(now_utc().timestamp())))
+        return True
+
+class RaidTracker:
+    """
+    Participant sets of active raids, kept in memory so a click is a set
+    insert. New participants are written in batches by flush(), and the raid
+    panel is re-rendered at most once per PANEL_EDIT_SEC with the latest count.
+    """
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self.raids: dict[int, LiveRaid] = {}
+        self.bot: commands.Bot | None = None
+        self._flush_lock = asyncio.Lock()
+
+    async def get(self, raid_id: int) -> LiveRaid | None:
+        """The live raid, loaded on first use; None if it doesn't exist or has ended."""
+        raid = self.raids.get(raid_id)
+        if raid is not None:
+            return raid
+        async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute(
+                "SELECT id, guild_id, channel_id, message_id, title, url, started_at, ends_at, seq "
+                "FROM raids WHERE id=? AND active=1", (raid_id,))
+            row = await cur.fetchone()
+            if not row:
+                return None
+            cur = await db.execute("SELECT user_id FROM raid_participants WHERE raid_id=?", (raid_id,))
+            members = {u for (u,) in await cur.fetchall()}
+        return self.raids.setdefault(raid_id, LiveRaid(*row, members=members))
+
+    async def forget(self, raid_id: int):
+        """Drop a raid that was just marked inactive, writing its last participants."""
+        raid = self.raids.pop(raid_id, None)
+        if raid is not None:
+            if raid.edit_task:
+                raid.edit_task.cancel()
+            await self.flush(raid)
+
+    async def flush(self, *ended: LiveRaid):
+        async with self._flush_lock:
+            batch = []
+            for raid in [*self.raids.values(), *ended]:
+                batch += [(raid, u, ts) for u, ts in raid.pending]
+                raid.pending = []
+            if not batch:
+                return
+            try:
+                async with aiosqlite.connect(self.path) as db:
+                    # only rows that were really inserted reach the aggregates, so a batch that is
+                    # retried after its commit went through can't be counted twice
+                    inserted = []
+                    for i in range(0, len(batch), FLUSH_CHUNK):
+                        chunk = batch[i:i + FLUSH_CHUNK]
+                        by_key = {(r.raid_id, u): (r, u, ts) for r, u, ts in chunk}
+                        cur = await db.execute(
+                            "INSERT OR IGNORE INTO raid_participants(raid_id, user_id, ts) VALUES "
+                            + ",".join(["(?,?,?)"] * len(chunk)) + " RETURNING raid_id, user_id",
+                            [v for r, u, ts in chunk for v in (r.raid_id, u, ts)])
+                        inserted += [by_key[(raid_id, u)] for raid_id, u in await cur.fetchall()]
+                    await UserStats.bump(db, "raids", [(r.guild_id, u, 1) for r, u, _ in inserted])
+                    await RaidAnalytics.record(db, [(r.guild_id, r.raid_id, r.seq, r.started_at, u, ts) for r, u, ts in inserted])
+                    await db.commit()
+            except BaseException:
+                for raid, u, ts in batch:  # retry with the next flush
+                    raid.pending.append((u, ts))
+                raise
+
+    # ---- panel ----
+
+    def touch_panel(self, raid: LiveRaid, bot: commands.Bot | None = None):
+        """Schedule a panel edit unless one is already pending; it shows whatever the count is when it runs."""
+        self.bot = bot or self.bot
+        if raid.message_id and self.bot and (raid.edit_task is None or raid.edit_task.done()):
+            raid.edit_task = asyncio.create_task(self._edit_panel(raid))
+
+    async def _edit_panel(self, raid: LiveRaid):
+        await asyncio.sleep(max(0.0, raid.last_edit + PANEL_EDIT_SEC - time.monotonic()))
+        raid.last_edit = time.monotonic()
+        channel = self.bot.get_channel(raid.channel_id)
+        if channel is None:
+            return
+        embed = raid_embed(raid.title, raid.url, datetime.fromtimestamp(raid.ends_at, timezone.utc),
+                           count=len(raid.members), started_at=datetime.fromtimestamp(raid.started_at, timezone.utc))
+        try:
+            await channel.get_partial_message(raid.message_id).edit(embed=embed)
+        except discord.HTTPException as e:
+            print(f"Failed to update raid panel {raid.raid_id}: {e}")
+
+TRACKER = RaidTracker()
+ANALYTICS = RaidAnalytics()
 
 # ---------- Enhanced Cog ----------
 class Raids(commands.Cog):
@@ -333,25 +448,64 @@ class Raids(commands.Cog):
 
     async def cog_load(self):
         await ensure_db()
-
-    def cog_unload(self):
-        if self.expiry_watch.is_running():
-            self.expiry_watch.cancel()
+        TRACKER.bot = self.bot
+        self.bot.add_dynamic_items(DoneButton)
+        self.flush_participants.start()
+        SCHEDULER.register("raid_end", self._expire)
+        await SCHEDULER.start()
+        async with aiosqlite.connect(DB_PATH) as db:  # raids started before expiry jobs existed
+            cur = await db.execute("SELECT id, ends_at FROM raids WHERE active=1")
+            for raid_id, ends_at in await cur.fetchall():
+                if f"raid_end:{raid_id}" not in SCHEDULER.jobs:
+                    await SCHEDULER.schedule(f"raid_end:{raid_id}", "raid_end", ends_at, {"raid_id": raid_id})
+
+    async def cog_unload(self):
+        await SCHEDULER.release("raid_end")
+        self.flush_participants.cancel()
+        self.bot.remove_dynamic_items(DoneButton)
+        await TRACKER.flush()
+
+    @tasks.loop(seconds=FLUSH_SEC)
+    async def flush_participants(self):
+        try:
+            await TRACKER.flush()
+        except Exception as e:
+            print(f"[Raids] participant flush failed, will retry: {e}")
 
     # ---------- Internals ----------
-    async def _active_raid(self, guild_id: int):
+    async def _active_raids(self, guild_id: int) -> list[tuple]:
+        """Active raids, newest first."""
         async with aiosqlite.connect(DB_PATH) as db:
             cur = await db.execute(
                 "SELECT id, channel_id, message_id, title, url, role_id, started_at, ends_at "
-                "FROM raids WHERE guild_id=? AND active=1 LIMIT 1",
+                "FROM raids WHERE guild_id=? AND active=1 ORDER BY id DESC",
                 (guild_id,),
             )
-            return await cur.fetchone()
+            return await cur.fetchall()
+
+    async def _pick_raid(self, inter: discord.Interaction, raid_id: int | None, strict: bool = False):
+        """
+        The raid a command refers to: the given id, else the one running in this
+        channel (or the panel's thread), else the newest. With strict, an
+        ambiguous pick returns None instead of guessing.
+        """
+        raids = await self._active_raids(inter.guild_id)
+        if raid_id is not None:
+            return next((r for r in raids if r[0] == raid_id), None)
+        here = {inter.channel_id, getattr(inter.channel, "parent_id", None)}
+        local = [r for r in raids if r[1] in here]
+        if len(local) == 1 or (local and not strict):
+            return local[0]
+        if len(raids) == 1 or (raids and not strict):
+            return raids[0]
+        return None
 
     async def _end_raid(self, raid_id: int):
         async with aiosqlite.connect(DB_PATH) as db:
             await db.execute("UPDATE raids SET active=0 WHERE id=?", (raid_id,))
             await db.commit()
+        await TRACKER.forget(raid_id)
+        await SCHEDULER.cancel(f"raid_end:{raid_id}")
 
     def _find_raider_role(self, guild: discord.Guild) -> discord.Role | None:
         if RAID_ROLE_NAME:
@@ -368,13 +522,12 @@ class Raids(commands.Cog):
             ch = discord.utils.get(guild.text_channels, name="raids") or discord.utils.get(guild.text_channels, name="raid")
         return ch
 
-    async def _launch_raid(self, guild: discord.Guild, url: str, title: str, minutes: int) -> str:
-        # End any existing active raid first
-        act = await self._active_raid(guild.id)
-        if act:
-            await self._end_raid(act[0])
+    async def _launch_raid(self, guild: discord.Guild, url: str, title: str, minutes: int,
+                           channel: discord.TextChannel | None = None) -> str:
+        if len(await self._active_raids(guild.id)) >= MAX_ACTIVE:
+            raise RuntimeError(f"🚫 {MAX_ACTIVE} raids are already running. End one with `/raid_end` first.")
 
-        channel = self._raid_channel(guild)
+        channel = channel or self._raid_channel(guild)
         if not channel:
             raise RuntimeError("🚫 No raid channel configured! Set RAID_CHANNEL_ID or create #raids channel.")
 
@@ -386,13 +539,14 @@ class Raids(commands.Cog):
         # Insert DB row to get raid_id
         async with aiosqlite.connect(DB_PATH) as db:
             cur = await db.execute(
-                "INSERT INTO raids(guild_id, channel_id, title, url, role_id, started_at, ends_at, active) "
-                "VALUES(?,?,?,?,?,?,?,1)",
+                "INSERT INTO raids(guild_id, channel_id, title, url, role_id, started_at, ends_at, active, seq) "
+                "VALUES(?,?,?,?,?,?,?,1,(SELECT COALESCE(MAX(seq), 0) + 1 FROM raids WHERE guild_id=?))",
                 (guild.id, channel.id, title, url, role.id if role else None,
-                 int(started_at.timestamp()), int(ends_at.timestamp())),
+                 int(started_at.timestamp()), int(ends_at.timestamp()), guild.id),
             )
             raid_id = cur.lastrowid
             await db.commit()
+        await SCHEDULER.schedule(f"raid_end:{raid_id}", "raid_end", ends_at.timestamp(), {"raid_id": raid_id})
 
         # Enhanced launch message
         launch_msg = random.choice(LAUNCH_MESSAGES)
@@ -464,9 +618,11 @@ class Raids(commands.Cog):
     @app_commands.describe(
         url="🎯 Target URL (Twitter/X link)", 
         title="⚔️ Battle name/description", 
-        minutes="⏰ Mission duration (minutes)"
+        minutes="⏰ Mission duration (minutes)",
+        channel="📍 Where to post the panel (defaults to the raid channel)"
     )
-    async def raid_new(self, inter: discord.Interaction, url: str, title: str, minutes: int | None = None):
+    async def raid_new(self, inter: discord.Interaction, url: str, title: str, minutes: int | None = None,
+                       channel: discord.TextChannel | None = None):
         if not inter.user.guild_permissions.manage_messages and not inter.user.guild_permissions.manage_guild:
             return await inter.response.send_message("🚫 **ACCESS DENIED!** You need **Manage Messages** or **Manage Server** to launch raids.", ephemeral=True)
         if not TW_URL_RE.search(url):
@@ -474,7 +630,7 @@ class Raids(commands.Cog):
 
         await inter.response.defer(thinking=True, ephemeral=True)
         try:
-            msg = await self._launch_raid(inter.guild, url, title, minutes or DEFAULT_MINUTES)
+            msg = await self._launch_raid(inter.guild, url, title, minutes or DEFAULT_MINUTES, channel)
             await inter.followup.send(f"⚔️ **RAID COMMAND EXECUTED!**\n{msg}", ephemeral=True)
         except Exception as e:
             await inter.followup.send(f"💥 **MISSION FAILED:** {e}", ephemeral=True)
@@ -506,9 +662,18 @@ class Raids(commands.Cog):
 
     @GUILD_DEC
     @app_commands.command(name="raid_status", description="📊 Check the current raid battlefield status.")
-    async def raid_status(self, inter: discord.Interaction):
+    @app_commands.describe(raid="Which raid (defaults to the one in this channel; lists all if several are running)")
+    async def raid_status(self, inter: discord.Interaction, raid: int | None = None):
         await inter.response.defer(ephemeral=True)
-        act = await self._active_raid(inter.guild_id)
+        act = await self._pick_raid(inter, raid, strict=True)
+        if not act and raid is None:
+            raids = await self._active_raids(inter.guild_id)
+            if raids:
+                lines = [f"`#{r[0]}` **{r[3]}** in <#{r[1]}> — {await participant_count(r[0])} raiders • ends <t:{r[7]}:R>"
+                         for r in raids]
+                embed = discord.Embed(title=f"⚔️ **{len(raids)} ACTIVE RAIDS**", description="\n".join(lines),
+                                      color=discord.Color.red())
+                return await inter.followup.send(embed=embed, ephemeral=True)
         if not act:
             embed = discord.Embed(
                 title="🏴 **NO ACTIVE RAIDS**",
@@ -526,10 +691,13 @@ class Raids(commands.Cog):
 
     @GUILD_DEC
     @app_commands.command(name="raid_done", description="✅ Report your mission complete!")
-    async def raid_done(self, inter: discord.Interaction):
+    @app_commands.describe(raid="Which raid (defaults to the one in this channel)")
+    async def raid_done(self, inter: discord.Interaction, raid: int | None = None):
         await inter.response.defer(ephemeral=True)
-        act = await self._active_raid(inter.guild_id)
+        act = await self._pick_raid(inter, raid, strict=True)
         if not act:
+            if raid is None and await self._active_raids(inter.guild_id):
+                return await inter.followup.send("❓ Several raids are running — pick yours with the `raid` option.", ephemeral=True)
             return await inter.followup.send("📭 **NO ACTIVE MISSIONS** - Stand by for orders.", ephemeral=True)
         raid_id = act[0]
         await record_participation(raid_id, inter.user.id)
@@ -540,12 +708,15 @@ class Raids(commands.Cog):
 
     @GUILD_DEC
     @app_commands.command(name="raid_end", description="🏁 End the current raid and declare victory!")
-    async def raid_end(self, inter: discord.Interaction):
+    @app_commands.describe(raid="Which raid (needed when several are running)")
+    async def raid_end(self, inter: discord.Interaction, raid: int | None = None):
         if not inter.user.guild_permissions.manage_messages and not inter.user.guild_permissions.manage_guild:
             return await inter.response.send_message("🚫 **ACCESS DENIED!** Command staff only.", ephemeral=True)
         await inter.response.defer(ephemeral=True)
-        act = await self._active_raid(inter.guild_id)
+        act = await self._pick_raid(inter, raid, strict=True)
         if not act:
+            if raid is None and await self._active_raids(inter.guild_id):
+                return await inter.followup.send("❓ Several raids are running — pick one with the `raid` option.", ephemeral=True)
             return await inter.followup.send("📭 **NO ACTIVE RAIDS** to end.", ephemeral=True)
 
         raid_id, channel_id, msg_id, title, url, role_id, started_at, ends_at = act
@@ -575,30 +746,92 @@ class Raids(commands.Cog):
             await channel.send(embed=e)
         await inter.followup.send("🏁 **RAID CONCLUDED!** Victory declared.", ephemeral=True)
 
-    # ---------- Enhanced Expiry watcher ----------
-    @tasks.loop(minutes=1)
-    async def expiry_watch(self):
+    # ---------- Analytics ----------
+    async def _flush_for_read(self):
+        """Write pending participants before an analytics read; on failure, answer from what's stored."""
         try:
-            async with aiosqlite.connect(DB_PATH) as db:
-                cur = await db.execute("SELECT id, guild_id, channel_id, title, url, ends_at FROM raids WHERE active=1")
-                rows = await cur.fetchall()
-        except Exception:
-            return
+            await TRACKER.flush()
+        except Exception as e:
+            print(f"[Raids] participant flush failed, will retry: {e}")
+
+    @GUILD_DEC
+    @app_commands.command(name="raid_stats", description="🎖️ Raid record: raids joined and participation streaks.")
+    async def raid_stats(self, inter: discord.Interaction, member: discord.Member | None = None):
+        member = member or inter.user
+        await inter.response.defer(ephemeral=True)
+        await self._flush_for_read()
+        st = await ANALYTICS.raider(inter.guild_id, member.id)
+        e = discord.Embed(title=f"{get_rank_emoji(st.raids)} **{member.display_name} — RAID RECORD**",
+                          color=get_raid_color(st.raids))
+        e.add_field(name="⚔️ Raids joined", value=f"**{st.raids}**", inline=True)
+        e.add_field(name="🔥 Current streak", value=f"**{st.streak}**", inline=True)
+        e.add_field(name="🏆 Best streak", value=f"**{st.best_streak}**", inline=True)
+        if st.last_ts:
+            e.set_footer(text="Last raid")
+            e.timestamp = datetime.fromtimestamp(st.last_ts, timezone.utc)
+        await inter.followup.send(embed=e, ephemeral=True)
+
+    @GUILD_DEC
+    @app_commands.command(name="raid_curve", description="📈 How fast raiders joined a raid.")
+    @app_commands.describe(raid="Raid number (defaults to the one in this channel, else the latest)")
+    async def raid_curve(self, inter: discord.Interaction, raid: int | None = None):
+        await inter.response.defer(ephemeral=True)
+        await self._flush_for_read()
+        if raid is None:
+            act = await self._pick_raid(inter, None)
+            raid = act[0] if act else None
+        async with aiosqlite.connect(DB_PATH) as db:
+            cur = await db.execute(
+                "SELECT id, title, started_at, ends_at, participants FROM raids WHERE guild_id=? "
+                + ("AND id=?" if raid is not None else "ORDER BY id DESC LIMIT 1"),
+                (inter.guild_id, raid) if raid is not None else (inter.guild_id,))
+            row = await cur.fetchone()
+        if not row:
+            return await inter.followup.send("📭 No such raid.", ephemeral=True)
+        raid_id, title, started_at, ends_at, total = row
+        points = await ANALYTICS.curve(raid_id)
+        span = max(1, (ends_at - started_at) // 60)
+        marks = sorted({min(span, round(span * i / 10)) for i in range(1, 11)})
+        lines, i, cum = [], 0, 0
+        for m in marks:
+            while i < len(points) and points[i][0] < m:
+                cum = points[i][1]
+                i += 1
+            filled = round(10 * cum / total) if total else 0
+            lines.append(f"`+{m:>3}m` {'█' * filled}{'░' * (10 - filled)} {cum}")
+        e = discord.Embed(title=f"📈 **{title}** (raid #{raid_id})",
+                          description="\n".join(lines) + f"\n\n**{total}** raiders in total", color=get_raid_color(total))
+        await inter.followup.send(embed=e, ephemeral=True)
+
+    @raid_status.autocomplete("raid")
+    @raid_done.autocomplete("raid")
+    @raid_end.autocomplete("raid")
+    @raid_curve.autocomplete("raid")
+    async def _raid_autocomplete(self, inter: discord.Interaction, current: str):
+        return [app_commands.Choice(name=f"#{r[0]} {r[3]}"[:100], value=r[0])
+                for r in await self._active_raids(inter.guild_id) if current in f"{r[0]} {r[3]}"][:25]
+
+    # ---------- Enhanced Expiry (scheduled job at ends_at) ----------
+    async def _expire(self, payload: dict):
+        async with aiosqlite.connect(DB_PATH) as db:
+            cur = await db.execute(
+                "SELECT id, guild_id, channel_id, title, url FROM raids WHERE id=? AND active=1", (payload["raid_id"],))
+            row = await cur.fetchone()
+        if not row:
+            return  # ended by hand in the meantime
+        raid_id, guild_id, channel_id, title, url = row
+        await self.bot.wait_until_ready()
+        guild = self.bot.get_guild(guild_id)
+        channel = guild.get_channel(channel_id) if guild else None
+        await self._end_raid(raid_id)
+        if channel:
+            count = await participant_count(raid_id)
+            completion_msg = random.choice(COMPLETION_MESSAGES)
+            rank_emoji = get_rank_emoji(count)
 
-        for raid_id, guild_id, channel_id, title, url, ends_at in rows:
-            if now_utc().timestamp() >= ends_at:
-                try:
-                    guild = self.bot.get_guild(guild_id)
-                    channel = guild.get_channel(channel_id) if guild else None
-                    await self._end_raid(raid_id)
-                    if channel:
-                        count = await participant_count(raid_id)
-                        completion_msg = random.choice(COMPLETION_MESSAGES)
-                        rank_emoji = get_rank_emoji(count)
-                        
-                        e = discord.Embed(
-                            title="⏰ **TIME'S UP! MISSION COMPLETE!** ⏰",
-                            description=f"""
+            e = discord.Embed(
+                title="⏰ **TIME'S UP! MISSION COMPLETE!** ⏰",
+                description=f"""
 **{completion_msg}**
 
 **Mission:** {title}
@@ -608,17 +841,11 @@ class Raids(commands.Cog):
 {create_progress_bar(count, 20)}
 
 *Time may be up, but legends live forever!*
-                            """.strip(),
-                            color=discord.Color.gold(),
-                        )
-                        e.set_footer(text="⚔️ Auto-completed by Raid Command • Thank you for your service!")
-                        await channel.send(embed=e)
-                except Exception:
-                    pass
-
-    @expiry_watch.before_loop
-    async def _wait_ready(self):
-        await self.bot.wait_until_ready()
+                """.strip(),
+                color=discord.Color.gold(),
+            )
+            e.set_footer(text="⚔️ Auto-completed by Raid Command • Thank you for your service!")
+            await channel.send(embed=e)
 
 
 async def setup(bot: commands.Bot):
@@ -5,6 +5,9 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 
+from services.leaderboards import Leaderboards
+from services.user_stats import UserStats
+
 _GUILD_ID_RAW = os.getenv("GUILD_ID") or ""
 GUILD_ID = int(_GUILD_ID_RAW) if _GUILD_ID_RAW.isdigit() else None
 GUILD_DEC = app_commands.guilds(GUILD_ID) if GUILD_ID else (lambda f: f)
@@ -110,6 +113,8 @@ class Referrals(commands.Cog):
             """)
             
             await db.commit()
+        await Leaderboards(DB_PATH).init()
+        await UserStats(DB_PATH).init()
 
     @commands.Cog.listener()
     async def on_guild_join(self, guild):
@@ -205,6 +210,8 @@ class Referrals(commands.Cog):
                     COALESCE((SELECT successful_invites FROM recruiter_stats WHERE guild_id = ? AND user_id = ?), 0) + 1
                 )
             """, (guild_id, inviter_id, guild_id, inviter_id, guild_id, inviter_id))
+            await Leaderboards.bump(db, "recruits", [(guild_id, inviter_id, 1)])
+            await UserStats.bump(db, "invites", [(guild_id, inviter_id, 1)])
             
             await db.commit()
             print(f"Recorded referral: {inviter_id} invited {invited_id}")
@@ -347,6 +354,8 @@ class Referrals(commands.Cog):
                     COALESCE((SELECT successful_invites FROM recruiter_stats WHERE guild_id = ? AND user_id = ?), 0) + 1
                 )
             """, (guild_id, inviter_id, guild_id, inviter_id, guild_id, inviter_id))
+            await Leaderboards.bump(db, "recruits", [(guild_id, inviter_id, 1)])
+            await UserStats.bump(db, "invites", [(guild_id, inviter_id, 1)])
             
             await db.commit()
             print(f"Recorded referral: {inviter_id} invited {invited_id}")
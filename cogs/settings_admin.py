@@ -15,15 +15,20 @@ def needs_manage_server():
     return app_commands.check(predicate)
 
 # ---- Known keys & basic typing ----
-KEYS_BOOL  = {"ENABLE_USGS", "ENABLE_RELIEFWEB", "ENABLE_EONET", "ENABLE_GDACS"}
+KEYS_BOOL  = {"ENABLE_USGS", "ENABLE_RELIEFWEB", "ENABLE_EONET", "ENABLE_GDACS", "ALERT_WEBHOOKS"}
 KEYS_INT   = {"DISASTER_POLL_MINUTES", "RELIEFWEB_LIMIT", "DISASTER_CHANNEL_ID"}
 KEYS_FLOAT = {"USGS_MIN_MAG", "USGS_PING_MAG"}
 KEYS_FREE  = {
-    "DISASTER_MODE",        # "rt" or "digest"
+    "DISASTER_MODE",        # "rt", "digest" or "hybrid"
     "DIGEST_TIME_UTC",      # "HH:MM"
     "RELIEFWEB_APPNAME",
     "ALERT_ROLE_NAME",
     "DEXSCREENER_CHAIN",
+    "NWS_AREA",             # state/marine codes, e.g. "TX,OK"
+    "NWS_ZONE",             # zone ids, e.g. "TXZ211" (overrides NWS_AREA)
+    "NWS_SEVERITY",         # e.g. "Extreme,Severe"
+    "NWS_URGENCY",          # e.g. "Immediate,Expected"
+    "NWS_EVENT",            # e.g. "Tornado Warning,Flash Flood Warning"
 }
 ALL_KEYS = sorted(KEYS_BOOL | KEYS_INT | KEYS_FLOAT | KEYS_FREE)
 
@@ -40,6 +45,11 @@ def _coerce_value(key: str, value: str) -> str:
     if k in KEYS_FLOAT:
         float(value)  # will raise if invalid
         return str(float(value))
+    if k == "DISASTER_MODE":
+        m = value.strip().lower()
+        if m not in {"rt", "digest", "hybrid"}:
+            raise ValueError("mode must be rt, digest or hybrid")
+        return m
     return value  # free-form
 
 class SettingsAdmin(commands.Cog):
@@ -5,6 +5,7 @@ from discord.ext import commands
 from discord import app_commands
 
 from services.settings import Settings
+from services.guild_config import GuildConfigStore, SOURCES as FEED_SOURCES, parse_sources
 
 _GUILD_ID_RAW = os.getenv("GUILD_ID") or ""
 GUILD_ID = int(_GUILD_ID_RAW) if _GUILD_ID_RAW.isdigit() else None
@@ -29,9 +30,11 @@ class SourcesAdmin(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.settings = Settings()
+        self.guild_cfg = GuildConfigStore()
 
     async def cog_load(self):
         await self.settings.init()
+        await self.guild_cfg.init()
 
     # ---- helpers ----
     async def _set(self, key: str, value: str):
@@ -140,5 +143,121 @@ class SourcesAdmin(commands.Cog):
 
         await inter.response.send_message("✅ Updated:\n• " + "\n• ".join(changed) + "\n\n*(Changes take effect immediately in the next poll/digest tick.)*", ephemeral=True)
 
+    # ---- /sources_guild_show ----
+    @GUILD_DEC
+    @app_commands.command(name="sources_guild_show", description="(Staff) Show this server's disaster alert overrides.")
+    async def sources_guild_show(self, inter: discord.Interaction):
+        if not (inter.user.guild_permissions.manage_guild or inter.user.guild_permissions.administrator):
+            return await inter.response.send_message("🚫 Manage Server required.", ephemeral=True)
+        row = await self.guild_cfg.get_row(inter.guild_id)
+        if not row:
+            return await inter.response.send_message(
+                "This server has no overrides; it uses the global settings (if it owns `DISASTER_CHANNEL_ID`).",
+                ephemeral=True,
+            )
+
+        def show(v, fmt=str):
+            return fmt(v) if v not in (None, "") else "*(global)*"
+
+        async def show_channel(v, key: str):
+            if v:
+                return f"<#{v}>"
+            try:  # unset falls back to the global channel only if it lives in this server
+                gid = int(await self.settings.get(key, os.getenv(key, "0")) or 0)
+            except ValueError:
+                gid = 0
+            return f"*(global: <#{gid}>)*" if gid and inter.guild.get_channel(gid) else "*(not set — nothing posted)*"
+
+        e = discord.Embed(title="🌐 Server Disaster Config", color=discord.Color.blurple())
+        e.add_field(name="Enabled", value="yes" if row["enabled"] else "no", inline=True)
+        e.add_field(name="Realtime Channel", value=await show_channel(row["channel_id"], "DISASTER_CHANNEL_ID"), inline=True)
+        e.add_field(name="Digest Channel", value=await show_channel(row["digest_channel_id"], "GENERAL_CHANNEL_ID"), inline=True)
+        e.add_field(name="Alert Role", value=show(row["alert_role"]), inline=True)
+        e.add_field(name="USGS Min/Ping", value=f"{show(row['usgs_min_mag'])} / {show(row['usgs_ping_mag'])}", inline=True)
+        e.add_field(name="Digest Time (UTC)", value=show(row["digest_time"]), inline=True)
+        e.add_field(name="Mode", value=show(row["mode"]), inline=True)
+        e.add_field(name="Sources", value=show(row["sources"]), inline=False)
+        await inter.response.send_message(embed=e, ephemeral=True)
+
+    # ---- /sources_guild_set ----
+    @GUILD_DEC
+    @app_commands.command(name="sources_guild_set", description="(Staff) Configure disaster alerts for this server.")
+    @app_commands.describe(
+        channel="Realtime alert channel",
+        digest_channel="Daily digest channel",
+        alert_role="Role pinged for severe items",
+        usgs_min_mag="Min magnitude for USGS posts",
+        usgs_ping_mag="Magnitude that triggers a role ping",
+        digest_time_utc="Daily digest time (UTC HH:MM)",
+        sources=f"Comma list or 'default'. Known: {', '.join(FEED_SOURCES)}"[:100],
+        enabled="Turn alerts for this server on/off",
+        mode="rt = live posts, digest = daily digest only, hybrid = severe live + digest",
+    )
+    @app_commands.choices(mode=[
+        app_commands.Choice(name="Realtime", value="rt"),
+        app_commands.Choice(name="Digest only", value="digest"),
+        app_commands.Choice(name="Hybrid (severe live)", value="hybrid"),
+        app_commands.Choice(name="Global default", value="default"),
+    ])
+    async def sources_guild_set(
+        self,
+        inter: discord.Interaction,
+        channel: discord.TextChannel | None = None,
+        digest_channel: discord.TextChannel | None = None,
+        alert_role: discord.Role | None = None,
+        usgs_min_mag: float | None = None,
+        usgs_ping_mag: float | None = None,
+        digest_time_utc: str | None = None,
+        sources: str | None = None,
+        enabled: bool | None = None,
+        mode: app_commands.Choice[str] | None = None,
+    ):
+        if not (inter.user.guild_permissions.manage_guild or inter.user.guild_permissions.administrator):
+            return await inter.response.send_message("🚫 Manage Server required.", ephemeral=True)
+
+        values = {}
+        if channel is not None:
+            values["channel_id"] = channel.id
+        if digest_channel is not None:
+            values["digest_channel_id"] = digest_channel.id
+        if alert_role is not None:
+            values["alert_role"] = alert_role.name
+        if usgs_min_mag is not None:
+            values["usgs_min_mag"] = usgs_min_mag
+        if usgs_ping_mag is not None:
+            values["usgs_ping_mag"] = usgs_ping_mag
+        if digest_time_utc is not None:
+            try:
+                hh, mm = map(int, digest_time_utc.split(":"))
+                assert 0 <= hh < 24 and 0 <= mm < 60
+            except Exception:
+                return await inter.response.send_message("❌ Digest time must be HH:MM (UTC).", ephemeral=True)
+            values["digest_time"] = f"{hh:02d}:{mm:02d}"
+        if sources is not None:
+            try:
+                parsed = parse_sources(sources)
+            except ValueError as e:
+                return await inter.response.send_message(f"❌ {e}", ephemeral=True)
+            values["sources"] = ",".join(sorted(parsed)) if parsed else None
+        if enabled is not None:
+            values["enabled"] = 1 if enabled else 0
+        if mode is not None:
+            values["mode"] = None if mode.value == "default" else mode.value
+
+        if not values:
+            return await inter.response.send_message("No changes provided.", ephemeral=True)
+        await self.guild_cfg.update(inter.guild_id, **values)
+        changed = [f"{k}={v if v is not None else 'default'}" for k, v in values.items()]
+        await inter.response.send_message("✅ Updated:\n• " + "\n• ".join(changed) + "\n\n*(Applies from the next poll/digest tick.)*", ephemeral=True)
+
+    # ---- /sources_guild_reset ----
+    @GUILD_DEC
+    @app_commands.command(name="sources_guild_reset", description="(Staff) Remove this server's disaster overrides.")
+    async def sources_guild_reset(self, inter: discord.Interaction):
+        if not (inter.user.guild_permissions.manage_guild or inter.user.guild_permissions.administrator):
+            return await inter.response.send_message("🚫 Manage Server required.", ephemeral=True)
+        await self.guild_cfg.delete(inter.guild_id)
+        await inter.response.send_message("✅ Server overrides cleared.", ephemeral=True)
+
 async def setup(bot):
     await bot.add_cog(SourcesAdmin(bot))
@@ -6,6 +6,8 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+from services.user_stats import UserStats
+
 DB_PATH = os.getenv("DB_PATH", "pal_bot.sqlite")
 REVIEW_CH_ID = int(os.getenv("VERIFY_REVIEW_CHANNEL_ID", "0") or 0)
 
@@ -33,6 +35,9 @@ class Verify(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def cog_load(self):
+        await UserStats(DB_PATH).init()
+
     # ---------- DB ----------
     async def _db(self):
         db = await aiosqlite.connect(DB_PATH)
@@ -154,6 +159,7 @@ class Verify(commands.Cog):
             await member.add_roles(role_obj, reason=f"Verified by {inter.user}")
             await db.execute("UPDATE verify_requests SET status='approved', reviewer_id=? WHERE id=?",
                              (inter.user.id, request_id))
+            await UserStats.bump(db, "verifications", [(inter.guild_id, user_id, 1)])
             await db.commit()
 
         # DM user
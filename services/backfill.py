@@ -0,0 +1,130 @@
+import os
+import time
+import asyncio
+import aiosqlite
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+DB_PATH = os.getenv("DB_PATH", "pal_bot.sqlite")
+
+# source → chunk width in days (small enough that one chunk is a handful of requests)
+BACKFILL_CHUNK_DAYS: Dict[str, float] = {
+    "usgs": 1.0,
+    "reliefweb": 7.0,
+    "reliefweb_dis": 7.0,
+    "eonet": 30.0,
+}
+BACKFILL_MAX_DAYS = int(os.getenv("BACKFILL_MAX_DAYS", "365") or 365)
+# Shared request budget for the whole backfill; live polls never wait on it
+BACKFILL_RPS = float(os.getenv("BACKFILL_RPS", "1") or 1)
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS backfill_progress (
+    source     TEXT PRIMARY KEY,
+    start_at   INTEGER NOT NULL,   -- window start (epoch s)
+    end_at     INTEGER NOT NULL,   -- window end (epoch s)
+    cursor     INTEGER NOT NULL,   -- next chunk starts here
+    min_mag    REAL,
+    items      INTEGER NOT NULL DEFAULT 0,
+    status     TEXT NOT NULL,      -- running / done / stopped / error
+    error      TEXT,
+    updated_at TEXT NOT NULL
+)
+"""
+
+@dataclass
+class BackfillJob:
+    source: str
+    start_at: int
+    end_at: int
+    cursor: int
+    min_mag: Optional[float]
+    items: int
+    status: str
+    error: Optional[str]
+    updated_at: str
+
+    @property
+    def pct(self) -> float:
+        span = max(1, self.end_at - self.start_at)
+        return min(100.0, 100.0 * (self.cursor - self.start_at) / span)
+
+    @property
+    def finished(self) -> bool:
+        return self.status == "done"
+
+
+class RateLimiter:
+    """Spaces awaited calls at least 1/rate seconds apart (shared across callers)."""
+
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / max(0.01, rate_per_sec)
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+                now = self._next
+            self._next = now + self.interval
+
+
+class BackfillProgress:
+    """Per-source backfill windows and cursors so an interrupted run resumes where it stopped."""
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+
+    async def init(self):
+        async with aiosqlite.connect(self.path) as db:
+            await db.execute(CREATE_SQL)
+            await db.commit()
+
+    async def all(self) -> List[BackfillJob]:
+        async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute(
+                "SELECT source, start_at, end_at, cursor, min_mag, items, status, error, updated_at "
+                "FROM backfill_progress ORDER BY source"
+            )
+            return [BackfillJob(*r) for r in await cur.fetchall()]
+
+    async def get(self, source: str) -> Optional[BackfillJob]:
+        async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute(
+                "SELECT source, start_at, end_at, cursor, min_mag, items, status, error, updated_at "
+                "FROM backfill_progress WHERE source=?",
+                (source,),
+            )
+            row = await cur.fetchone()
+        return BackfillJob(*row) if row else None
+
+    async def start(self, source: str, start_at: int, end_at: int, min_mag: Optional[float]) -> BackfillJob:
+        now = datetime.now(timezone.utc).isoformat()
+        async with aiosqlite.connect(self.path) as db:
+            await db.execute(
+                """INSERT OR REPLACE INTO backfill_progress
+                       (source, start_at, end_at, cursor, min_mag, items, status, error, updated_at)
+                   VALUES (?,?,?,?,?,0,'running',NULL,?)""",
+                (source, start_at, end_at, start_at, min_mag, now),
+            )
+            await db.commit()
+        return BackfillJob(source, start_at, end_at, start_at, min_mag, 0, "running", None, now)
+
+    async def advance(self, source: str, cursor: int, added: int):
+        async with aiosqlite.connect(self.path) as db:
+            await db.execute(
+                "UPDATE backfill_progress SET cursor=?, items=items+?, updated_at=? WHERE source=?",
+                (cursor, added, datetime.now(timezone.utc).isoformat(), source),
+            )
+            await db.commit()
+
+    async def set_status(self, source: str, status: str, error: Optional[str] = None):
+        async with aiosqlite.connect(self.path) as db:
+            await db.execute(
+                "UPDATE backfill_progress SET status=?, error=?, updated_at=? WHERE source=?",
+                (status, error, datetime.now(timezone.utc).isoformat(), source),
+            )
+            await db.commit()
@@ -0,0 +1,220 @@
+import os
+import math
+import logging
+import aiosqlite
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DB_PATH = os.getenv("DB_PATH", "pal_bot.sqlite")
+
+# Grid cell size (degrees) for the spatial index. 5° → 36 x 72 cells.
+GRID_DEG = 5.0
+EARTH_KM = 6371.0
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS geo_subscriptions (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id    INTEGER NOT NULL,
+    target_type TEXT NOT NULL,      -- 'user' (DM) or 'channel'
+    target_id   INTEGER NOT NULL,
+    kind        TEXT NOT NULL,      -- 'bbox', 'circle' or 'country'
+    min_lat REAL, min_lon REAL, max_lat REAL, max_lon REAL,
+    lat REAL, lon REAL, radius_km REAL,
+    country     TEXT,
+    label       TEXT,
+    created_by  INTEGER,
+    created_at  TEXT NOT NULL
+)
+"""
+
+@dataclass
+class GeoSub:
+    id: int
+    guild_id: int
+    target_type: str
+    target_id: int
+    kind: str
+    min_lat: Optional[float] = None
+    min_lon: Optional[float] = None
+    max_lat: Optional[float] = None
+    max_lon: Optional[float] = None
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    radius_km: Optional[float] = None
+    country: Optional[str] = None
+    label: Optional[str] = None
+    created_by: Optional[int] = None
+
+    def describe(self) -> str:
+        if self.kind == "country":
+            return f"country {self.country}"
+        if self.kind == "circle":
+            return f"{self.radius_km:g} km around {self.lat:.2f}, {self.lon:.2f}"
+        return f"box {self.min_lat:.2f},{self.min_lon:.2f} → {self.max_lat:.2f},{self.max_lon:.2f}"
+
+    def contains(self, lat: float, lon: float) -> bool:
+        if self.kind == "circle":
+            return haversine_km(self.lat, self.lon, lat, lon) <= self.radius_km
+        if self.kind == "bbox":
+            if not (self.min_lat <= lat <= self.max_lat):
+                return False
+            if self.min_lon <= self.max_lon:
+                return self.min_lon <= lon <= self.max_lon
+            # box crosses the antimeridian
+            return lon >= self.min_lon or lon <= self.max_lon
+        return False
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def grid_cell(lat: float, lon: float) -> Tuple[int, int]:
+    lat = max(-90.0, min(89.999, lat))
+    lon = ((lon + 180.0) % 360.0) - 180.0
+    return int((lat + 90.0) // GRID_DEG), int((lon + 180.0) // GRID_DEG)
+
+def _lon_spans(min_lon: float, max_lon: float) -> List[Tuple[float, float]]:
+    if min_lon <= max_lon:
+        return [(min_lon, max_lon)]
+    return [(min_lon, 180.0), (-180.0, max_lon)]
+
+def cells_for_box(min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> List[Tuple[int, int]]:
+    r0, _ = grid_cell(min_lat, 0.0)
+    r1, _ = grid_cell(max_lat, 0.0)
+    out = []
+    for lo, hi in _lon_spans(min_lon, max_lon):
+        _, c0 = grid_cell(0.0, lo)
+        _, c1 = grid_cell(0.0, min(hi, 179.999))
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                out.append((r, c))
+    return out
+
+def circle_bbox(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    dlat = math.degrees(radius_km / EARTH_KM)
+    min_lat, max_lat = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+    coslat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if coslat <= 1e-6 or max_lat >= 90.0 or min_lat <= -90.0:
+        return min_lat, -180.0, max_lat, 180.0
+    dlon = math.degrees(radius_km / (EARTH_KM * coslat))
+    if dlon >= 180.0:
+        return min_lat, -180.0, max_lat, 180.0
+    min_lon = ((lon - dlon + 180.0) % 360.0) - 180.0
+    max_lon = ((lon + dlon + 180.0) % 360.0) - 180.0
+    return min_lat, min_lon, max_lat, max_lon
+
+
+class GeoIndex:
+    """
+    Fixed-grid spatial index: every area subscription is registered in each
+    GRID_DEG cell its bounding box touches, so a point lookup only tests the
+    handful of subscriptions sharing its cell. Country subscriptions live in
+    a plain code → subs map.
+    """
+
+    def __init__(self):
+        self._cells: Dict[Tuple[int, int], List[GeoSub]] = {}
+        self._countries: Dict[str, List[GeoSub]] = {}
+        self._by_id: Dict[int, GeoSub] = {}
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def _cells_of(self, sub: GeoSub) -> List[Tuple[int, int]]:
+        if sub.kind == "circle":
+            return cells_for_box(*circle_bbox(sub.lat, sub.lon, sub.radius_km))
+        if sub.kind == "bbox":
+            return cells_for_box(sub.min_lat, sub.min_lon, sub.max_lat, sub.max_lon)
+        return []
+
+    def add(self, sub: GeoSub):
+        self._by_id[sub.id] = sub
+        if sub.kind == "country":
+            self._countries.setdefault(sub.country, []).append(sub)
+            return
+        for cell in self._cells_of(sub):
+            self._cells.setdefault(cell, []).append(sub)
+
+    def remove(self, sub_id: int) -> Optional[GeoSub]:
+        sub = self._by_id.pop(sub_id, None)
+        if not sub:
+            return None
+        buckets = [self._countries.get(sub.country, [])] if sub.kind == "country" \
+            else [self._cells.get(c, []) for c in self._cells_of(sub)]
+        for bucket in buckets:
+            bucket[:] = [s for s in bucket if s.id != sub_id]
+        return sub
+
+    def get(self, sub_id: int) -> Optional[GeoSub]:
+        return self._by_id.get(sub_id)
+
+    def all(self) -> List[GeoSub]:
+        return list(self._by_id.values())
+
+    def match(self, lat: Optional[float] = None, lon: Optional[float] = None,
+              countries: Iterable[str] = ()) -> List[GeoSub]:
+        found: Dict[int, GeoSub] = {}
+        if lat is not None and lon is not None:
+            for sub in self._cells.get(grid_cell(lat, lon), ()):
+                if sub.id not in found and sub.contains(lat, lon):
+                    found[sub.id] = sub
+        for code in countries or ():
+            for sub in self._countries.get(code.upper(), ()):
+                found.setdefault(sub.id, sub)
+        return list(found.values())
+
+
+class GeoSubscriptions:
+    """Persistent region subscriptions backed by an in-memory GeoIndex."""
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self.index = GeoIndex()
+
+    async def init(self):
+        async with aiosqlite.connect(self.path) as db:
+            await db.execute(CREATE_SQL)
+            await db.commit()
+            cur = await db.execute(
+                "SELECT id, guild_id, target_type, target_id, kind, min_lat, min_lon, max_lat, max_lon, "
+                "lat, lon, radius_km, country, label, created_by FROM geo_subscriptions"
+            )
+            rows = await cur.fetchall()
+        self.index = GeoIndex()
+        for row in rows:
+            self.index.add(GeoSub(*row))
+        logging.info("GeoSubscriptions: loaded %s subscription(s)", len(rows))
+
+    async def add(self, sub: GeoSub) -> GeoSub:
+        async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute(
+                """INSERT INTO geo_subscriptions(guild_id, target_type, target_id, kind,
+                       min_lat, min_lon, max_lat, max_lon, lat, lon, radius_km, country, label,
+                       created_by, created_at)
+                   VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
+                (sub.guild_id, sub.target_type, sub.target_id, sub.kind,
+                 sub.min_lat, sub.min_lon, sub.max_lat, sub.max_lon,
+                 sub.lat, sub.lon, sub.radius_km, sub.country, sub.label,
+                 sub.created_by, datetime.now(timezone.utc).isoformat()),
+            )
+            sub.id = cur.lastrowid
+            await db.commit()
+        self.index.add(sub)
+        return sub
+
+    async def remove(self, sub_id: int) -> Optional[GeoSub]:
+        async with aiosqlite.connect(self.path) as db:
+            await db.execute("DELETE FROM geo_subscriptions WHERE id=?", (sub_id,))
+            await db.commit()
+        return self.index.remove(sub_id)
+
+    def list_guild(self, guild_id: int) -> List[GeoSub]:
+        return sorted((s for s in self.index.all() if s.guild_id == guild_id), key=lambda s: s.id)
+
+    def match(self, lat: Optional[float] = None, lon: Optional[float] = None,
+              countries: Iterable[str] = ()) -> List[GeoSub]:
+        return self.index.match(lat, lon, countries)
@@ -0,0 +1,133 @@
+import os
+import aiosqlite
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+DB_PATH = os.getenv("DB_PATH", "pal_bot.sqlite")
+
+# item source → (global Settings toggle, default)
+SOURCES: Dict[str, tuple] = {
+    "usgs": ("ENABLE_USGS", True),
+    "reliefweb": ("ENABLE_RELIEFWEB", True),
+    "reliefweb_dis": ("ENABLE_RW_DISASTERS", False),
+    "eonet": ("ENABLE_EONET", True),
+    "gdacs_json": ("ENABLE_GDACS_JSON", True),
+    "gdacs": ("ENABLE_GDACS", True),
+    "who": ("ENABLE_WHO", True),
+    "copernicus": ("ENABLE_COPERNICUS", True),
+    "firms": ("ENABLE_FIRMS", False),
+    "nws": ("ENABLE_NWS", False),
+    "nhc": ("ENABLE_NHC", True),
+    "ptwc": ("ENABLE_PTWC", True),
+    "gvp": ("ENABLE_GVP", True),
+    "floodlist": ("ENABLE_FLOODLIST", True),
+}
+
+# rt = post everything live; digest = daily digest only; hybrid = severe items live, everything in the digest
+MODES = ("rt", "digest", "hybrid")
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS disaster_guilds (
+    guild_id          INTEGER PRIMARY KEY,
+    enabled           INTEGER NOT NULL DEFAULT 1,
+    channel_id        INTEGER,
+    digest_channel_id INTEGER,
+    alert_role        TEXT,
+    sources           TEXT,     -- comma list of SOURCES keys; NULL = global toggles
+    usgs_min_mag      REAL,
+    usgs_ping_mag     REAL,
+    digest_time       TEXT,     -- 'HH:MM' UTC
+    mode              TEXT      -- one of MODES; NULL = global DISASTER_MODE
+)
+"""
+
+# columns added after the first release (name, type)
+MIGRATIONS = [("mode", "TEXT")]
+
+COLUMNS = ["enabled", "channel_id", "digest_channel_id", "alert_role", "sources",
+           "usgs_min_mag", "usgs_ping_mag", "digest_time", "mode"]
+
+@dataclass
+class GuildDisasterConfig:
+    """Effective per-guild watcher config (row values with global fallbacks applied)."""
+    guild_id: int
+    channel_id: int
+    digest_channel_id: int
+    alert_role: Optional[str]
+    sources: Set[str] = field(default_factory=set)
+    min_mag: float = 5.0
+    ping_mag: float = 6.8
+    digest_time: str = "09:00"
+    mode: str = "rt"
+
+    @property
+    def realtime(self) -> bool:
+        return self.mode != "digest"
+
+    @property
+    def digest(self) -> bool:
+        return self.mode != "rt"
+
+    def wants(self, source: str, sev) -> bool:
+        if source not in self.sources:
+            return False
+        if source == "usgs":
+            return (sev or 0) >= self.min_mag
+        return True
+
+def parse_sources(raw: Optional[str]) -> Optional[Set[str]]:
+    if raw is None or not raw.strip() or raw.strip().lower() == "default":
+        return None
+    out = {s.strip().lower() for s in raw.split(",") if s.strip()}
+    unknown = out - set(SOURCES)
+    if unknown:
+        raise ValueError(f"unknown source(s): {', '.join(sorted(unknown))}")
+    return out
+
+def parse_mode(raw: Optional[str], default: str = "rt") -> str:
+    m = (raw or "").strip().lower()
+    return m if m in MODES else default
+
+class GuildConfigStore:
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+
+    async def init(self):
+        async with aiosqlite.connect(self.path) as db:
+            await db.execute(CREATE_SQL)
+            cur = await db.execute("PRAGMA table_info(disaster_guilds)")
+            have = {r[1] for r in await cur.fetchall()}
+            for col, typ in MIGRATIONS:
+                if col not in have:
+                    await db.execute(f"ALTER TABLE disaster_guilds ADD COLUMN {col} {typ}")
+            await db.commit()
+
+    async def all_rows(self) -> List[dict]:
+        async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute(f"SELECT guild_id, {', '.join(COLUMNS)} FROM disaster_guilds")
+            rows = await cur.fetchall()
+        return [dict(zip(["guild_id"] + COLUMNS, r)) for r in rows]
+
+    async def get_row(self, guild_id: int) -> Optional[dict]:
+        async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute(f"SELECT guild_id, {', '.join(COLUMNS)} FROM disaster_guilds WHERE guild_id=?", (guild_id,))
+            row = await cur.fetchone()
+        return dict(zip(["guild_id"] + COLUMNS, row)) if row else None
+
+    async def update(self, guild_id: int, **values):
+        """Upsert the given columns; a value of None clears it back to the global fallback."""
+        cols = [c for c in values if c in COLUMNS]
+        if not cols:
+            return
+        async with aiosqlite.connect(self.path) as db:
+            await db.execute("INSERT OR IGNORE INTO disaster_guilds(guild_id) VALUES (?)", (guild_id,))
+            await db.execute(
+                f"UPDATE disaster_guilds SET {', '.join(c + '=?' for c in cols)} WHERE guild_id=?",
+                [values[c] for c in cols] + [guild_id],
+            )
+            await db.commit()
+
+    async def delete(self, guild_id: int):
+        async with aiosqlite.connect(self.path) as db:
+            await db.execute("DELETE FROM disaster_guilds WHERE guild_id=?", (guild_id,))
+            await db.commit()
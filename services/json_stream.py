@@ -0,0 +1,114 @@
+import re
+import json
+import codecs
+from typing import Any, AsyncIterator, List, Optional
+
+# structural bytes that matter while looking for the array; everything else is skipped by one regex search
+_TOKEN = re.compile(rb'[\[\]{}"\\]')
+_QUOTE, _BSLASH = ord('"'), ord("\\")
+_SKIP = re.compile(r"[\s,]*")
+_DECODER = json.JSONDecoder()
+MAX_ELEMENT_CHARS = 8 * 1024 * 1024  # a single element larger than this means the stream is broken
+
+
+class JsonArrayStream:
+    """
+    Incremental reader for one top-level array of a JSON object, e.g. the
+    "features" list of a GeoJSON FeatureCollection. Bytes before the array are
+    scanned (not decoded) until the key is found; after that each element is
+    decoded on its own with the C decoder as soon as it is complete. Only the
+    unconsumed tail of the stream is buffered, so memory stays flat however
+    long the array is, and nothing after the array is ever read.
+    """
+
+    def __init__(self, key: str):
+        self.key = key.encode()
+        self.depth = 0
+        self.in_str = False
+        self.esc = False
+        self.in_array = False
+        self.done = False
+        self.last_key: Optional[bytes] = None
+        self._key_buf: Optional[bytearray] = None
+        self._text = ""
+        self._utf8 = codecs.getincrementaldecoder("utf-8")("replace")
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        if self.done:
+            return []
+        if not self.in_array:
+            start = self._find_array(chunk)
+            if start is None:
+                return []
+            chunk = chunk[start:]
+        self._text += self._utf8.decode(chunk)
+        return self._drain()
+
+    def _drain(self) -> List[Any]:
+        out: List[Any] = []
+        text, idx = self._text, 0
+        while True:
+            idx = _SKIP.match(text, idx).end()
+            if idx >= len(text):
+                break
+            if text[idx] == "]":
+                self.done = True
+                break
+            try:
+                obj, idx_end = _DECODER.raw_decode(text, idx)
+            except json.JSONDecodeError:
+                if len(text) - idx > MAX_ELEMENT_CHARS:
+                    raise ValueError("JSON array element exceeds MAX_ELEMENT_CHARS")
+                break  # element not complete yet
+            out.append(obj)
+            idx = idx_end
+        self._text = "" if self.done else text[idx:]
+        return out
+
+    def _find_array(self, chunk: bytes) -> Optional[int]:
+        """Track depth/strings/keys until `"key": [` at depth 1; return the offset just past '['."""
+        pos, n = 0, len(chunk)
+        key_start = 0 if self._key_buf is not None else None
+        while pos < n:
+            if self.esc:
+                self.esc = False
+                pos += 1
+                continue
+            m = _TOKEN.search(chunk, pos)
+            if not m:
+                break
+            i = m.start()
+            c = chunk[i]
+            pos = i + 1
+            if self.in_str:
+                if c == _BSLASH:
+                    self.esc = True
+                elif c == _QUOTE:
+                    self.in_str = False
+                    if self._key_buf is not None:
+                        self.last_key = bytes(self._key_buf + chunk[key_start:i])
+                        self._key_buf, key_start = None, None
+            elif c == _QUOTE:
+                self.in_str = True
+                if self.depth == 1:
+                    self._key_buf, key_start = bytearray(), i + 1
+            elif c in b"[{":
+                if self.depth == 1 and c == ord("[") and self.last_key == self.key:
+                    self.in_array = True
+                    return i + 1
+                self.depth += 1
+            else:
+                self.depth -= 1
+        if self._key_buf is not None:
+            self._key_buf += chunk[key_start:]
+        return None
+
+
+async def iter_json_array(content, key: str, chunk_size: int = 64 * 1024) -> AsyncIterator[Any]:
+    """Yield decoded elements of `key` from an aiohttp StreamReader (resp.content)."""
+    parser = JsonArrayStream(key)
+    async for chunk in content.iter_chunked(chunk_size):
+        for obj in parser.feed(chunk):
+            yield obj
+        if parser.done:
+            break
@@ -0,0 +1,141 @@
+import os
+import aiosqlite
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Tuple
+
+DB_PATH = os.getenv("DB_PATH", "pal_bot.sqlite")
+
+BOARDS = ("xp", "rep", "recruits", "raids")
+WINDOWS = ("week", "month", "season")
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS leaderboard_buckets(
+    board    TEXT NOT NULL,      -- xp / rep / recruits / raids
+    period   TEXT NOT NULL,      -- w2025-41 / m2025-10 / s3
+    guild_id INTEGER NOT NULL,
+    user_id  INTEGER NOT NULL,
+    score    INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (board, period, guild_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_lb_rank ON leaderboard_buckets(board, period, guild_id, score DESC, user_id);
+CREATE TABLE IF NOT EXISTS leaderboard_seasons(
+    season_id  INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id   INTEGER NOT NULL,
+    name       TEXT NOT NULL,
+    started_at INTEGER NOT NULL,
+    ended_at   INTEGER            -- NULL while current
+);
+CREATE INDEX IF NOT EXISTS idx_lb_seasons_open ON leaderboard_seasons(guild_id, ended_at);
+"""
+
+BUMP_SQL = """
+INSERT INTO leaderboard_buckets(board, period, guild_id, user_id, score) VALUES (?,?,?,?,?)
+ON CONFLICT(board, period, guild_id, user_id) DO UPDATE SET score = score + excluded.score
+"""
+
+# the guild's open season is resolved inside the statement, so rollover never touches writers
+BUMP_SEASON_SQL = """
+INSERT INTO leaderboard_buckets(board, period, guild_id, user_id, score)
+SELECT ?, 's' || season_id, guild_id, ?, ? FROM leaderboard_seasons WHERE guild_id=? AND ended_at IS NULL
+ON CONFLICT(board, period, guild_id, user_id) DO UPDATE SET score = score + excluded.score
+"""
+
+
+def period_keys(when: Optional[datetime] = None) -> Tuple[str, str]:
+    """(week, month) bucket keys for a moment (UTC, ISO weeks)."""
+    when = when or datetime.now(timezone.utc)
+    year, week, _ = when.isocalendar()
+    return f"w{year}-{week:02d}", f"m{when.year}-{when.month:02d}"
+
+
+@dataclass
+class Season:
+    season_id: int
+    guild_id: int
+    name: str
+    started_at: int
+    ended_at: Optional[int]
+
+
+class Leaderboards:
+    """
+    Per-period leaderboard buckets (week, month, season) for XP, reputation and
+    recruiting, incremented as events happen. A windowed leaderboard is one
+    indexed range read of a single bucket; starting a season just closes the
+    open season row and opens another, old buckets are never rewritten.
+    """
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+
+    async def init(self):
+        async with aiosqlite.connect(self.path) as db:
+            await db.executescript(CREATE_SQL)
+            await db.commit()
+
+    # ---- writes ----
+
+    @staticmethod
+    async def bump(db: aiosqlite.Connection, board: str, rows: Iterable[Tuple[int, int, int]],
+                   when: Optional[datetime] = None):
+        """Add (guild_id, user_id, amount) rows to the current buckets, inside the caller's transaction."""
+        rows = [r for r in rows if r[2]]
+        if not rows:
+            return
+        week, month = period_keys(when)
+        await db.executemany(BUMP_SQL, [(board, p, g, u, n) for g, u, n in rows for p in (week, month)])
+        await db.executemany(BUMP_SEASON_SQL, [(board, u, n, g) for g, u, n in rows])
+
+    async def record(self, board: str, guild_id: int, user_id: int, amount: int):
+        async with aiosqlite.connect(self.path) as db:
+            await self.bump(db, board, [(guild_id, user_id, amount)])
+            await db.commit()
+
+    # ---- seasons ----
+
+    async def current_season(self, guild_id: int) -> Optional[Season]:
+        async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute(
+                "SELECT season_id, guild_id, name, started_at, ended_at FROM leaderboard_seasons "
+                "WHERE guild_id=? AND ended_at IS NULL", (guild_id,))
+            row = await cur.fetchone()
+        return Season(*row) if row else None
+
+    async def seasons(self, guild_id: int) -> List[Season]:
+        async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute(
+                "SELECT season_id, guild_id, name, started_at, ended_at FROM leaderboard_seasons "
+                "WHERE guild_id=? ORDER BY season_id DESC", (guild_id,))
+            return [Season(*r) for r in await cur.fetchall()]
+
+    async def start_season(self, guild_id: int, name: str) -> Season:
+        """Close the open season (if any) and open a new one."""
+        now = int(datetime.now(timezone.utc).timestamp())
+        async with aiosqlite.connect(self.path) as db:
+            await db.execute("UPDATE leaderboard_seasons SET ended_at=? WHERE guild_id=? AND ended_at IS NULL", (now, guild_id))
+            cur = await db.execute("INSERT INTO leaderboard_seasons(guild_id, name, started_at) VALUES (?,?,?)",
+                                   (guild_id, name, now))
+            await db.commit()
+        return Season(cur.lastrowid, guild_id, name, now, None)
+
+    async def end_season(self, guild_id: int) -> Optional[Season]:
+        season = await self.current_season(guild_id)
+        if season:
+            season.ended_at = int(datetime.now(timezone.utc).timestamp())
+            async with aiosqlite.connect(self.path) as db:
+                await db.execute("UPDATE leaderboard_seasons SET ended_at=? WHERE season_id=?", (season.ended_at, season.season_id))
+                await db.commit()
+        return season
+
+    # ---- reads ----
+
+    async def top(self, board: str, guild_id: int, period: str, limit: int = 10, offset: int = 0) -> List[Tuple[int, int]]:
+        """(user_id, score) for one bucket, best first."""
+        async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute(
+                "SELECT user_id, score FROM leaderboard_buckets WHERE board=? AND period=? AND guild_id=? AND score > 0 "
+                "ORDER BY score DESC, user_id LIMIT ? OFFSET ?",
+                (board, period, guild_id, limit, offset),
+            )
+            return [tuple(r) for r in await cur.fetchall()]
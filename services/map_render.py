@@ -0,0 +1,181 @@
+import io
+import os
+import asyncio
+import logging
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError:  # maps are optional; alerts still go out as text-only embeds
+    Image = ImageDraw = None
+
+BASEMAP_PATH = os.getenv("DISASTER_BASEMAP_PATH") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "maps", "world_2048.png")
+MAP_SIZE = (800, 400)
+MAP_MAX_ZOOM = 3
+MAP_WORKERS = int(os.getenv("MAP_WORKERS", "2") or 2)
+MAP_CACHE_SIZE = int(os.getenv("MAP_CACHE_SIZE", "128") or 128)
+
+# hazard → marker colour
+MARKER_COLORS = {
+    "earthquake": (230, 57, 70),
+    "tropical cyclone": (168, 85, 247),
+    "wildfire": (255, 140, 0),
+    "flood": (56, 189, 248),
+}
+DEFAULT_MARKER = (250, 204, 21)
+
+# (lat, lon, hazard, radius_px)
+Point = Tuple[float, float, str, int]
+
+# ---- worker side (runs in the process pool) ----
+
+_basemap = None
+
+def _load_basemap():
+    """Bundled equirectangular basemap; falls back to a plain procedural ocean if it is missing."""
+    global _basemap
+    if _basemap is None:
+        try:
+            _basemap = Image.open(BASEMAP_PATH).convert("RGB")
+        except Exception:
+            _basemap = Image.new("RGB", (2048, 1024), (24, 38, 58))
+    return _basemap
+
+def _view(center: Optional[Tuple[float, float]], zoom: int) -> Tuple[float, float, float, float]:
+    """(west, north, lon_span, lat_span) of the window shown at this zoom."""
+    lon_span = 360.0 / (2 ** zoom)
+    lat_span = lon_span / 2
+    if zoom == 0 or center is None:
+        return -180.0, 90.0, 360.0, 180.0
+    lat, lon = center
+    north = min(90.0, max(-90.0 + lat_span, lat + lat_span / 2))
+    return lon - lon_span / 2, north, lon_span, lat_span
+
+def _to_px(lat: float, lon: float, view, size) -> Tuple[float, float]:
+    west, north, lon_span, lat_span = view
+    dx = (lon - west) % 360.0
+    return dx / lon_span * size[0], (north - lat) / lat_span * size[1]
+
+def _base_image(view, size):
+    base = _load_basemap()
+    bw, bh = base.size
+    west, north, lon_span, lat_span = view
+    x0 = (west + 180.0) / 360.0 * bw
+    y0 = (90.0 - north) / 180.0 * bh
+    w, h = lon_span / 360.0 * bw, lat_span / 180.0 * bh
+    if x0 < 0 or x0 + w > bw:  # window crosses the antimeridian: stitch two copies side by side
+        wide = Image.new("RGB", (bw * 2, bh))
+        wide.paste(base, (0, 0))
+        wide.paste(base, (bw, 0))
+        base, x0 = wide, x0 % bw
+    img = base.crop((int(x0), int(y0), int(x0 + w), int(y0 + h))).resize(size, Image.BILINEAR)
+
+    # procedural graticule on top of the bitmap
+    draw = ImageDraw.Draw(img)
+    step = 30 if lon_span > 90 else 10 if lon_span > 20 else 5
+    for g in range(-180, 181, step):
+        x, _ = _to_px(0, g, view, size)
+        if 0 <= x <= size[0]:
+            draw.line([(x, 0), (x, size[1])], fill=(40, 60, 85), width=1)
+    for g in range(-90, 91, step):
+        _, y = _to_px(g, west, view, size)
+        if 0 <= y <= size[1]:
+            draw.line([(0, y), (size[0], y)], fill=(40, 60, 85) if g else (70, 95, 125), width=1)
+    return img
+
+def _draw_points(img, points: Sequence[Point], view):
+    draw = ImageDraw.Draw(img)
+    for lat, lon, hazard, r in points:
+        x, y = _to_px(lat, lon, view, img.size)
+        color = MARKER_COLORS.get(hazard, DEFAULT_MARKER)
+        draw.ellipse([x - r - 2, y - r - 2, x + r + 2, y + r + 2], fill=(255, 255, 255))
+        draw.ellipse([x - r, y - r, x + r, y + r], fill=color)
+
+def _png(img) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+def render_points(points: List[Point], center: Optional[Tuple[float, float]], zoom: int,
+                  size: Tuple[int, int] = MAP_SIZE) -> bytes:
+    view = _view(center, zoom)
+    img = _base_image(view, size)
+    _draw_points(img, points, view)
+    return _png(img)
+
+def add_points(png: Optional[bytes], points: List[Point], size: Tuple[int, int] = MAP_SIZE) -> bytes:
+    """Draw more points onto an existing world map (or a fresh one) without re-rendering the base."""
+    view = _view(None, 0)
+    img = Image.open(io.BytesIO(png)).convert("RGB") if png else _base_image(view, size)
+    _draw_points(img, points, view)
+    return _png(img)
+
+# ---- bot side ----
+
+def marker_radius(hazard: str, rank: float) -> int:
+    if hazard == "earthquake":
+        return max(4, min(16, int((rank or 0) * 2 - 6)))
+    return 6 + int(min(rank or 0, 4)) * 2
+
+def zoom_for(hazard: str, rank: float) -> int:
+    """Big quakes/cyclones get a wider view; local events zoom in."""
+    if hazard == "tropical cyclone" or (hazard == "earthquake" and (rank or 0) >= 7.5):
+        return 2
+    return MAP_MAX_ZOOM
+
+
+class MapRenderer:
+    """Renders alert maps in a small process pool, with an in-memory LRU of finished PNGs."""
+
+    def __init__(self, workers: int = MAP_WORKERS, cache_size: int = MAP_CACHE_SIZE):
+        self.enabled = Image is not None
+        self.workers = workers
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        if not self.enabled:
+            logging.warning("MapRenderer: Pillow not installed; alert maps disabled.")
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: never fork a process that owns the event loop, sqlite threads and sockets
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _run(self, fn, *args) -> Optional[bytes]:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor(), fn, *args)
+        except Exception as e:
+            logging.warning("MapRenderer: render failed: %s", e)
+            return None
+
+    async def event_map(self, key: tuple, lat: float, lon: float, hazard: str, rank: float) -> Optional[bytes]:
+        """Map centred on one event; cached by (event key, rounded position, zoom)."""
+        if not self.enabled:
+            return None
+        zoom = zoom_for(hazard, rank)
+        ck = (*key, round(lat, 2), round(lon, 2), zoom)
+        png = self._cache.get(ck)
+        if png is not None:
+            self._cache.move_to_end(ck)
+            return png
+        png = await self._run(render_points, [(lat, lon, hazard, marker_radius(hazard, rank))], (lat, lon), zoom)
+        if png is not None:
+            self._cache[ck] = png
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return png
+
+    async def add_to_map(self, png: Optional[bytes], points: List[Point]) -> Optional[bytes]:
+        if not self.enabled or not points:
+            return png
+        return await self._run(add_points, png, points)
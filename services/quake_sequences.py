@@ -0,0 +1,91 @@
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from services.geo_subs import grid_cell, cells_for_box, circle_bbox, haversine_km
+
+# Quakes at/above this magnitude open a sequence that later shocks are threaded under
+SEQ_MIN_MAG = float(os.getenv("QUAKE_SEQ_MIN_MAG", "6.0") or 6.0)
+# Cap on how long a sequence stays open, whatever the magnitude-based window says
+SEQ_MAX_HOURS = float(os.getenv("QUAKE_SEQ_MAX_HOURS", "72") or 72)
+
+def sequence_radius_km(mag: float) -> float:
+    """Gardner–Knopoff spatial window."""
+    return 10 ** (0.1238 * mag + 0.983)
+
+def sequence_window_s(mag: float) -> float:
+    """Gardner–Knopoff temporal window, capped at SEQ_MAX_HOURS."""
+    days = 10 ** (0.032 * mag + 2.7389) if mag >= 6.5 else 10 ** (0.5409 * mag - 0.547)
+    return min(days * 86400.0, SEQ_MAX_HOURS * 3600.0)
+
+@dataclass
+class QuakeSequence:
+    main_id: str
+    lat: float
+    lon: float
+    mag: float
+    started: float                 # mainshock origin time (epoch s)
+    expires: float
+    title: str = ""
+    posts: Dict[int, int] = field(default_factory=dict)     # channel_id -> mainshock message id
+    threads: Dict[int, object] = field(default_factory=dict)  # channel_id -> discord.Thread
+    followups: int = 0
+
+    def covers(self, lat: float, lon: float, t: float, mag: float) -> bool:
+        return (self.started <= t <= self.expires and mag < self.mag
+                and haversine_km(self.lat, self.lon, lat, lon) <= sequence_radius_km(self.mag))
+
+
+class SequenceIndex:
+    """In-memory grid index of open quake sequences."""
+
+    def __init__(self):
+        self._cells: Dict[Tuple[int, int], List[str]] = {}
+        self._seqs: Dict[str, QuakeSequence] = {}
+
+    def __len__(self):
+        return len(self._seqs)
+
+    def _cells_of(self, seq: QuakeSequence):
+        return cells_for_box(*circle_bbox(seq.lat, seq.lon, sequence_radius_km(seq.mag)))
+
+    def open(self, main_id: str, lat: float, lon: float, mag: float, t: Optional[float] = None,
+             title: str = "") -> QuakeSequence:
+        t = t or time.time()
+        seq = self._seqs.get(main_id)
+        if seq:
+            return seq
+        seq = QuakeSequence(main_id, lat, lon, mag, t, t + sequence_window_s(mag), title=title)
+        self._seqs[main_id] = seq
+        for cell in self._cells_of(seq):
+            self._cells.setdefault(cell, []).append(main_id)
+        return seq
+
+    def find(self, lat: Optional[float], lon: Optional[float], t: Optional[float], mag: float) -> Optional[QuakeSequence]:
+        """Largest open sequence whose space-time window contains this shock."""
+        if lat is None or lon is None:
+            return None
+        t = t or time.time()
+        best = None
+        for main_id in self._cells.get(grid_cell(lat, lon), ()):
+            seq = self._seqs.get(main_id)
+            if seq and seq.covers(lat, lon, t, mag) and (best is None or seq.mag > best.mag):
+                best = seq
+        return best
+
+    def get(self, main_id: str) -> Optional[QuakeSequence]:
+        return self._seqs.get(main_id)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        now = now or time.time()
+        dead = [s for s in self._seqs.values() if s.expires < now]
+        for seq in dead:
+            del self._seqs[seq.main_id]
+            for cell in self._cells_of(seq):
+                ids = self._cells.get(cell)
+                if ids and seq.main_id in ids:
+                    ids.remove(seq.main_id)
+                    if not ids:
+                        del self._cells[cell]
+        return len(dead)
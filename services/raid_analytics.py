@@ -0,0 +1,188 @@
+import os
+import logging
+import aiosqlite
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple
+
+from services.leaderboards import Leaderboards
+
+DB_PATH = os.getenv("DB_PATH", "pal_bot.sqlite")
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS raid_user_stats(
+    guild_id    INTEGER NOT NULL,
+    user_id     INTEGER NOT NULL,
+    raids       INTEGER NOT NULL DEFAULT 0,
+    streak      INTEGER NOT NULL DEFAULT 0,   -- consecutive raids (by raids.seq) ending at last_seq
+    best_streak INTEGER NOT NULL DEFAULT 0,
+    last_seq    INTEGER NOT NULL DEFAULT 0,
+    last_ts     INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, user_id)
+);
+CREATE TABLE IF NOT EXISTS raid_curve(
+    raid_id INTEGER NOT NULL,
+    minute  INTEGER NOT NULL,                 -- minutes since the raid started
+    joins   INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (raid_id, minute)
+);
+CREATE INDEX IF NOT EXISTS idx_raids_guild_seq ON raids(guild_id, seq);
+CREATE INDEX IF NOT EXISTS idx_raid_participants_user ON raid_participants(user_id);
+"""
+
+# raids gets a per-guild sequence number (for streaks) and a running participant count
+RAIDS_MIGRATIONS = {
+    "seq": "ALTER TABLE raids ADD COLUMN seq INTEGER",
+    "participants": "ALTER TABLE raids ADD COLUMN participants INTEGER NOT NULL DEFAULT 0",
+}
+
+STREAK_SQL = """
+INSERT INTO raid_user_stats(guild_id, user_id, raids, streak, best_streak, last_seq, last_ts) VALUES (?,?,1,1,1,?,?)
+ON CONFLICT(guild_id, user_id) DO UPDATE SET
+    raids = raids + 1,
+    streak = CASE WHEN excluded.last_seq = last_seq + 1 THEN streak + 1
+                  WHEN excluded.last_seq <= last_seq THEN streak
+                  ELSE 1 END,
+    best_streak = MAX(best_streak, CASE WHEN excluded.last_seq = last_seq + 1 THEN streak + 1 ELSE 1 END),
+    last_seq = MAX(last_seq, excluded.last_seq),
+    last_ts = MAX(last_ts, excluded.last_ts)
+"""
+
+CURVE_SQL = """
+INSERT INTO raid_curve(raid_id, minute, joins) VALUES (?,?,?)
+ON CONFLICT(raid_id, minute) DO UPDATE SET joins = joins + excluded.joins
+"""
+
+# (guild_id, raid_id, seq, started_at, user_id, ts)
+Join = Tuple[int, int, int, int, int, int]
+
+
+def _runs(seqs: List[int]) -> Tuple[int, int]:
+    """(run ending at the highest seq, longest run) for a member's sorted, distinct raid seqs."""
+    run = best = 0
+    prev = None
+    for seq in seqs:
+        run = run + 1 if prev is not None and seq == prev + 1 else 1
+        best = max(best, run)
+        prev = seq
+    return run, best
+
+
+@dataclass
+class RaiderStats:
+    raids: int = 0
+    streak: int = 0        # current run; 0 once a finished raid was missed
+    best_streak: int = 0
+    last_ts: int = 0
+
+
+class RaidAnalytics:
+    """
+    Raid history aggregates, maintained as participants are written: per-member
+    totals and streaks (raid_user_stats), joins per minute of each raid
+    (raid_curve), a participant counter on raids, and week/month/season "raids"
+    leaderboard buckets. Reads never scan raid_participants.
+    """
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+
+    async def init(self):
+        """Create tables; on the first run after upgrading, backfill from raid_participants."""
+        async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute("PRAGMA table_info(raids)")
+            existing = {row[1] for row in await cur.fetchall()}
+            added = [col for col in RAIDS_MIGRATIONS if col not in existing]
+            for col in added:
+                await db.execute(RAIDS_MIGRATIONS[col])
+            await db.executescript(CREATE_SQL)
+            if "seq" in added:
+                await self._backfill(db)
+            await db.commit()
+        await Leaderboards(self.path).init()
+
+    async def _backfill(self, db: aiosqlite.Connection):
+        await db.execute("""
+            UPDATE raids SET seq = (SELECT COUNT(*) FROM raids r2 WHERE r2.guild_id = raids.guild_id AND r2.id <= raids.id)""")
+        await db.execute("""
+            UPDATE raids SET participants = (SELECT COUNT(*) FROM raid_participants p WHERE p.raid_id = raids.id)""")
+        await db.execute("DELETE FROM raid_curve")
+        await db.execute("""
+            INSERT INTO raid_curve(raid_id, minute, joins)
+            SELECT p.raid_id, MAX(0, (p.ts - r.started_at) / 60), COUNT(*)
+            FROM raid_participants p JOIN raids r ON r.id = p.raid_id GROUP BY 1, 2""")
+        await db.execute("DELETE FROM raid_user_stats")
+        cur = await db.execute("""
+            SELECT r.guild_id, r.seq, p.user_id, p.ts FROM raid_participants p JOIN raids r ON r.id = p.raid_id
+            ORDER BY r.guild_id, p.user_id, r.seq""")
+        await db.executemany(STREAK_SQL, [(g, u, seq, ts) for g, seq, u, ts in await cur.fetchall()])
+        logging.info("RaidAnalytics: backfilled raid history")
+
+    # ---- writes ----
+
+    @staticmethod
+    async def record(db: aiosqlite.Connection, joins: Iterable[Join]):
+        """Fold newly written participants into every aggregate, inside the caller's transaction."""
+        joins = sorted(joins, key=lambda j: j[2])  # streaks advance in raid order
+        if not joins:
+            return
+        per_raid = Counter(raid_id for _, raid_id, *_ in joins)
+        await db.executemany("UPDATE raids SET participants = participants + ? WHERE id=?",
+                             [(n, raid_id) for raid_id, n in per_raid.items()])
+        per_minute = Counter((raid_id, max(0, (ts - started) // 60)) for _, raid_id, _, started, _, ts in joins)
+        await db.executemany(CURVE_SQL, [(raid_id, m, n) for (raid_id, m), n in per_minute.items()])
+        # a join for a raid older than the member's last one (a late flush) can bridge a gap, so
+        # those members get their runs recomputed from every raid they joined
+        late = set()
+        for g, _, seq, _, u, _ in joins:
+            cur = await db.execute("SELECT last_seq FROM raid_user_stats WHERE guild_id=? AND user_id=?", (g, u))
+            row = await cur.fetchone()
+            if row and seq <= row[0]:
+                late.add((g, u))
+        await db.executemany(STREAK_SQL, [(g, u, seq, ts) for g, _, seq, _, u, ts in joins])
+        for g, u in late:
+            await RaidAnalytics._recompute_streak(db, g, u)
+        await Leaderboards.bump(db, "raids", [(g, u, 1) for g, _, _, _, u, _ in joins])
+
+    @staticmethod
+    async def _recompute_streak(db: aiosqlite.Connection, guild_id: int, user_id: int):
+        cur = await db.execute(
+            "SELECT DISTINCT r.seq FROM raid_participants p JOIN raids r ON r.id = p.raid_id "
+            "WHERE p.user_id=? AND r.guild_id=? ORDER BY r.seq", (user_id, guild_id))
+        streak, best = _runs([seq for (seq,) in await cur.fetchall()])
+        await db.execute("UPDATE raid_user_stats SET streak=?, best_streak=? WHERE guild_id=? AND user_id=?",
+                         (streak, best, guild_id, user_id))
+
+    # ---- reads ----
+
+    async def raider(self, guild_id: int, user_id: int) -> RaiderStats:
+        async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute(
+                "SELECT raids, streak, best_streak, last_seq, last_ts FROM raid_user_stats WHERE guild_id=? AND user_id=?",
+                (guild_id, user_id))
+            row = await cur.fetchone()
+            if not row:
+                return RaiderStats()
+            raids, streak, best, last_seq, last_ts = row
+            cur = await db.execute("SELECT MAX(seq) FROM raids WHERE guild_id=? AND active=0", (guild_id,))
+            (last_finished,) = await cur.fetchone()
+        if last_finished and last_seq < last_finished:
+            streak = 0  # missed the most recent finished raid
+        return RaiderStats(raids, streak, best, last_ts)
+
+    async def curve(self, raid_id: int) -> List[Tuple[int, int]]:
+        """(minute, cumulative participants) for each minute that saw a join."""
+        async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute("SELECT minute, joins FROM raid_curve WHERE raid_id=? ORDER BY minute", (raid_id,))
+            rows = await cur.fetchall()
+        out, total = [], 0
+        for minute, joins in rows:
+            total += joins
+            out.append((minute, total))
+        return out
+
+    async def participants(self, raid_id: int) -> int:
+        async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute("SELECT participants FROM raids WHERE id=?", (raid_id,))
+            row = await cur.fetchone()
+        return row[0] if row else 0
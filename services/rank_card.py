@@ -0,0 +1,238 @@
+import io
+import os
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # cards are optional; /rank and /profile fall back to embeds
+    Image = ImageDraw = ImageFont = None
+
+CARD_SIZE = (900, 270)
+CARD_WORKERS = int(os.getenv("CARD_WORKERS", "2") or 2)
+CARD_CACHE_SIZE = int(os.getenv("CARD_CACHE_SIZE", "256") or 256)
+AVATAR_CACHE_SIZE = int(os.getenv("CARD_AVATAR_CACHE_SIZE", "512") or 512)
+FONT_PATH = os.getenv("CARD_FONT_PATH", "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf")
+FONT_BOLD_PATH = os.getenv("CARD_FONT_BOLD_PATH", "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf")
+
+AVATAR_PX = 170
+RING_PAD = 12
+BG_TOP, BG_BOTTOM = (22, 27, 44), (12, 15, 26)
+TRACK = (52, 60, 84)
+MUTED = (150, 160, 185)
+
+
+@dataclass(frozen=True)
+class CardData:
+    """Everything a card shows; equal data → identical card, so it doubles as the cache key."""
+    name: str
+    avatar_key: Optional[str]
+    level: int
+    xp: int
+    level_xp: int           # XP at the start of this level
+    next_xp: int            # XP needed for the next level
+    rank: Optional[int] = None
+    ranked: int = 0
+    title: Optional[str] = None
+    badges: Tuple[str, ...] = ()
+    accent: Tuple[int, int, int] = (114, 137, 218)
+
+    @property
+    def pct(self) -> float:
+        return max(0.0, min(1.0, (self.xp - self.level_xp) / max(1, self.next_xp - self.level_xp)))
+
+VERIFIED_MARKERS = ("(Verified)", "Verified")
+
+def verified_badges(roles) -> Tuple[str, ...]:
+    """Verified-role names as badge labels, highest role first."""
+    names = [r.name for r in sorted(roles, key=lambda r: r.position, reverse=True)
+             if any(m in r.name for m in VERIFIED_MARKERS)]
+    return tuple(n.replace("(Verified)", "").replace("Verified", "").strip(" -–") or n for n in names)
+
+def accent_for(member) -> Tuple[int, int, int]:
+    c = getattr(member, "color", None)
+    return c.to_rgb() if c is not None and c.value else CardData.accent
+
+# ---- render side (runs in the thread pool) ----
+
+@lru_cache(maxsize=16)
+def _font(size: int, bold: bool = False):
+    try:
+        return ImageFont.truetype(FONT_BOLD_PATH if bold else FONT_PATH, size)
+    except OSError:
+        return ImageFont.load_default(size=size)
+
+@lru_cache(maxsize=32)
+def _template(accent: Tuple[int, int, int], size: Tuple[int, int] = CARD_SIZE):
+    """Pre-composited background (gradient, panel, accent strip, empty ring track); one per accent colour."""
+    w, h = size
+    grad = Image.linear_gradient("L").resize((w, h))
+    bg = Image.composite(Image.new("RGB", size, BG_BOTTOM), Image.new("RGB", size, BG_TOP), grad)
+    draw = ImageDraw.Draw(bg)
+    draw.rounded_rectangle([16, 16, w - 16, h - 16], radius=24, fill=(30, 36, 58))
+    draw.rounded_rectangle([16, 16, 26, h - 16], radius=5, fill=accent)
+    cx, cy = _avatar_center(size)
+    r = AVATAR_PX // 2 + RING_PAD
+    draw.ellipse([cx - r, cy - r, cx + r, cy + r], outline=TRACK, width=8)
+    draw.rounded_rectangle([270, 190, w - 48, 214], radius=12, fill=TRACK)
+    return bg
+
+def _avatar_center(size: Tuple[int, int] = CARD_SIZE) -> Tuple[int, int]:
+    return 40 + AVATAR_PX // 2 + RING_PAD, size[1] // 2
+
+@lru_cache(maxsize=1)
+def _avatar_mask():
+    big = Image.new("L", (AVATAR_PX * 4, AVATAR_PX * 4), 0)
+    ImageDraw.Draw(big).ellipse([0, 0, AVATAR_PX * 4 - 1, AVATAR_PX * 4 - 1], fill=255)
+    return big.resize((AVATAR_PX, AVATAR_PX), Image.LANCZOS)
+
+_avatars: "OrderedDict[str, object]" = OrderedDict()
+_avatars_lock = threading.Lock()
+
+def _avatar(key: Optional[str], png: Optional[bytes]):
+    """Decoded, resized avatar; LRU by avatar hash so a re-render never re-decodes it."""
+    if key:
+        with _avatars_lock:
+            img = _avatars.get(key)
+            if img is not None:
+                _avatars.move_to_end(key)
+                return img
+    if not png:
+        return None
+    try:
+        img = Image.open(io.BytesIO(png)).convert("RGB").resize((AVATAR_PX, AVATAR_PX), Image.BILINEAR)
+    except Exception:
+        return None
+    if key:
+        with _avatars_lock:
+            _avatars[key] = img
+            while len(_avatars) > AVATAR_CACHE_SIZE:
+                _avatars.popitem(last=False)
+    return img
+
+def _ring(accent, pct: float):
+    """Anti-aliased progress arc (drawn 2× and downsampled), as an RGBA overlay."""
+    r = AVATAR_PX // 2 + RING_PAD
+    side = (r + 6) * 2
+    big = Image.new("RGBA", (side * 2, side * 2), (0, 0, 0, 0))
+    if pct > 0:
+        ImageDraw.Draw(big).arc([12, 12, side * 2 - 12, side * 2 - 12], start=-90, end=-90 + 360 * pct,
+                                fill=accent + (255,), width=16)
+    return big.resize((side, side), Image.BILINEAR)
+
+def render_card(data: CardData, avatar_png: Optional[bytes] = None) -> bytes:
+    img = _template(data.accent).copy()
+    draw = ImageDraw.Draw(img)
+    w, h = img.size
+    cx, cy = _avatar_center(img.size)
+
+    ring = _ring(data.accent, data.pct)
+    img.paste(ring, (cx - ring.width // 2, cy - ring.height // 2), ring)
+    av = _avatar(data.avatar_key, avatar_png)
+    half = AVATAR_PX // 2
+    if av is not None:
+        img.paste(av, (cx - half, cy - half), _avatar_mask())
+    else:
+        draw.ellipse([cx - half, cy - half, cx + half, cy + half], fill=(70, 78, 104))
+
+    x, right = 270, w - 48
+    lvl = f"{data.level}"
+    draw.text((right, 30), lvl, font=_font(56, True), fill=data.accent, anchor="ra")
+    lx = right - int(draw.textlength(lvl, font=_font(56, True))) - 10
+    draw.text((lx, 58), "LEVEL", font=_font(20), fill=MUTED, anchor="ra")
+    if data.rank:
+        draw.text((right, 100), f"RANK #{data.rank:,}", font=_font(20), fill=MUTED, anchor="ra")
+
+    name, name_w = data.name, lx - int(draw.textlength("LEVEL", font=_font(20))) - 24 - x
+    while name and draw.textlength(name, font=_font(38, True)) > name_w:
+        name = name[:-2] + "…" if len(name) > 2 else ""
+    draw.text((x, 40), name, font=_font(38, True), fill=(240, 242, 250))
+    y = 96
+    if data.title:
+        draw.text((x, y), data.title, font=_font(24, True), fill=data.accent)
+        y += 2
+        bx = x + int(draw.textlength(data.title, font=_font(24, True))) + 16
+    else:
+        bx = x
+    for badge in data.badges[:4]:
+        label = f"✔ {badge}"[:24]
+        tw = int(draw.textlength(label, font=_font(16)))
+        if bx + tw + 20 > right - 130:
+            break
+        draw.rounded_rectangle([bx, y, bx + tw + 20, y + 26], radius=13, fill=(46, 125, 90))
+        draw.text((bx + 10, y + 4), label, font=_font(16), fill=(235, 255, 244))
+        bx += tw + 28
+
+    draw.text((x, 156), f"{data.xp - data.level_xp:,} / {data.next_xp - data.level_xp:,} XP", font=_font(20), fill=MUTED)
+    draw.text((right, 156), f"{data.xp:,} total", font=_font(20), fill=MUTED, anchor="ra")
+    fill_w = int((right - x) * data.pct)
+    if fill_w >= 24:
+        draw.rounded_rectangle([x, 190, x + fill_w, 214], radius=12, fill=data.accent)
+
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", compress_level=1)
+    return buf.getvalue()
+
+# ---- bot side ----
+
+class CardRenderer:
+    """
+    Renders rank/profile cards in a small thread pool (Pillow drops the GIL for
+    the heavy parts). Finished PNGs are cached by CardData, so a card is only
+    redrawn after the member's XP, level, title, badges or avatar change.
+    """
+
+    def __init__(self, workers: int = CARD_WORKERS, cache_size: int = CARD_CACHE_SIZE):
+        self.enabled = Image is not None
+        self.cache_size = cache_size
+        self._cards: "OrderedDict[CardData, bytes]" = OrderedDict()
+        self._avatar_png: "OrderedDict[str, bytes]" = OrderedDict()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rank-card") if self.enabled else None
+        if not self.enabled:
+            logging.warning("CardRenderer: Pillow not installed; rank cards disabled.")
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _avatar_bytes(self, asset) -> Optional[bytes]:
+        if asset is None:
+            return None
+        png = self._avatar_png.get(asset.key)
+        if png is None:
+            try:
+                png = await asset.replace(size=256, format="png").read()
+            except Exception as e:
+                logging.info("CardRenderer: avatar fetch failed: %s", e)
+                return None
+            self._avatar_png[asset.key] = png
+            while len(self._avatar_png) > AVATAR_CACHE_SIZE:
+                self._avatar_png.popitem(last=False)
+        else:
+            self._avatar_png.move_to_end(asset.key)
+        return png
+
+    async def card(self, data: CardData, avatar=None) -> Optional[bytes]:
+        """PNG for `data`; `avatar` is the member's display_avatar asset (fetched only on a cache miss)."""
+        if not self.enabled:
+            return None
+        png = self._cards.get(data)
+        if png is not None:
+            self._cards.move_to_end(data)
+            return png
+        avatar_png = await self._avatar_bytes(avatar)
+        try:
+            png = await asyncio.get_running_loop().run_in_executor(self._pool, render_card, data, avatar_png)
+        except Exception as e:
+            logging.warning("CardRenderer: render failed: %s", e)
+            return None
+        self._cards[data] = png
+        while len(self._cards) > self.cache_size:
+            self._cards.popitem(last=False)
+        return png
@@ -0,0 +1,147 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# (-score, user_id): ascending order is the leaderboard order, ties broken by user id
+Key = Tuple[int, int]
+LOAD = 512  # bucket size; a bucket splits at 2×LOAD
+
+
+class RankIndex:
+    """
+    In-memory order-statistic index of one leaderboard. Keys live in sorted
+    buckets with a Fenwick tree over bucket sizes, so rank-of-user and
+    "rows after/before this key" are O(log n) plus the page itself, whatever
+    the page number. Members with a score of 0 or less are not ranked.
+    """
+
+    def __init__(self, scores: Optional[Dict[int, int]] = None):
+        keys = sorted((-score, uid) for uid, score in (scores or {}).items() if score > 0)
+        self._keys: Dict[int, Key] = {uid: (neg, uid) for neg, uid in keys}
+        self._buckets: List[List[Key]] = [keys[i:i + LOAD] for i in range(0, len(keys), LOAD)]
+        self._rebuild()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    # ---- Fenwick tree over bucket lengths ----
+
+    def _rebuild(self):
+        self._maxes = [b[-1] for b in self._buckets]
+        self._tree = [0] * (len(self._buckets) + 1)
+        for i, b in enumerate(self._buckets):
+            self._fw_add(i, len(b))
+
+    def _fw_add(self, i: int, d: int):
+        i += 1
+        while i < len(self._tree):
+            self._tree[i] += d
+            i += i & -i
+
+    def _fw_sum(self, i: int) -> int:
+        """Number of keys in buckets[:i]."""
+        s = 0
+        while i > 0:
+            s += self._tree[i]
+            i -= i & -i
+        return s
+
+    def _at(self, pos: int) -> Tuple[int, int]:
+        """(bucket, offset) of the key at global position pos."""
+        bi, step = 0, 1 << (len(self._tree).bit_length())
+        while step:
+            nxt = bi + step
+            if nxt < len(self._tree) and self._tree[nxt] <= pos:
+                bi = nxt
+                pos -= self._tree[nxt]
+            step >>= 1
+        return bi, pos
+
+    # ---- updates ----
+
+    def set(self, user_id: int, score: int):
+        old = self._keys.get(user_id)
+        new = (-score, user_id) if score > 0 else None
+        if old == new:
+            return
+        if old is not None:
+            self._remove(old)
+            del self._keys[user_id]
+        if new is not None:
+            self._insert(new)
+            self._keys[user_id] = new
+
+    def _insert(self, key: Key):
+        if not self._buckets:
+            self._buckets.append([key])
+            self._rebuild()
+            return
+        bi = min(bisect_left(self._maxes, key), len(self._buckets) - 1)
+        b = self._buckets[bi]
+        insort(b, key)
+        self._maxes[bi] = b[-1]
+        if len(b) > 2 * LOAD:
+            self._buckets[bi:bi + 1] = [b[:LOAD], b[LOAD:]]
+            self._rebuild()
+        else:
+            self._fw_add(bi, 1)
+
+    def _remove(self, key: Key):
+        bi = bisect_left(self._maxes, key)
+        b = self._buckets[bi]
+        del b[bisect_left(b, key)]
+        if not b:
+            del self._buckets[bi]
+            self._rebuild()
+        else:
+            self._maxes[bi] = b[-1]
+            self._fw_add(bi, -1)
+
+    # ---- queries ----
+
+    def _position(self, key: Key) -> int:
+        """Number of keys strictly before `key`."""
+        bi = bisect_left(self._maxes, key)
+        if bi == len(self._buckets):
+            return len(self)
+        return self._fw_sum(bi) + bisect_left(self._buckets[bi], key)
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """1-based position, or None if the member isn't ranked."""
+        key = self._keys.get(user_id)
+        return None if key is None else self._position(key) + 1
+
+    def _slice(self, start: int, n: int) -> List[Tuple[int, int, int]]:
+        out: List[Tuple[int, int, int]] = []
+        if start >= len(self):
+            return out
+        bi, i = self._at(start)
+        rank = start + 1
+        while bi < len(self._buckets) and len(out) < n:
+            b = self._buckets[bi]
+            for neg, uid in b[i:i + n - len(out)]:
+                out.append((rank, uid, -neg))
+                rank += 1
+            bi, i = bi + 1, 0
+        return out
+
+    def after(self, cursor: Optional[Key], n: int) -> List[Tuple[int, int, int]]:
+        """(rank, user_id, score) for up to n rows after the cursor key (from the top when None)."""
+        if cursor is None:
+            return self._slice(0, n)
+        bi = bisect_right(self._maxes, cursor)
+        start = len(self) if bi == len(self._buckets) else self._fw_sum(bi) + bisect_right(self._buckets[bi], cursor)
+        return self._slice(start, n)
+
+    def before(self, cursor: Key, n: int) -> List[Tuple[int, int, int]]:
+        """Up to n rows immediately before the cursor key."""
+        end = self._position(cursor)
+        return self._slice(max(0, end - n), min(n, end))
+
+    @staticmethod
+    def key(user_id: int, score: int) -> Key:
+        return (-score, user_id)
+
+    def items(self) -> Iterable[Tuple[int, int]]:
+        for b in self._buckets:
+            for neg, uid in b:
+                yield uid, -neg
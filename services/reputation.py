@@ -4,6 +4,9 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 
+from services.leaderboards import Leaderboards
+from services.user_stats import UserStats
+
 @dataclass
 class ReputationEntry:
     id: int
@@ -28,6 +31,8 @@ class Reputation:
         self.db_path = db_path
         self.achievements = self._init_achievements()
         self.daily_limit = 5  # Max rep points per user per day
+        self.boards = Leaderboards()  # weekly/monthly/season buckets live in the main DB
+        self.stats = UserStats(rep_path=db_path)
 
     def _init_achievements(self) -> List[Achievement]:
         """Initialize achievement system."""
@@ -84,7 +89,9 @@ class Reputation:
             """)
             
             await db.commit()
-            logging.info("Reputation: initialized")
+        await self.boards.init()
+        await self.stats.init()
+        logging.info("Reputation: initialized")
 
     async def give_reputation(self, from_user: int, to_user: int, guild_id: int, 
                             points: int, reason: str = "") -> Dict:
@@ -110,6 +117,9 @@ class Reputation:
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (from_user, to_user, guild_id, points, reason, datetime.now().isoformat()))
             await db.commit()
+        await self.boards.record("rep", guild_id, to_user, points)
+        await self.stats.record(guild_id, to_user, rep=points)
+        await self.stats.record(guild_id, from_user, rep_given=points)
         
         # Check for new achievements
         new_achievements = await self._check_achievements(to_user, guild_id)
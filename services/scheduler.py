@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+import aiosqlite
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+DB_PATH = os.getenv("DB_PATH", "pal_bot.sqlite")
+RETRY_BASE_S = 30        # first retry of a failed job; doubles each attempt
+MAX_ATTEMPTS = 6         # then the job is dropped (and logged with its payload)
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS scheduled_jobs(
+    key        TEXT PRIMARY KEY,     -- e.g. raid_end:12, poll_close:<message id>
+    kind       TEXT NOT NULL,        -- handler name
+    due_at     REAL NOT NULL,        -- unix seconds
+    payload    TEXT NOT NULL DEFAULT '{}',
+    created_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_due ON scheduled_jobs(due_at);
+"""
+
+Handler = Callable[[dict], Awaitable[None]]
+
+
+@dataclass
+class Job:
+    key: str
+    kind: str
+    due_at: float
+    payload: dict
+    attempts: int = 0    # failed runs so far (this process only)
+
+
+class JobScheduler:
+    """
+    Delayed jobs that survive restarts. Every job is a row in scheduled_jobs and
+    an entry in an in-memory min-heap; one task sleeps until the earliest due
+    time, so nothing is polled. On start the table is loaded back, and jobs that
+    came due while the bot was down run straight away. A job whose kind has no
+    handler yet (its cog isn't loaded) is held until one is registered.
+    Rescheduling or cancelling a key leaves a stale heap entry that is skipped
+    when it surfaces. A job whose handler raises keeps its row and is retried
+    with exponential backoff, up to MAX_ATTEMPTS runs.
+    """
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self.jobs: Dict[str, Job] = {}
+        self.handlers: Dict[str, Handler] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._held: Dict[str, Job] = {}          # due, but no handler for the kind
+        self._running: set[asyncio.Task] = set()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._start_lock = asyncio.Lock()
+
+    async def start(self):
+        """Create the table, load pending jobs and start the timer (idempotent)."""
+        async with self._start_lock:
+            if self._task is not None and not self._task.done():
+                return
+            async with aiosqlite.connect(self.path) as db:
+                await db.executescript(CREATE_SQL)
+                cur = await db.execute("SELECT key, kind, due_at, payload FROM scheduled_jobs")
+                rows = await cur.fetchall()
+                await db.commit()
+            for key, kind, due_at, payload in rows:
+                self._push(Job(key, kind, due_at, json.loads(payload or "{}")))
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            logging.info("JobScheduler: %s pending jobs", len(rows))
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for t in list(self._running):
+            t.cancel()
+
+    def register(self, kind: str, handler: Handler):
+        self.handlers[kind] = handler
+        for key, job in list(self._held.items()):
+            if job.kind == kind:
+                del self._held[key]
+                self._push(job)
+
+    def unregister(self, kind: str):
+        self.handlers.pop(kind, None)
+
+    async def release(self, kind: str):
+        """unregister() for a cog being unloaded; stops the timer once no cog is using the scheduler."""
+        self.unregister(kind)
+        if not self.handlers:
+            await self.close()
+
+    # ---- jobs ----
+
+    def _push(self, job: Job):
+        self.jobs[job.key] = job
+        heapq.heappush(self._heap, (job.due_at, next(self._seq), job.key))
+        self._wake.set()
+
+    async def schedule(self, key: str, kind: str, due_at: float, payload: Optional[dict] = None) -> Job:
+        """Add a job, or move an existing key to the new time/payload."""
+        job = Job(key, kind, float(due_at), payload or {})
+        async with aiosqlite.connect(self.path) as db:
+            await db.execute(
+                "INSERT INTO scheduled_jobs(key, kind, due_at, payload, created_at) VALUES (?,?,?,?,?) "
+                "ON CONFLICT(key) DO UPDATE SET kind=excluded.kind, due_at=excluded.due_at, payload=excluded.payload",
+                (key, kind, job.due_at, json.dumps(job.payload), int(time.time())))
+            await db.commit()
+        self._held.pop(key, None)
+        self._push(job)
+        return job
+
+    async def cancel(self, key: str) -> bool:
+        found = self.jobs.pop(key, None) or self._held.pop(key, None)
+        async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute("DELETE FROM scheduled_jobs WHERE key=?", (key,))
+            await db.commit()
+        return found is not None or cur.rowcount > 0
+
+    def get(self, key: str) -> Optional[Job]:
+        return self.jobs.get(key) or self._held.get(key)
+
+    def pending(self, kind: str) -> List[Job]:
+        """Jobs of one kind that haven't run yet, soonest first."""
+        jobs = [j for j in (*self.jobs.values(), *self._held.values()) if j.kind == kind]
+        return sorted(jobs, key=lambda j: j.due_at)
+
+    # ---- timer ----
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                due_at, _, key = heapq.heappop(self._heap)
+                job = self.jobs.get(key)
+                if job is None or job.due_at != due_at:
+                    continue  # cancelled or rescheduled
+                del self.jobs[key]
+                if job.kind not in self.handlers:
+                    self._held[key] = job
+                    continue
+                t = asyncio.create_task(self._fire(job))
+                self._running.add(t)
+                t.add_done_callback(self._running.discard)
+            timeout = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire(self, job: Job):
+        try:
+            await self.handlers[job.kind](job.payload)
+            failed = False
+        except Exception:
+            logging.exception("JobScheduler: job %s failed (attempt %s)", job.key, job.attempts + 1)
+            failed = True
+        if job.key in self.jobs:  # rescheduled by its own handler
+            return
+        async with aiosqlite.connect(self.path) as db:
+            if failed and job.attempts + 1 < MAX_ATTEMPTS:
+                retry = Job(job.key, job.kind, time.time() + RETRY_BASE_S * 2 ** job.attempts, job.payload, job.attempts + 1)
+                cur = await db.execute("UPDATE scheduled_jobs SET due_at=? WHERE key=? AND due_at=?",
+                                       (retry.due_at, job.key, job.due_at))
+                await db.commit()
+                if cur.rowcount and job.key not in self.jobs:  # not cancelled meanwhile
+                    self._push(retry)
+                return
+            if failed:
+                logging.error("JobScheduler: giving up on %s (%s) after %s attempts; payload: %s",
+                              job.key, job.kind, MAX_ATTEMPTS, json.dumps(job.payload))
+            await db.execute("DELETE FROM scheduled_jobs WHERE key=? AND due_at=?", (job.key, job.due_at))
+            await db.commit()
+
+
+SCHEDULER = JobScheduler()
@@ -12,19 +12,103 @@ CREATE TABLE IF NOT EXISTS wallets(
     created_at TEXT NOT NULL
 );
 CREATE TABLE IF NOT EXISTS seen_events(
-    source   TEXT NOT NULL,
-    event_id TEXT NOT NULL,
-    seen_at  TEXT NOT NULL,
+    source      TEXT NOT NULL,
+    event_id    TEXT NOT NULL,
+    seen_at     TEXT NOT NULL,
+    fingerprint TEXT,
+    severity    REAL,
     PRIMARY KEY (source, event_id)
 );
+CREATE TABLE IF NOT EXISTS event_posts(
+    source     TEXT NOT NULL,
+    event_id   TEXT NOT NULL,
+    channel_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    webhook_id INTEGER,                -- set when the post went out through an alert webhook
+    PRIMARY KEY (source, event_id, channel_id)
+);
+CREATE INDEX IF NOT EXISTS idx_event_posts_message ON event_posts(message_id);
+CREATE TABLE IF NOT EXISTS events(
+    source      TEXT NOT NULL,
+    event_id    TEXT NOT NULL,
+    title       TEXT,
+    url         TEXT,
+    severity    REAL,
+    lat         REAL,
+    lon         REAL,
+    countries   TEXT,
+    occurred_at INTEGER,            -- epoch s (UTC) reported by the source
+    first_seen  INTEGER NOT NULL,   -- epoch s we first stored it
+    hazard      TEXT,
+    region      TEXT,
+    PRIMARY KEY (source, event_id)
+);
+CREATE INDEX IF NOT EXISTS idx_events_time ON events(occurred_at);
+CREATE TABLE IF NOT EXISTS event_rollup_hourly(
+    bucket       INTEGER NOT NULL,  -- hour start (epoch s)
+    source       TEXT NOT NULL,
+    hazard       TEXT NOT NULL,
+    region       TEXT NOT NULL,
+    count        INTEGER NOT NULL,
+    max_severity REAL,
+    PRIMARY KEY (bucket, source, hazard, region)
+);
+CREATE TABLE IF NOT EXISTS event_rollup_daily(
+    bucket       INTEGER NOT NULL,  -- UTC day start (epoch s)
+    source       TEXT NOT NULL,
+    hazard       TEXT NOT NULL,
+    region       TEXT NOT NULL,
+    count        INTEGER NOT NULL,
+    max_severity REAL,
+    PRIMARY KEY (bucket, source, hazard, region)
+);
 """
 
+# columns added after the first release; ALTERed in on init
+SEEN_EVENTS_MIGRATIONS = {
+    "fingerprint": "ALTER TABLE seen_events ADD COLUMN fingerprint TEXT",
+    "severity": "ALTER TABLE seen_events ADD COLUMN severity REAL",
+}
+
+EVENTS_MIGRATIONS = {
+    "hazard": "ALTER TABLE events ADD COLUMN hazard TEXT",
+    "region": "ALTER TABLE events ADD COLUMN region TEXT",
+}
+
+EVENT_POSTS_MIGRATIONS = {
+    "webhook_id": "ALTER TABLE event_posts ADD COLUMN webhook_id INTEGER",
+}
+
+ROLLUP_TABLES = {"hour": ("event_rollup_hourly", 3600), "day": ("event_rollup_daily", 86400)}
+HOURLY_RETENTION_S = 8 * 86400  # hourly buckets only answer "last day"; daily ones are kept
+
+# SQLite caps bound parameters per statement; keep (source, event_id) lookups well below it
+_IN_CHUNK = 400
+
 class Storage:
     def __init__(self, path: str = DB_PATH):
         self.path = path
 
     async def init(self):
         async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute("PRAGMA table_info(seen_events)")
+            existing = {row[1] for row in await cur.fetchall()}
+            if existing:
+                for col, ddl in SEEN_EVENTS_MIGRATIONS.items():
+                    if col not in existing:
+                        await db.execute(ddl)
+            cur = await db.execute("PRAGMA table_info(events)")
+            existing = {row[1] for row in await cur.fetchall()}
+            if existing:
+                for col, ddl in EVENTS_MIGRATIONS.items():
+                    if col not in existing:
+                        await db.execute(ddl)
+            cur = await db.execute("PRAGMA table_info(event_posts)")
+            existing = {row[1] for row in await cur.fetchall()}
+            if existing:
+                for col, ddl in EVENT_POSTS_MIGRATIONS.items():
+                    if col not in existing:
+                        await db.execute(ddl)
             for stmt in CREATE_SQL.strip().split(";"):
                 st = stmt.strip()
                 if st:
@@ -47,6 +131,146 @@ class Storage:
             )
             return (await cur.fetchone()) is not None
 
+    async def get_fingerprints(self, keys: list[tuple[str, str]]) -> dict[tuple[str, str], tuple[str | None, float | None]]:
+        """Batch lookup: (source, event_id) -> (fingerprint, severity) for every key already seen."""
+        out = {}
+        if not keys:
+            return out
+        async with aiosqlite.connect(self.path) as db:
+            for i in range(0, len(keys), _IN_CHUNK):
+                chunk = keys[i:i + _IN_CHUNK]
+                cur = await db.execute(
+                    "SELECT source, event_id, fingerprint, severity FROM seen_events "
+                    f"WHERE (source, event_id) IN (VALUES {','.join(['(?,?)'] * len(chunk))})",
+                    [v for key in chunk for v in key],
+                )
+                for source, eid, fp, sev in await cur.fetchall():
+                    out[(source, eid)] = (fp, sev)
+        return out
+
+    async def mark_seen_many(self, rows: list[tuple[str, str, str, float]]):
+        """Upsert (source, event_id, fingerprint, severity) rows in one transaction."""
+        if not rows:
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        async with aiosqlite.connect(self.path) as db:
+            await db.executemany(
+                """INSERT INTO seen_events(source, event_id, seen_at, fingerprint, severity)
+                   VALUES (?,?,?,?,?)
+                   ON CONFLICT(source, event_id) DO UPDATE SET
+                       fingerprint=excluded.fingerprint, severity=excluded.severity""",
+                [(src, eid, now, fp, sev) for src, eid, fp, sev in rows],
+            )
+            await db.commit()
+
+    async def seed_seen_many(self, rows: list[tuple[str, str, str, float]]):
+        """Like mark_seen_many, but never touches rows that already exist (used by backfill)."""
+        if not rows:
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        async with aiosqlite.connect(self.path) as db:
+            await db.executemany(
+                "INSERT OR IGNORE INTO seen_events(source, event_id, seen_at, fingerprint, severity) VALUES (?,?,?,?,?)",
+                [(src, eid, now, fp, sev) for src, eid, fp, sev in rows],
+            )
+            await db.commit()
+
+    async def store_events(self, rows: list[tuple]):
+        """
+        Upsert (source, event_id, title, url, severity, lat, lon, countries, occurred_at,
+        hazard, region) rows into the event store and keep the hourly/daily rollups in step.
+        Only a first insert adds to a rollup count; a re-stored event can only raise its
+        bucket's max severity, so replays and backfills never double-count.
+        """
+        if not rows:
+            return
+        now = int(datetime.now(timezone.utc).timestamp())
+        fresh: dict[tuple, list] = {}     # (grain, bucket, source, hazard, region) -> [count, max_sev]
+        bumps: list[tuple] = []
+        async with aiosqlite.connect(self.path) as db:
+            for r in rows:
+                src, eid, title, url, sev, lat, lon, countries, occurred, hazard, region = r
+                cur = await db.execute(
+                    """INSERT INTO events(source, event_id, title, url, severity, lat, lon, countries,
+                                          occurred_at, first_seen, hazard, region)
+                       VALUES (?,?,?,?,?,?,?,?,?,?,?,?)
+                       ON CONFLICT(source, event_id) DO NOTHING""",
+                    (src, eid, title, url, sev, lat, lon, countries, occurred, now, hazard, region),
+                )
+                if cur.rowcount:
+                    t = occurred or now
+                    for grain, (_, width) in ROLLUP_TABLES.items():
+                        agg = fresh.setdefault((grain, t - t % width, src, hazard, region), [0, None])
+                        agg[0] += 1
+                        if sev is not None and (agg[1] is None or sev > agg[1]):
+                            agg[1] = sev
+                    continue
+                cur = await db.execute(
+                    """UPDATE events SET title=?, url=?, severity=?, lat=COALESCE(?, lat), lon=COALESCE(?, lon),
+                           countries=COALESCE(?, countries)
+                       WHERE source=? AND event_id=?
+                       RETURNING COALESCE(occurred_at, first_seen), hazard, region""",
+                    (title, url, sev, lat, lon, countries, src, eid),
+                )
+                row = await cur.fetchone()
+                if row and sev is not None and row[1] is not None:
+                    bumps.append((row[0], src, row[1], row[2], sev))
+
+            for grain, (table, width) in ROLLUP_TABLES.items():
+                await db.executemany(
+                    f"""INSERT INTO {table}(bucket, source, hazard, region, count, max_severity)
+                        VALUES (?,?,?,?,?,?)
+                        ON CONFLICT(bucket, source, hazard, region) DO UPDATE SET
+                            count = count + excluded.count,
+                            max_severity = MAX(COALESCE(max_severity, excluded.max_severity),
+                                               COALESCE(excluded.max_severity, max_severity))""",
+                    [(b, src, hz, rg, c, mx) for (g, b, src, hz, rg), (c, mx) in fresh.items() if g == grain],
+                )
+                await db.executemany(
+                    f"""UPDATE {table} SET max_severity = MAX(COALESCE(max_severity, ?), ?)
+                        WHERE bucket=? AND source=? AND hazard=? AND region=?""",
+                    [(sev, sev, t - t % width, src, hz, rg) for t, src, hz, rg, sev in bumps],
+                )
+            await db.commit()
+
+    async def rollup_stats(self, since: int, group_by: str, grain: str = "day") -> list[tuple[str, int, float | None]]:
+        """(key, count, max_severity) from the `grain` rollup for buckets since `since`, grouped by source, hazard or region."""
+        if group_by not in ("source", "hazard", "region"):
+            raise ValueError(f"bad group_by: {group_by}")
+        table, width = ROLLUP_TABLES[grain]
+        async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute(
+                f"""SELECT {group_by}, SUM(count), MAX(max_severity) FROM {table}
+                    WHERE bucket >= ? GROUP BY {group_by} ORDER BY SUM(count) DESC""",
+                (since - since % width,),
+            )
+            return await cur.fetchall()
+
+    async def prune_hourly_rollups(self):
+        cutoff = int(datetime.now(timezone.utc).timestamp()) - HOURLY_RETENTION_S
+        async with aiosqlite.connect(self.path) as db:
+            await db.execute("DELETE FROM event_rollup_hourly WHERE bucket < ?", (cutoff,))
+            await db.commit()
+
+    async def record_posts(self, rows: list[tuple[str, str, int, int, int | None]]):
+        """Remember which message (and webhook, if any) carries each (source, event_id) in each channel."""
+        if not rows:
+            return
+        async with aiosqlite.connect(self.path) as db:
+            await db.executemany(
+                "INSERT OR REPLACE INTO event_posts(source, event_id, channel_id, message_id, webhook_id) VALUES (?,?,?,?,?)",
+                rows,
+            )
+            await db.commit()
+
+    async def get_posts(self, source: str, eid: str) -> list[tuple[int, int, int | None]]:
+        async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute(
+                "SELECT channel_id, message_id, webhook_id FROM event_posts WHERE source=? AND event_id=?",
+                (source, eid),
+            )
+            return await cur.fetchall()
+
     async def upsert_wallet(self, user_id: int, wallet: str):
         async with aiosqlite.connect(self.path) as db:
             await db.execute(
@@ -77,4 +301,5 @@ class Storage:
         """Clear all seen disaster items from the database."""
         async with aiosqlite.connect(self.path) as db:
             await db.execute("DELETE FROM seen_events")
+            await db.execute("DELETE FROM event_posts")
             await db.commit()
@@ -0,0 +1,92 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Union
+
+from dateutil import parser as dtparse
+
+Stamp = Union[str, int, float, None]
+
+
+def _aware(dt: datetime) -> datetime:
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+def _iso(v: Stamp) -> Optional[datetime]:
+    """RFC 3339 / ISO-8601, incl. 'Z' and bare dates (3.11+ fromisoformat)."""
+    if not isinstance(v, str):
+        return None
+    try:
+        return _aware(datetime.fromisoformat(v.strip()))
+    except ValueError:
+        return None
+
+def _rfc822(v: Stamp) -> Optional[datetime]:
+    """RSS pubDate, e.g. 'Tue, 07 Oct 2025 14:03:00 GMT'."""
+    if not isinstance(v, str):
+        return None
+    try:
+        return _aware(parsedate_to_datetime(v.strip()))
+    except (TypeError, ValueError, IndexError):
+        return None
+
+def _epoch(v: Stamp) -> Optional[datetime]:
+    """Unix seconds or milliseconds (numbers or numeric strings)."""
+    try:
+        x = float(v)
+    except (TypeError, ValueError):
+        return None
+    if x > 1e11:  # anything past year 5138 in seconds is really milliseconds
+        x /= 1000.0
+    try:
+        return datetime.fromtimestamp(x, tz=timezone.utc)
+    except (OverflowError, OSError, ValueError):
+        return None
+
+def _fuzzy(v: Stamp) -> Optional[datetime]:
+    try:
+        return _aware(dtparse.parse(str(v)))
+    except (ValueError, OverflowError):
+        return None
+
+FAST_PATHS: Dict[str, Callable[[Stamp], Optional[datetime]]] = {
+    "iso": _iso,
+    "rfc822": _rfc822,
+    "epoch": _epoch,
+}
+
+
+class TimestampParser:
+    """
+    Parses feed timestamps with format-specific fast paths. The first format that
+    works for a source is remembered and tried first next time, so a feed that
+    always sends RFC 822 never pays for an ISO attempt; dateutil is the last resort.
+    """
+
+    def __init__(self):
+        self.hints: Dict[str, str] = {}
+
+    def parse(self, value: Stamp, source: str = "") -> Optional[datetime]:
+        if value is None or value == "":
+            return None
+        hint = self.hints.get(source)
+        if hint:
+            dt = FAST_PATHS[hint](value) if hint in FAST_PATHS else _fuzzy(value)
+            if dt:
+                return dt
+        for name, fn in FAST_PATHS.items():
+            if name == hint:
+                continue
+            dt = fn(value)
+            if dt:
+                self.hints[source] = name
+                return dt
+        dt = _fuzzy(value)
+        if dt and source:
+            self.hints[source] = "dateutil"
+        return dt
+
+
+_default = TimestampParser()
+
+def parse_ts(value: Stamp, source: str = "") -> Optional[datetime]:
+    """Timezone-aware datetime (UTC when the input has no offset), or None if unparseable."""
+    return _default.parse(value, source)
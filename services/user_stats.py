@@ -0,0 +1,156 @@
+import os
+import time
+import logging
+import aiosqlite
+from dataclasses import dataclass
+from typing import Iterable, Optional, Tuple
+
+DB_PATH = os.getenv("DB_PATH", "pal_bot.sqlite")
+REP_DB_PATH = os.getenv("REP_DB_PATH", "data/pal_bot.sqlite")  # services/reputation.py default
+
+COUNTERS = ("rep", "rep_given", "invites", "raids", "verifications")
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS user_stats(
+    guild_id      INTEGER NOT NULL,
+    user_id       INTEGER NOT NULL,
+    xp            INTEGER NOT NULL DEFAULT 0,
+    level         INTEGER NOT NULL DEFAULT 0,
+    rep           INTEGER NOT NULL DEFAULT 0,   -- reputation received
+    rep_given     INTEGER NOT NULL DEFAULT 0,
+    invites       INTEGER NOT NULL DEFAULT 0,   -- successful referrals
+    raids         INTEGER NOT NULL DEFAULT 0,   -- raid participations
+    verifications INTEGER NOT NULL DEFAULT 0,   -- approved verify requests
+    updated_at    INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, user_id)
+);
+"""
+
+PUT_XP_SQL = """
+INSERT INTO user_stats(guild_id, user_id, xp, level, updated_at) VALUES (?,?,?,?,?)
+ON CONFLICT(guild_id, user_id) DO UPDATE SET xp=excluded.xp, level=excluded.level, updated_at=excluded.updated_at
+"""
+
+# column names come from COUNTERS only
+BUMP_SQL = """
+INSERT INTO user_stats(guild_id, user_id, {col}, updated_at) VALUES (?,?,?,?)
+ON CONFLICT(guild_id, user_id) DO UPDATE SET {col} = {col} + excluded.{col}, updated_at=excluded.updated_at
+"""
+
+
+@dataclass(frozen=True)
+class UserStatsRow:
+    guild_id: int
+    user_id: int
+    xp: int = 0
+    level: int = 0
+    rep: int = 0
+    rep_given: int = 0
+    invites: int = 0
+    raids: int = 0
+    verifications: int = 0
+    updated_at: int = 0
+
+
+class UserStats:
+    """
+    Denormalised per-member stats (XP, level, reputation, invites, raids,
+    verifications), one row per (guild, member). Each subsystem bumps its own
+    columns when it writes, so /profile is a single primary-key read instead of
+    a query per subsystem. rebuild() re-derives everything from the source tables.
+    """
+
+    def __init__(self, path: str = DB_PATH, rep_path: str = REP_DB_PATH):
+        self.path = path
+        self.rep_path = rep_path
+
+    async def init(self):
+        async with aiosqlite.connect(self.path) as db:
+            await db.executescript(CREATE_SQL)
+            cur = await db.execute("SELECT 1 FROM user_stats LIMIT 1")
+            empty = await cur.fetchone() is None
+            await db.commit()
+        if empty:
+            await self.rebuild()
+
+    # ---- writes ----
+
+    @staticmethod
+    async def bump(db: aiosqlite.Connection, column: str, rows: Iterable[Tuple[int, int, int]]):
+        """Add (guild_id, user_id, amount) rows to one counter, inside the caller's transaction."""
+        if column not in COUNTERS:
+            raise ValueError(f"unknown user_stats counter: {column}")
+        now = int(time.time())
+        rows = [(g, u, n, now) for g, u, n in rows if n]
+        if rows:
+            await db.executemany(BUMP_SQL.format(col=column), rows)
+
+    @staticmethod
+    async def put_xp(db: aiosqlite.Connection, rows: Iterable[Tuple[int, int, int, int]]):
+        """Store (guild_id, user_id, xp, level) as written by the xp table, inside the caller's transaction."""
+        now = int(time.time())
+        await db.executemany(PUT_XP_SQL, [(g, u, xp, lvl, now) for g, u, xp, lvl in rows])
+
+    async def record(self, guild_id: int, user_id: int, **counters: int):
+        async with aiosqlite.connect(self.path) as db:
+            for column, amount in counters.items():
+                await self.bump(db, column, [(guild_id, user_id, amount)])
+            await db.commit()
+
+    # ---- reads ----
+
+    async def get(self, guild_id: int, user_id: int) -> UserStatsRow:
+        async with aiosqlite.connect(self.path) as db:
+            cur = await db.execute(
+                "SELECT guild_id, user_id, xp, level, rep, rep_given, invites, raids, verifications, updated_at "
+                "FROM user_stats WHERE guild_id=? AND user_id=?", (guild_id, user_id))
+            row = await cur.fetchone()
+        return UserStatsRow(*row) if row else UserStatsRow(guild_id, user_id)
+
+    # ---- backfill ----
+
+    async def rebuild(self, guild_id: Optional[int] = None) -> int:
+        """Recompute every row (or one guild's) from the source tables; returns rows written."""
+        where, args = ("WHERE guild_id=?", (guild_id,)) if guild_id is not None else ("", ())
+        rep = await self._rep_totals(guild_id)
+        async with aiosqlite.connect(self.path) as db:
+            tables = {r[0] for r in await (await db.execute("SELECT name FROM sqlite_master WHERE type='table'")).fetchall()}
+            await db.execute(f"DELETE FROM user_stats {where}", args)
+            if "xp" in tables:
+                await db.execute(f"INSERT INTO user_stats(guild_id, user_id, xp, level) SELECT guild_id, user_id, xp, level FROM xp {where}", args)
+            sources = {
+                "invites": ("recruiter_stats", f"SELECT guild_id, user_id, successful_invites FROM recruiter_stats {where}"),
+                "raids": ("raid_participants",
+                          "SELECT r.guild_id, p.user_id, COUNT(*) FROM raid_participants p JOIN raids r ON r.id = p.raid_id "
+                          f"{where.replace('guild_id', 'r.guild_id')} GROUP BY r.guild_id, p.user_id"),
+                "verifications": ("verify_requests",
+                                  "SELECT guild_id, user_id, COUNT(*) FROM verify_requests WHERE status='approved' "
+                                  f"{'AND guild_id=?' if where else ''} GROUP BY guild_id, user_id"),
+            }
+            for column, (table, sql) in sources.items():
+                if table in tables:
+                    await self.bump(db, column, [tuple(r) for r in await (await db.execute(sql, args)).fetchall()])
+            await self.bump(db, "rep", [(g, u, n) for g, u, n, _ in rep])
+            await self.bump(db, "rep_given", [(g, u, n) for g, u, _, n in rep])
+            cur = await db.execute(f"SELECT COUNT(*) FROM user_stats {where}", args)
+            (count,) = await cur.fetchone()
+            await db.commit()
+        logging.info("UserStats: rebuilt %s rows", count)
+        return count
+
+    async def _rep_totals(self, guild_id: Optional[int]) -> list:
+        """(guild_id, user_id, received, given) from the reputation DB, if there is one."""
+        if not os.path.exists(self.rep_path):
+            return []
+        where, args = ("AND guild_id=?", (guild_id,)) if guild_id is not None else ("", ())
+        try:
+            async with aiosqlite.connect(self.rep_path) as db:
+                cur = await db.execute(f"""
+                    SELECT guild_id, user_id, SUM(received), SUM(given) FROM (
+                        SELECT guild_id, to_user_id AS user_id, points AS received, 0 AS given FROM reputation WHERE 1 {where}
+                        UNION ALL
+                        SELECT guild_id, from_user_id, 0, points FROM reputation WHERE 1 {where}
+                    ) GROUP BY guild_id, user_id""", args * 2)
+                return [tuple(r) for r in await cur.fetchall()]
+        except aiosqlite.OperationalError:  # no reputation table yet
+            return []
@@ -0,0 +1,185 @@
+import os
+import time
+import asyncio
+import logging
+import aiohttp
+import aiosqlite
+import discord
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from services.settings import Settings
+
+DB_PATH = os.getenv("DB_PATH", "pal_bot.sqlite")
+
+WEBHOOK_NAME = "Palaemon Alerts"
+# Discord allows ~5 requests / 2 s per webhook and 30 messages / minute per channel
+WEBHOOK_WINDOW = (5, 2.0)
+CHANNEL_WINDOW = (30, 60.0)
+PROVISION_RETRY_S = 3600  # after a failed create (e.g. no Manage Webhooks), use bot sends for this long
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS alert_webhooks (
+    channel_id INTEGER PRIMARY KEY,
+    webhook_id INTEGER NOT NULL,
+    token      TEXT NOT NULL
+)
+"""
+
+class SlidingWindow:
+    """At most `limit` acquisitions per `per` seconds; acquire() sleeps until a slot frees up."""
+
+    def __init__(self, limit: int, per: float):
+        self.limit = limit
+        self.per = per
+        self._hits: Deque[float] = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._hits and now - self._hits[0] >= self.per:
+                    self._hits.popleft()
+                if len(self._hits) < self.limit:
+                    self._hits.append(now)
+                    return
+                await asyncio.sleep(self.per - (now - self._hits[0]))
+
+
+class AlertDelivery:
+    """
+    Sends bulk alert traffic through one webhook per channel (own HTTP session and
+    rate windows), so bursts don't queue behind the bot's interaction responses.
+    Off unless ALERT_WEBHOOKS is true; any webhook failure falls back to channel.send.
+    """
+
+    def __init__(self, bot: discord.Client, path: str = DB_PATH):
+        self.bot = bot
+        self.path = path
+        self.settings = Settings()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._hooks: Dict[int, discord.Webhook] = {}
+        self._failed: Dict[int, float] = {}
+        self._windows: Dict[Tuple[str, int], SlidingWindow] = {}
+        self._provision_lock = asyncio.Lock()
+        self._enabled: Tuple[float, bool] = (0.0, False)
+
+    async def init(self):
+        await self.settings.init()
+        async with aiosqlite.connect(self.path) as db:
+            await db.execute(CREATE_SQL)
+            await db.commit()
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+    async def enabled(self) -> bool:
+        checked, value = self._enabled
+        if time.monotonic() - checked > 60:
+            raw = await self.settings.get("ALERT_WEBHOOKS", os.getenv("ALERT_WEBHOOKS", "false"))
+            value = (raw or "").strip().lower() in {"1", "true", "yes", "y", "on"}
+            self._enabled = (time.monotonic(), value)
+        return value
+
+    def _window(self, kind: str, key: int) -> SlidingWindow:
+        w = self._windows.get((kind, key))
+        if w is None:
+            w = self._windows[(kind, key)] = SlidingWindow(*(WEBHOOK_WINDOW if kind == "hook" else CHANNEL_WINDOW))
+        return w
+
+    def _partial(self, webhook_id: int, token: str) -> discord.Webhook:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return discord.Webhook.partial(webhook_id, token, session=self._session, client=self.bot)
+
+    async def _forget(self, channel_id: int):
+        self._hooks.pop(channel_id, None)
+        async with aiosqlite.connect(self.path) as db:
+            await db.execute("DELETE FROM alert_webhooks WHERE channel_id=?", (channel_id,))
+            await db.commit()
+
+    async def _webhook_for(self, channel: discord.abc.GuildChannel) -> Optional[discord.Webhook]:
+        hook = self._hooks.get(channel.id)
+        if hook:
+            return hook
+        if time.monotonic() - self._failed.get(channel.id, -PROVISION_RETRY_S) < PROVISION_RETRY_S:
+            return None
+        async with self._provision_lock:
+            hook = self._hooks.get(channel.id)
+            if hook:
+                return hook
+            async with aiosqlite.connect(self.path) as db:
+                cur = await db.execute("SELECT webhook_id, token FROM alert_webhooks WHERE channel_id=?", (channel.id,))
+                row = await cur.fetchone()
+            if row:
+                hook = self._partial(row[0], row[1])
+            else:
+                try:
+                    existing = [w for w in await channel.webhooks()
+                                if w.name == WEBHOOK_NAME and w.token and w.user and w.user.id == self.bot.user.id]
+                    created = existing[0] if existing else await channel.create_webhook(
+                        name=WEBHOOK_NAME, reason="Alert delivery (ALERT_WEBHOOKS)")
+                except Exception as e:
+                    logging.warning("AlertDelivery: cannot provision webhook in %s (%s); using bot sends.", channel.id, e)
+                    self._failed[channel.id] = time.monotonic()
+                    return None
+                async with aiosqlite.connect(self.path) as db:
+                    await db.execute("INSERT OR REPLACE INTO alert_webhooks(channel_id, webhook_id, token) VALUES (?,?,?)",
+                                     (channel.id, created.id, created.token))
+                    await db.commit()
+                hook = self._partial(created.id, created.token)
+            self._hooks[channel.id] = hook
+            return hook
+
+    async def send(self, channel, *, content=None, embed=None, embeds=None, file=None,
+                   allowed_mentions=None, reference=None):
+        """Send via the channel's webhook when enabled; otherwise (or on failure) via the bot."""
+        thread = None
+        target = channel
+        if isinstance(channel, discord.Thread):
+            thread, target = channel, channel.parent
+        kwargs = {"content": content, "allowed_mentions": allowed_mentions or discord.AllowedMentions.none()}
+        if embeds:
+            kwargs["embeds"] = embeds
+        elif embed:
+            kwargs["embed"] = embed
+        if file:
+            kwargs["file"] = file
+
+        # replies can't be sent by webhooks
+        if reference is None and isinstance(target, discord.TextChannel) and await self.enabled():
+            hook = await self._webhook_for(target)
+            if hook:
+                await self._window("channel", target.id).acquire()
+                await self._window("hook", hook.id).acquire()
+                me = target.guild.me
+                try:
+                    return await hook.send(
+                        wait=True, thread=thread or discord.utils.MISSING,
+                        username=me.display_name if me else WEBHOOK_NAME,
+                        avatar_url=me.display_avatar.url if me else None,
+                        **kwargs,
+                    )
+                except discord.NotFound:
+                    logging.info("AlertDelivery: webhook for %s was deleted; re-provisioning next time.", target.id)
+                    await self._forget(target.id)
+                except discord.HTTPException as e:
+                    logging.warning("AlertDelivery: webhook send failed in %s (%s); falling back.", target.id, e)
+                if file:
+                    file.reset()
+        return await channel.send(reference=reference, **kwargs)
+
+    async def edit(self, channel, message_id: int, webhook_id: Optional[int], **fields):
+        """Edit a post made by send(); webhook posts can only be edited through their webhook."""
+        if webhook_id:
+            target = channel.parent if isinstance(channel, discord.Thread) else channel
+            hook = self._hooks.get(target.id)
+            if hook is None or hook.id != webhook_id:
+                hook = await self._webhook_for(target)
+            if hook and hook.id == webhook_id:
+                await self._window("hook", hook.id).acquire()
+                thread = channel if isinstance(channel, discord.Thread) else discord.utils.MISSING
+                return await hook.edit_message(message_id, thread=thread, **fields)
+        return await channel.get_partial_message(message_id).edit(**fields)
@@ -0,0 +1,46 @@
+import asyncio
+from types import SimpleNamespace
+
+from cogs.disasters import Disasters
+
+GLOBAL = {"channel_id": 100, "digest_channel_id": 200, "alert_role": "Alerts", "sources": {"usgs"},
+          "min_mag": 5.0, "ping_mag": 6.8, "digest_time": "09:00", "mode": "rt"}
+
+
+class FakeGuildCfg:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def all_rows(self):
+        return self.rows
+
+
+def override(guild_id, **cols):
+    row = {"guild_id": guild_id, "enabled": 1, "channel_id": None, "digest_channel_id": None, "alert_role": None,
+           "sources": None, "usgs_min_mag": None, "usgs_ping_mag": None, "digest_time": None, "mode": None}
+    row.update(cols)
+    return row
+
+
+def configs(rows):
+    cog = Disasters.__new__(Disasters)
+    cog.guild_cfg = FakeGuildCfg(rows)
+    legacy = SimpleNamespace(guild=SimpleNamespace(id=1))  # the global channels live in guild 1
+    cog.bot = SimpleNamespace(get_channel=lambda cid: legacy if cid in (100, 200) else None)
+    return {c.guild_id: c for c in asyncio.run(cog._guild_configs(GLOBAL))}
+
+
+def test_alert_role_only_override_keeps_global_channels():
+    cfg = configs([override(1, alert_role="Quake Squad")])[1]
+    assert (cfg.channel_id, cfg.digest_channel_id) == (100, 200)
+    assert cfg.alert_role == "Quake Squad"
+
+
+def test_unset_channel_in_other_guild_does_not_borrow_global():
+    cfg = configs([override(2, mode="digest")])[2]
+    assert (cfg.channel_id, cfg.digest_channel_id) == (0, 0)
+
+
+def test_legacy_guild_without_override_uses_global():
+    cfg = configs([])[1]
+    assert (cfg.channel_id, cfg.digest_channel_id, cfg.alert_role) == (100, 200, "Alerts")
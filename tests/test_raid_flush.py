@@ -0,0 +1,36 @@
+import asyncio
+
+import aiosqlite
+
+import cogs.raids as raids
+from cogs.raids import LiveRaid, RaidTracker
+
+
+async def _flush_twice(path):
+    await raids.ensure_db()
+    async with aiosqlite.connect(path) as db:
+        await db.execute("INSERT INTO raids(id, guild_id, channel_id, title, url, started_at, ends_at, seq) "
+                         "VALUES (1, 7, 0, 't', 'u', 0, 600, 1)")
+        await db.commit()
+    tracker = RaidTracker(path)
+    raid = tracker.raids[1] = LiveRaid(1, 7, 0, None, "t", "u", 0, 600, 1)
+    for uid in (10, 11):
+        raid.add(uid)
+    pending = list(raid.pending)
+    await tracker.flush()
+    raid.pending = pending  # a retry of a batch that was already committed
+    await tracker.flush()
+    async with aiosqlite.connect(path) as db:
+        cur = await db.execute("SELECT participants FROM raids WHERE id=1")
+        (participants,) = await cur.fetchone()
+        cur = await db.execute("SELECT SUM(raids) FROM user_stats WHERE guild_id=7")
+        (user_raids,) = await cur.fetchone()
+        cur = await db.execute("SELECT SUM(raids) FROM raid_user_stats WHERE guild_id=7")
+        (analytics_raids,) = await cur.fetchone()
+    return participants, user_raids, analytics_raids
+
+
+def test_retried_flush_does_not_double_count(tmp_path, monkeypatch):
+    path = str(tmp_path / "bot.sqlite")
+    monkeypatch.setattr(raids, "DB_PATH", path)  # ensure_db() reads the module global
+    assert asyncio.run(_flush_twice(path)) == (2, 2, 2)
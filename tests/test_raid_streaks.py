@@ -0,0 +1,40 @@
+import asyncio
+
+import aiosqlite
+
+from cogs.raids import CREATE_PARTICIPANTS_SQL, CREATE_SQL
+from services.raid_analytics import RaidAnalytics
+
+GUILD, USER = 1, 42
+
+
+async def _streak_after_flushes(path, flushes):
+    async with aiosqlite.connect(path) as db:
+        await db.execute(CREATE_SQL)
+        await db.execute(CREATE_PARTICIPANTS_SQL)
+        await db.commit()
+    analytics = RaidAnalytics(path)
+    await analytics.init()
+    async with aiosqlite.connect(path) as db:
+        for seq in range(1, 7):
+            await db.execute(
+                "INSERT INTO raids(id, guild_id, channel_id, title, url, started_at, ends_at, active, seq) "
+                "VALUES (?,?,0,'t','u',0,60,0,?)", (seq, GUILD, seq))
+        await db.commit()
+    for seqs in flushes:  # each flush is its own transaction, like RaidTracker.flush
+        async with aiosqlite.connect(path) as db:
+            await db.executemany("INSERT INTO raid_participants(raid_id, user_id, ts) VALUES (?,?,0)",
+                                 [(seq, USER) for seq in seqs])
+            await RaidAnalytics.record(db, [(GUILD, seq, seq, 0, USER, 0) for seq in seqs])
+            await db.commit()
+    return await analytics.raider(GUILD, USER)
+
+
+def test_streak_counts_raids_flushed_out_of_order(tmp_path):
+    stats = asyncio.run(_streak_after_flushes(str(tmp_path / "bot.sqlite"), [[4], [6], [5]]))
+    assert (stats.raids, stats.streak, stats.best_streak) == (3, 3, 3)
+
+
+def test_streak_breaks_on_a_missed_raid(tmp_path):
+    stats = asyncio.run(_streak_after_flushes(str(tmp_path / "bot.sqlite"), [[1], [2], [3], [5], [6]]))
+    assert (stats.raids, stats.streak, stats.best_streak) == (5, 2, 3)
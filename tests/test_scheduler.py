@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+import aiosqlite
+
+import services.scheduler as scheduler
+from services.scheduler import JobScheduler
+
+
+async def _run_flaky(path, failures):
+    sched = JobScheduler(path)
+    calls = []
+
+    async def handler(payload):
+        calls.append(payload)
+        if len(calls) <= failures:
+            raise RuntimeError("boom")
+
+    sched.register("flaky", handler)
+    await sched.start()
+    await sched.schedule("flaky:1", "flaky", time.time(), {"n": 1})
+    await asyncio.sleep(0.5)
+    await sched.release("flaky")
+    async with aiosqlite.connect(path) as db:
+        cur = await db.execute("SELECT COUNT(*) FROM scheduled_jobs")
+        (rows,) = await cur.fetchone()
+    return len(calls), rows, sched._task
+
+
+def test_failed_job_is_retried_then_removed(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler, "RETRY_BASE_S", 0.01)
+    calls, rows, task = asyncio.run(_run_flaky(str(tmp_path / "bot.sqlite"), failures=2))
+    assert (calls, rows, task) == (3, 0, None)
+
+
+def test_job_is_dropped_after_max_attempts(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler, "RETRY_BASE_S", 0.01)
+    monkeypatch.setattr(scheduler, "MAX_ATTEMPTS", 3)
+    calls, rows, _ = asyncio.run(_run_flaky(str(tmp_path / "bot.sqlite"), failures=10))
+    assert (calls, rows) == (3, 0)